@@ -1,35 +1,110 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Request, request, jsonify, Response, g
 from flask_cors import CORS
 import os
 import uuid
 import json
 import asyncio
+import time
 import threading
 from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge
 from datetime import datetime
 from main import DocumentProcessor  # Import DocumentProcessor class
+from config.config import Config
+from storage.result_store import create_result_store
+from pipeline.upload import PDFUploadStream, UploadRejected, iter_zip_pdfs
+from pipeline.cancellation import JobRegistry, JobCancelled, StageTimeout
+from pipeline.scheduler import FairScheduler, PRIORITY_CLASSES
+from pipeline.tracing import Tracer
+from pipeline import metrics
+from pipeline.logs import configure_logging
+from models.registry import registry as model_registry, preload_models
+from models.embedding_cache import embedding_cache_stats
+
+class StreamingUploadRequest(Request):
+    """Request that streams uploaded files to disk through PDFUploadStream."""
+
+    @property
+    def max_content_length(self):
+        # A batch carries many files, so its body gets its own total limit;
+        # the per-file limit is enforced by PDFUploadStream.
+        if self.path == '/api/batch':
+            return Config.MAX_BATCH_CONTENT_LENGTH
+        return super().max_content_length
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.path == '/api/batch' and filename and filename.lower().endswith('.zip'):
+            # Archives are spooled as-is and their members streamed through PDFUploadStream later.
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        if not filename or not allowed_file(filename):
+            raise UploadRejected('Invalid file type. Only PDF files are allowed')
+        stream = PDFUploadStream(
+            app.config['UPLOAD_FOLDER'],
+            max_bytes=app.config['MAX_CONTENT_LENGTH'],
+            max_pages=Config.MAX_PDF_PAGES or None
+        )
+        # Tracked here rather than via request.files, which is never set if parsing fails midway
+        self.upload_streams.append(stream)
+        return stream
+
+    @property
+    def upload_streams(self):
+        """PDFUploadStreams opened while parsing this request's body."""
+        if '_upload_streams' not in self.__dict__:
+            self._upload_streams = []
+        return self._upload_streams
+
+configure_logging()
 
 app = Flask(__name__)
+app.request_class = StreamingUploadRequest
 CORS(app, resources={r"/api/*": {"origins": "https://executive-summary-generator-1.onrender.com"}})
 
 UPLOAD_FOLDER = 'uploads'
 RESULTS_FOLDER = 'results'
 STATUS_FOLDER = 'status'  # Folder for tracking status
 ALLOWED_EXTENSIONS = {'pdf'}
+FINAL_STAGES = {'completed', 'failed', 'cancelled', 'timeout'}
+# Serializes status writes so a cancel request cannot overwrite a final stage
+status_lock = threading.RLock()
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['RESULTS_FOLDER'] = RESULTS_FOLDER
 app.config['STATUS_FOLDER'] = STATUS_FOLDER
+app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(RESULTS_FOLDER, exist_ok=True)
 os.makedirs(STATUS_FOLDER, exist_ok=True)
 
 processor = DocumentProcessor()
+jobs = JobRegistry()
+scheduler = FairScheduler(
+    max_workers=Config.SCHEDULER_WORKERS,
+    per_client_limit=Config.PER_CLIENT_CONCURRENCY
+)
+result_store = create_result_store(
+    Config.RESULT_STORE_BACKEND,
+    Config.RESULT_STORE_PATH or (RESULTS_FOLDER if Config.RESULT_STORE_BACKEND == 'filesystem' else None)
+)
+if Config.RESULT_RETENTION_DAYS > 0:
+    result_store.purge(Config.RESULT_RETENTION_DAYS * 24 * 3600)
+if Config.PRELOAD_MODELS:
+    preload_models(Config.PRELOAD_MODELS)
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
+def client_id_for_request():
+    """Identify the tenant for fair scheduling by remote address.
+
+    X-Client-Id is only honoured from Config.TRUSTED_PROXIES; from anyone else it
+    would let a client rotate the header to escape its fair share and caps.
+    """
+    if request.remote_addr in Config.TRUSTED_PROXIES and request.headers.get('X-Client-Id'):
+        return request.headers['X-Client-Id']
+    return request.remote_addr or 'anonymous'
+
 def update_status(file_id, stage, progress, message):
     """Update processing status"""
     status_file = os.path.join(app.config['STATUS_FOLDER'], f"{file_id}_status.json")
@@ -39,54 +114,292 @@ def update_status(file_id, stage, progress, message):
         'message': message,
         'timestamp': datetime.now().isoformat()
     }
-    with open(status_file, 'w') as f:
+    with status_lock, open(status_file, 'w') as f:
         json.dump(status, f)
     return status
 
+def mark_cancelling(file_id):
+    """Record a cancel request unless the job already reached a final stage."""
+    status_file = os.path.join(app.config['STATUS_FOLDER'], f"{file_id}_status.json")
+    with status_lock:
+        try:
+            with open(status_file, 'r') as f:
+                if json.load(f).get('stage') in FINAL_STAGES:
+                    return False
+        except (OSError, ValueError):
+            pass
+        update_status(file_id, 'cancelling', 100, 'Cancellation requested')
+        return True
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    started = g.get('request_started')
+    if started is not None:
+        # The URL rule, not the path, keeps per-file routes to one series each.
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.HTTP_REQUEST_SECONDS.labels(request.method, route, response.status_code).observe(
+            time.perf_counter() - started
+        )
+    return response
+
+@app.teardown_request
+def discard_unfinalized_uploads(exc=None):
+    # Uploads under an unexpected field name, or abandoned by an error, would
+    # otherwise leave their uploads/upload_*.part files behind. discard() is a
+    # no-op for streams that were finalized into place.
+    for stream in request.upload_streams:
+        stream.discard()
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Prometheus exposition of request, job, queue, LLM and cache metrics."""
+    body, content_type = metrics.render()
+    return Response(body, mimetype=content_type)
+
 @app.route('/api/test', methods=['GET'])
 def test_server():
     """Test if the server is running properly."""
     return jsonify({'status': 'success', 'message': 'Server is running'}), 200
 
+@app.errorhandler(RequestEntityTooLarge)
+def handle_too_large(error):
+    if request.path == '/api/batch':
+        return jsonify({'error': f'Batch exceeds the maximum request size of {Config.MAX_BATCH_CONTENT_LENGTH} bytes'}), 413
+    return jsonify({'error': f'File exceeds the maximum upload size of {Config.MAX_CONTENT_LENGTH} bytes'}), 413
+
 @app.route('/api/upload', methods=['POST'])
 def upload_file():
     """Handle PDF uploads and process dynamically using DocumentProcessor."""
-    if 'file' not in request.files:
+    try:
+        files = request.files
+    except UploadRejected as e:
+        return jsonify({'error': str(e)}), e.status_code
+
+    if 'file' not in files:
         return jsonify({'error': 'No file uploaded'}), 400
 
-    file = request.files['file']
+    file = files['file']
     if file.filename == '' or not allowed_file(file.filename):
         return jsonify({'error': 'Invalid file type. Only PDF files are allowed'}), 400
 
+    priority = requested_priority('interactive')
+    if priority not in PRIORITY_CLASSES:
+        file.stream.discard()
+        return jsonify({'error': f"Invalid priority. Use one of: {', '.join(PRIORITY_CLASSES)}"}), 400
+
     file_id = str(uuid.uuid4())
-    filename = secure_filename(file.filename)
-    file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{file_id}_{filename}")
-    
-    update_status(file_id, 'upload', 0, 'Starting file upload')
-    file.save(file_path)
-    update_status(file_id, 'upload', 100, 'File upload completed')
+    tracer = Tracer(file_id)
+    try:
+        upload_info = finalize_upload(file_id, file.filename, file.stream, tracer)
+    except UploadRejected as e:
+        return jsonify({'error': str(e)}), e.status_code
+    start_job(file_id, upload_info, priority, tracer)
     
+    return jsonify({
+        'status': 'processing',
+        'fileId': file_id,
+        'message': 'Processing started',
+        'sha256': upload_info['sha256'],
+        'pages': upload_info['pages']
+    }), 202
+
+def requested_priority(default):
+    return request.args.get('priority') or request.form.get('priority') or default
+
+def finalize_upload(file_id, original_filename, stream, tracer):
+    """Move a streamed upload to uploads/<file_id>_<name> and return its fingerprint."""
+    filename = secure_filename(original_filename)
+    file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{file_id}_{filename}")
+    with tracer.span('upload.save') as span:
+        upload_info = stream.finalize(file_path)
+        span.bytes_out = upload_info['size']
+    upload_info['path'] = file_path
+    return upload_info
+
+def start_job(file_id, upload_info, priority, tracer):
+    """Queue a finalized upload on the scheduler; its stage timings are stored with the result."""
+    file_path = upload_info['path']
+    update_status(file_id, 'queued', 0, 'File upload completed, waiting for a worker')
+    cancel_token = jobs.register(file_id)
+
     async def process_file():
-        update_status(file_id, 'processing', 0, 'Extracting text from document')
-        result = await processor.process_document(file_path)
-        
-        if 'error' in result:
-            update_status(file_id, 'failed', 100, result['error'])
-        else:
-            report_file = os.path.join(app.config['RESULTS_FOLDER'], f"{file_id}.json")
-            with open(report_file, 'w') as f:
-                json.dump(result, f, indent=4)
-            update_status(file_id, 'completed', 100, 'Analysis completed successfully')
+        started = time.perf_counter()
+        outcome = 'failed'
+        try:
+            update_status(file_id, 'processing', 0, 'Extracting text from document')
+            with tracer.activate():
+                result = await processor.process_document(file_path, cancel_token, upload_info['sha256'])
+            
+            if 'error' in result:
+                update_status(file_id, 'failed', 100, result['error'])
+            else:
+                result['timings'] = tracer.breakdown()
+                metrics.RESULT_BYTES.observe(len(json.dumps(result, ensure_ascii=False).encode('utf-8')))
+                with tracer.span('result_store.save'):
+                    result_store.save(file_id, result)
+                update_status(file_id, 'completed', 100, 'Analysis completed successfully')
+                outcome = 'completed'
+        except JobCancelled as e:
+            outcome = 'timeout' if isinstance(e, StageTimeout) else 'cancelled'
+            update_status(file_id, outcome, 100, f"Processing stopped: {e}")
+        except Exception as e:
+            # E.g. a result store or metrics failure; without this the job stays 'processing'
+            app.logger.exception(f"Job {file_id} failed")
+            update_status(file_id, 'failed', 100, f"Processing failed: {e}")
+        finally:
+            metrics.JOB_SECONDS.labels(outcome).observe(time.perf_counter() - started)
+            jobs.finish(file_id)
     
-    threading.Thread(target=asyncio.run, args=(process_file(),)).start()
-    
-    return jsonify({'status': 'processing', 'fileId': file_id, 'message': 'Processing started'}), 202
+    # Cost is the page count, so fair share is measured in pages rather than files.
+    scheduler.submit(
+        file_id,
+        client_id_for_request(),
+        lambda: asyncio.run(process_file()),
+        priority=priority,
+        cost=upload_info['pages'] or 1
+    )
+
+def discard_candidates(candidates):
+    """Remove the partial files of batch candidates that were not finalized."""
+    for _, stream, _ in candidates:
+        if stream is not None:
+            stream.discard()
+
+@app.route('/api/batch', methods=['POST'])
+def upload_batch():
+    """Accept several PDFs (field 'files') and/or zip archives and queue them as one batch."""
+    try:
+        uploads = request.files.getlist('files') + request.files.getlist('file')
+    except UploadRejected as e:
+        return jsonify({'error': str(e)}), e.status_code
+    if not uploads:
+        return jsonify({'error': 'No files uploaded'}), 400
+
+    priority = requested_priority('batch')
+    if priority not in PRIORITY_CLASSES:
+        return jsonify({'error': f"Invalid priority. Use one of: {', '.join(PRIORITY_CLASSES)}"}), 400
+
+    # Zip members are not in request.upload_streams, so every exit below discards them
+    candidates = []
+    try:
+        for upload in uploads:
+            if upload.filename.lower().endswith('.zip'):
+                for candidate in iter_zip_pdfs(
+                    upload.stream,
+                    app.config['UPLOAD_FOLDER'],
+                    max_bytes=app.config['MAX_CONTENT_LENGTH'],
+                    max_pages=Config.MAX_PDF_PAGES or None,
+                    max_files=Config.MAX_BATCH_FILES
+                ):
+                    candidates.append(candidate)
+            else:
+                candidates.append((upload.filename, upload.stream, None))
+    except UploadRejected as e:
+        discard_candidates(candidates)
+        return jsonify({'error': str(e)}), e.status_code
+    except Exception:
+        discard_candidates(candidates)
+        raise
+
+    if len(candidates) > Config.MAX_BATCH_FILES:
+        discard_candidates(candidates)
+        return jsonify({'error': f"Batch contains more than {Config.MAX_BATCH_FILES} PDF files"}), 413
+
+    batch_id = str(uuid.uuid4())
+    accepted, rejected = [], []
+    try:
+        for filename, stream, error in candidates:
+            if error is None:
+                file_id = str(uuid.uuid4())
+                tracer = Tracer(file_id)
+                try:
+                    upload_info = finalize_upload(file_id, filename, stream, tracer)
+                except UploadRejected as e:
+                    error = str(e)
+            if error is not None:
+                rejected.append({'filename': filename, 'error': error})
+                continue
+            start_job(file_id, upload_info, priority, tracer)
+            accepted.append({'fileId': file_id, 'filename': filename, 'pages': upload_info['pages']})
+    except Exception:
+        # Finalized uploads are left alone; discard() only removes .part files
+        discard_candidates(candidates)
+        raise
+
+    batch = {
+        'batchId': batch_id,
+        'created': datetime.now().isoformat(),
+        'files': accepted,
+        'rejected': rejected
+    }
+    with open(batch_status_path(batch_id), 'w') as f:
+        json.dump(batch, f)
+
+    return jsonify({
+        'status': 'processing',
+        'batchId': batch_id,
+        'accepted': len(accepted),
+        'rejected': rejected
+    }), 202
+
+def batch_status_path(batch_id):
+    return os.path.join(app.config['STATUS_FOLDER'], f"{secure_filename(batch_id)}_batch.json")
+
+@app.route('/api/batch/<batch_id>', methods=['GET'])
+def get_batch_status(batch_id):
+    """Aggregate progress of every file in a batch."""
+    path = batch_status_path(batch_id)
+    if not os.path.exists(path):
+        return jsonify({'error': 'Invalid or expired batch ID'}), 404
+    with open(path, 'r') as f:
+        batch = json.load(f)
+
+    counts = {}
+    total_progress = 0
+    files = []
+    for entry in batch['files']:
+        status_file = os.path.join(app.config['STATUS_FOLDER'], f"{entry['fileId']}_status.json")
+        status = {'stage': 'unknown', 'progress': 0}
+        if os.path.exists(status_file):
+            with open(status_file, 'r') as f:
+                status = json.load(f)
+        stage = status['stage']
+        counts[stage] = counts.get(stage, 0) + 1
+        # Only finished files count as fully done; 'upload' stage 100% is not progress.
+        total_progress += 100 if stage in FINAL_STAGES else (status['progress'] if stage == 'processing' else 0)
+        files.append({**entry, 'stage': stage, 'progress': status['progress'], 'message': status.get('message')})
+
+    total = len(files)
+    return jsonify({
+        'batchId': batch_id,
+        'total': total,
+        'counts': counts,
+        'progress': total_progress / total if total else 100,
+        'done': all(f['stage'] in FINAL_STAGES for f in files),
+        'files': files,
+        'rejected': batch['rejected']
+    })
+
+@app.route('/api/jobs/<file_id>', methods=['DELETE'])
+def cancel_job(file_id):
+    """Cancel a running job; its current stage stops at the next checkpoint."""
+    if scheduler.cancel(file_id):
+        jobs.finish(file_id)
+        update_status(file_id, 'cancelled', 100, 'Cancelled before processing started')
+        return jsonify({'status': 'cancelled', 'fileId': file_id}), 200
+    # The job can finish between these two steps; mark_cancelling then leaves its final stage alone
+    if not jobs.cancel(file_id) or not mark_cancelling(file_id):
+        return jsonify({'error': 'Job not found or already finished'}), 404
+    return jsonify({'status': 'cancelling', 'fileId': file_id}), 202
 
 @app.route('/api/status/<file_id>', methods=['GET'])
 def get_status(file_id):
     """Retrieve the processing status of an uploaded file."""
     status_file = os.path.join(app.config['STATUS_FOLDER'], f"{file_id}_status.json")
-    result_file = os.path.join(app.config['RESULTS_FOLDER'], f"{file_id}.json")
     
     if not os.path.exists(status_file):
         return jsonify({'error': 'Invalid or expired file ID'}), 404
@@ -94,24 +407,62 @@ def get_status(file_id):
     with open(status_file, 'r') as f:
         status = json.load(f)
     
-    if status['stage'] == 'completed' and os.path.exists(result_file):
-        with open(result_file, 'r') as f:
-            status['results'] = json.load(f)
+    if status['stage'] == 'queued':
+        status['queue_position'] = scheduler.position(file_id)
+    if status['stage'] == 'completed':
+        results = result_store.load(file_id, requested_fields())
+        if results is not None:
+            status['results'] = results
     
     return jsonify(status)
 
+def requested_fields():
+    """Parse the optional ?fields=A,B query parameter into a list (None means all fields)."""
+    fields = request.args.get('fields')
+    if not fields:
+        return None
+    return [name.strip() for name in fields.split(',') if name.strip()]
+
+@app.route('/api/results/<file_id>', methods=['GET'])
+def get_results(file_id):
+    """Return stored results, optionally limited to ?fields=ExecutiveSummary,Findings."""
+    results = result_store.load(file_id, requested_fields())
+    if results is None:
+        return jsonify({'error': 'Results not found'}), 404
+    return jsonify(results)
+
+@app.route('/api/results', methods=['GET'])
+def list_results():
+    """List stored results, newest first."""
+    limit = request.args.get('limit', type=int)
+    return jsonify({'results': result_store.list(limit)})
+
+@app.route('/api/scheduler', methods=['GET'])
+def scheduler_stats():
+    """Report queue depth, in-flight jobs and per-class queue wait times."""
+    return jsonify(scheduler.stats())
+
+@app.route('/api/models', methods=['GET'])
+def model_stats():
+    """Report loaded models with their load time and resident size."""
+    return jsonify(model_registry.stats())
+
+@app.route('/api/models/embeddings', methods=['GET'])
+def embedding_stats():
+    """Report embedding cache hit rates and the encode time they saved."""
+    return jsonify(embedding_cache_stats())
+
 @app.route('/api/download/<file_id>', methods=['GET'])
 def download_results(file_id):
     """Download the processed results for a given file ID."""
-    result_file = os.path.join(app.config['RESULTS_FOLDER'], f"{file_id}.json")
-    if not os.path.exists(result_file):
+    payload = result_store.dumps(file_id, requested_fields())
+    if payload is None:
         return jsonify({'error': 'Results not found'}), 404
     
-    return send_from_directory(
-        app.config['RESULTS_FOLDER'],
-        f"{file_id}.json",
-        as_attachment=True,
-        download_name='cybersecurity_report.json'
+    return Response(
+        payload,
+        mimetype='application/json',
+        headers={'Content-Disposition': 'attachment; filename=cybersecurity_report.json'}
     )
 
 if __name__ == '__main__':
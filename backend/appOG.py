@@ -2,12 +2,14 @@ from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 import os
 from summarizer import summarize_pdf  # Import the summarize_pdf function
+from config.config import Config
+from models.audio import audio_service
 
 app = Flask(__name__)
 CORS(app)
 
 UPLOAD_FOLDER = 'uploads/'
-AUDIO_FOLDER = 'audio/'
+AUDIO_FOLDER = Config.AUDIO_FOLDER
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['AUDIO_FOLDER'] = AUDIO_FOLDER
 
@@ -38,14 +40,7 @@ def upload_file():
         # Generate summary and other details
         result = summarize_pdf(file_path)
 
-        # Move the generated audio file to the AUDIO_FOLDER
-        audio_file_name = os.path.basename(result['audio_path'])
-        new_audio_path = os.path.join(app.config['AUDIO_FOLDER'], audio_file_name)
-        os.rename(result['audio_path'], new_audio_path)
-
-        # Update audio path in the result
-        result['audio_path'] = f"/audio/{audio_file_name}"
-
+        # audio_path is already the /audio/ URL; it becomes available while rendering
         return jsonify(result), 200
 
     except Exception as e:
@@ -54,7 +49,15 @@ def upload_file():
 
 @app.route('/audio/<filename>', methods=['GET'])
 def download_audio(filename):
-    return send_from_directory(app.config['AUDIO_FOLDER'], filename, as_attachment=True)
+    key = os.path.splitext(filename)[0]
+    path = audio_service.playable_path(key)
+    if path is None:
+        # Not started yet (or failed); clients poll until audio is available
+        status = audio_service.status(key)
+        return jsonify({'status': status}), 500 if status == 'failed' else 202
+    # While rendering, the partial file holds every paragraph finished so far
+    return send_from_directory(app.config['AUDIO_FOLDER'], os.path.basename(path), mimetype='audio/wav',
+                               max_age=0 if path.endswith('.partial.wav') else None)
 
 
 if __name__ == '__main__':
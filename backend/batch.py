@@ -0,0 +1,171 @@
+"""Offline batch processing for directories of PDF reports.
+
+Usage:
+    python -m backend.batch <directory> [--workers N] [--output DIR] [--manifest FILE]
+
+Documents are processed on a process pool. Every finished document is appended
+to a JSON-lines manifest keyed by content hash, so re-running the command after
+a crash (or on a directory with duplicates) skips work that is already done.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Any, List
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from pipeline.upload import scan_pdf_file, UploadRejected
+from storage.result_store import FileSystemResultStore
+
+_processor = None
+
+
+def _init_worker():
+    """Build one DocumentProcessor per worker process."""
+    global _processor
+    from main import DocumentProcessor
+    _processor = DocumentProcessor()
+
+
+def _process_one(pdf_path: str, sha256: str, output_dir: str) -> Dict[str, Any]:
+    started = time.perf_counter()
+    result = asyncio.run(_processor.process_document(pdf_path))
+    elapsed = time.perf_counter() - started
+    if not result or 'error' in result:
+        return {'status': 'failed', 'error': (result or {}).get('error', 'No result'), 'seconds': elapsed}
+    FileSystemResultStore(output_dir).save(sha256, result)
+    return {'status': 'done', 'seconds': elapsed}
+
+
+class Manifest:
+    """Append-only JSON-lines log of processed content hashes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash can leave a half-written last line; ignore it.
+                        continue
+                    self.entries[entry['sha256']] = entry
+
+    def is_done(self, sha256: str) -> bool:
+        return self.entries.get(sha256, {}).get('status') == 'done'
+
+    def record(self, entry: Dict[str, Any]):
+        entry = {**entry, 'recorded_at': datetime.now().isoformat()}
+        self.entries[entry['sha256']] = entry
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def find_pdfs(directory: str, recursive: bool = True) -> List[str]:
+    if not recursive:
+        return sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith('.pdf')
+        )
+    found = []
+    for root, _, names in os.walk(directory):
+        found.extend(os.path.join(root, name) for name in names if name.lower().endswith('.pdf'))
+    return sorted(found)
+
+
+def run_batch(directory: str, output_dir: str, manifest_path: str, workers: int,
+              recursive: bool = True) -> Dict[str, Any]:
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = Manifest(manifest_path)
+
+    pending = {}
+    skipped = 0
+    for pdf_path in find_pdfs(directory, recursive):
+        try:
+            info = scan_pdf_file(pdf_path)
+        except UploadRejected as e:
+            logging.warning(f"Skipping {pdf_path}: {e}")
+            continue
+        if manifest.is_done(info['sha256']) or info['sha256'] in pending:
+            skipped += 1
+            continue
+        pending[info['sha256']] = {'path': pdf_path, **info}
+
+    print(f"{len(pending)} documents to process, {skipped} already processed or duplicate")
+    if not pending:
+        return {'processed': 0, 'failed': 0, 'skipped': skipped}
+
+    done = failed = pages = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {
+            pool.submit(_process_one, entry['path'], sha256, output_dir): entry
+            for sha256, entry in pending.items()
+        }
+        for future in as_completed(futures):
+            entry = futures[future]
+            try:
+                outcome = future.result()
+            except Exception as e:
+                outcome = {'status': 'failed', 'error': str(e), 'seconds': 0.0}
+            manifest.record({
+                'sha256': entry['sha256'],
+                'path': entry['path'],
+                'pages': entry['pages'],
+                **outcome
+            })
+            if outcome['status'] == 'done':
+                done += 1
+                pages += entry['pages']
+            else:
+                failed += 1
+                logging.error(f"Failed {entry['path']}: {outcome.get('error')}")
+            print(f"[{done + failed}/{len(pending)}] {os.path.basename(entry['path'])}: "
+                  f"{outcome['status']} ({outcome['seconds']:.1f}s)")
+
+    elapsed = time.perf_counter() - started
+    summary = {
+        'processed': done,
+        'failed': failed,
+        'skipped': skipped,
+        'elapsed_seconds': elapsed,
+        'docs_per_minute': done / elapsed * 60 if elapsed else 0.0,
+        'pages_per_second': pages / elapsed if elapsed else 0.0
+    }
+    print(f"Processed {done} documents ({failed} failed) in {elapsed:.1f}s: "
+          f"{summary['docs_per_minute']:.2f} docs/min, {summary['pages_per_second']:.2f} pages/s")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Process a directory of PDF reports offline.")
+    parser.add_argument('directory', help="Directory containing PDF files")
+    parser.add_argument('--output', default=None, help="Where to write <sha256>.json results")
+    parser.add_argument('--manifest', default=None, help="Manifest used to skip and resume work")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--no-recursive', action='store_true', help="Do not descend into subdirectories")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    output_dir = args.output or os.path.join(args.directory, 'results')
+    manifest_path = args.manifest or os.path.join(output_dir, 'manifest.jsonl')
+    run_batch(args.directory, output_dir, manifest_path, args.workers, not args.no_recursive)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Compare two benchmark result files and fail on regressions.
+
+Usage:
+    python -m benchmarks.compare BASELINE.json CURRENT.json [--thresholds benchmarks/thresholds.json]
+                                 [--threshold 'extract.images/*=0.5'] [--min-delta 0.05]
+
+A benchmark regresses when its median time grows by more than its threshold
+(a fraction: 0.10 = 10% slower) and by more than ``min_delta`` seconds, which
+keeps millisecond-scale noise from failing the run. A benchmark that passed in
+the baseline and errors now also counts as a regression; a change in its output
+summary (text length, table or image count) is reported as a warning. Per-stage
+timings (``stages``) are kept next to the output and are not compared.
+
+Thresholds come from the JSON file (``default``, ``min_delta`` and fnmatch
+``overrides`` on result ids such as ``extract.tables/tables/50p``) and can be
+overridden with ``--threshold PATTERN=FRACTION``; the last matching pattern
+wins. Exits with status 1 when anything regressed.
+"""
+import os
+import sys
+import json
+import argparse
+from fnmatch import fnmatch
+from typing import Any, Dict, List, Tuple
+
+DEFAULT_THRESHOLDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'thresholds.json')
+
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    return {entry['id']: entry for entry in report['results']}
+
+
+def load_thresholds(path: str) -> Dict[str, Any]:
+    thresholds = {'default': 0.10, 'min_delta': 0.05, 'overrides': {}}
+    if path and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            thresholds.update(json.load(f))
+    return thresholds
+
+
+def threshold_for(result_id: str, thresholds: Dict[str, Any]) -> float:
+    limit = thresholds['default']
+    for pattern, value in thresholds['overrides'].items():
+        if fnmatch(result_id, pattern):
+            limit = value
+    return limit
+
+
+def compare(baseline: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]],
+            thresholds: Dict[str, Any]) -> Tuple[List[str], List[str], List[str]]:
+    """Return (rows, regressions, warnings) for the results present in both files."""
+    rows, regressions, warnings = [], [], []
+    for result_id in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[result_id], current[result_id]
+        if before['status'] != 'ok':
+            continue
+        if after['status'] != 'ok':
+            if after['status'] == 'error':
+                regressions.append(f"{result_id}: now fails ({after.get('detail')})")
+            continue
+
+        limit = threshold_for(result_id, thresholds)
+        delta = after['seconds'] - before['seconds']
+        change = delta / before['seconds'] if before['seconds'] else 0.0
+        regressed = change > limit and delta > thresholds['min_delta']
+        flag = 'REGRESSION' if regressed else ('faster' if change < -limit else '')
+        rows.append(f"{result_id:<48} {before['seconds']:>9.3f}s {after['seconds']:>9.3f}s "
+                    f"{change:>+8.1%}  (limit {limit:.0%}) {flag}")
+        if regressed:
+            regressions.append(f"{result_id}: {before['seconds']:.3f}s -> {after['seconds']:.3f}s "
+                               f"({change:+.1%}, limit {limit:.0%})")
+        if before.get('output') != after.get('output'):
+            warnings.append(f"{result_id}: output changed {before.get('output')} -> {after.get('output')}")
+
+    for result_id in sorted(baseline.keys() - current.keys()):
+        warnings.append(f"{result_id}: missing from the current run")
+    return rows, regressions, warnings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--thresholds', default=DEFAULT_THRESHOLDS)
+    parser.add_argument('--threshold', action='append', default=[], metavar='PATTERN=FRACTION')
+    parser.add_argument('--min-delta', type=float, help="Ignore slowdowns smaller than this many seconds")
+    args = parser.parse_args()
+
+    thresholds = load_thresholds(args.thresholds)
+    thresholds['overrides'] = dict(thresholds['overrides'])
+    for override in args.threshold:
+        pattern, _, value = override.rpartition('=')
+        thresholds['overrides'][pattern] = float(value)
+    if args.min_delta is not None:
+        thresholds['min_delta'] = args.min_delta
+
+    rows, regressions, warnings = compare(load_results(args.baseline), load_results(args.current), thresholds)
+    print(f"{'benchmark':<48} {'baseline':>10} {'current':>10} {'change':>8}")
+    for row in rows:
+        print(row)
+    for warning in warnings:
+        print(f"warning: {warning}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
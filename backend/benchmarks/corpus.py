@@ -0,0 +1,225 @@
+"""Synthetic vulnerability-report PDFs for the benchmark suite.
+
+Usage:
+    python -m benchmarks.corpus --profile tables --pages 200 [--out benchmarks/corpus] [--seed 7]
+
+Profiles:
+    text    - paragraphs of findings on a text layer
+    scanned - the same pages rasterized, with no text layer (forces OCR)
+    tables  - ruled findings tables (host, CVE, severity, CVSS, solution)
+    images  - a short finding plus generated charts and screenshots per page
+
+Documents are deterministic for a given profile, page count and seed, and are
+written once per combination and reused afterwards.
+"""
+import io
+import os
+import random
+import argparse
+from typing import List
+
+import fitz  # PyMuPDF
+from PIL import Image, ImageDraw
+
+PROFILES = ('text', 'scanned', 'tables', 'images')
+MIN_PAGES = 5
+MAX_PAGES = 1000
+
+PAGE_WIDTH, PAGE_HEIGHT = fitz.paper_size('letter')
+MARGIN = 54
+_FONT = fitz.Font('helv')
+_BOLD_FONT = fitz.Font('hebo')
+_DARKEN = bytes(value // 4 for value in range(256))
+
+_HOSTS = ['web-01', 'web-02', 'db-01', 'mail-gw', 'vpn-edge', 'dc-01', 'files-03', 'build-07', 'jump-01']
+_PRODUCTS = ['OpenSSL', 'Apache HTTP Server', 'Mozilla Firefox', 'Oracle Java SE', 'Microsoft Exchange',
+             'OpenSSH', 'Adobe Acrobat', 'nginx', 'PHP', 'Samba']
+_SEVERITIES = [('Critical', 9.8), ('High', 8.1), ('Medium', 5.3), ('Low', 3.1)]
+_IMPACTS = ['remote code execution', 'privilege escalation', 'information disclosure', 'denial of service',
+            'authentication bypass', 'cross-site scripting', 'SQL injection']
+
+
+def _finding(rng: random.Random) -> dict:
+    product = rng.choice(_PRODUCTS)
+    severity, cvss = rng.choice(_SEVERITIES)
+    major, minor = rng.randint(1, 12), rng.randint(0, 40)
+    return {
+        'host': f"{rng.choice(_HOSTS)}.corp.example",
+        'cve': f"CVE-{rng.randint(2015, 2024)}-{rng.randint(1000, 49999)}",
+        'severity': severity,
+        'cvss': f"{max(0.1, cvss + rng.uniform(-0.6, 0.6)):.1f}",
+        'product': product,
+        'version': f"{major}.{minor}",
+        'fixed': f"{major}.{minor + rng.randint(1, 5)}",
+        'impact': rng.choice(_IMPACTS),
+    }
+
+
+def _finding_paragraph(finding: dict) -> str:
+    return (
+        f"{finding['severity']} severity finding {finding['cve']} (CVSS {finding['cvss']}) affects "
+        f"{finding['product']} {finding['version']} on {finding['host']}. Successful exploitation allows "
+        f"{finding['impact']}. The vulnerable service was reachable from the scanned subnet during the "
+        f"assessment window. Upgrade {finding['product']} to {finding['fixed']} or later and restrict "
+        f"access to the management interface until the patch is deployed."
+    )
+
+
+def _text_page_content(rng: random.Random, page_number: int) -> str:
+    title = f"{page_number}. Findings" if page_number > 1 else "1. Executive Summary"
+    paragraphs = [_finding_paragraph(_finding(rng)) for _ in range(6)]
+    return title + "\n\n" + "\n\n".join(paragraphs)
+
+
+def _write_text_page(doc, rng: random.Random, page_number: int):
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    box = fitz.Rect(MARGIN, MARGIN, PAGE_WIDTH - MARGIN, PAGE_HEIGHT - MARGIN)
+    page.insert_textbox(box, _text_page_content(rng, page_number), fontsize=10, fontname='helv')
+
+
+def _write_scanned_page(doc, rng: random.Random, page_number: int, dpi: int = 150):
+    # Lay the page out as text, rasterize it and keep only the picture, like a scanner would
+    source = fitz.open()
+    _write_text_page(source, rng, page_number)
+    pixmap = source[0].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+    source.close()
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    page.insert_image(page.rect, stream=pixmap.tobytes('png'))
+
+
+def _write_table_page(doc, rng: random.Random, page_number: int, rows: int = 24):
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    page.insert_text((MARGIN, MARGIN), f"Table {page_number}: open findings", fontsize=12, fontname='helv')
+    columns = [('Host', 130), ('CVE', 95), ('Severity', 60), ('CVSS', 40), ('Solution', 179)]
+    row_height = 24
+    top = MARGIN + 16
+    lines = [['Host', 'CVE', 'Severity', 'CVSS', 'Solution']]
+    for _ in range(rows):
+        finding = _finding(rng)
+        lines.append([finding['host'], finding['cve'], finding['severity'], finding['cvss'],
+                      f"Upgrade {finding['product']} to {finding['fixed']}"])
+
+    shape = page.new_shape()
+    right = MARGIN + sum(width for _, width in columns)
+    for row_index in range(len(lines) + 1):
+        y = top + row_index * row_height
+        shape.draw_line((MARGIN, y), (right, y))
+    x = MARGIN
+    for _, width in columns + [('', 0)]:
+        shape.draw_line((x, top), (x, top + len(lines) * row_height))
+        x += width
+    shape.finish(color=(0, 0, 0), width=0.6)
+    shape.commit()
+
+    # One TextWriter per page: a text box per cell makes large documents very slow to build
+    writer = fitz.TextWriter(page.rect)
+    for row_index, cells in enumerate(lines):
+        x = MARGIN
+        for (_, width), cell in zip(columns, cells):
+            writer.append((x + 3, top + row_index * row_height + 15), cell, fontsize=7,
+                          font=_BOLD_FONT if row_index == 0 else _FONT)
+            x += width
+    writer.write_text(page)
+
+
+def _chart_png(rng: random.Random, width: int = 480, height: int = 280) -> bytes:
+    """A bar chart of findings per severity."""
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+    colors = [(180, 30, 30), (230, 120, 20), (230, 200, 40), (60, 140, 60)]
+    bar_width = width // (2 * len(colors))
+    for index, color in enumerate(colors):
+        bar_height = rng.randint(20, height - 40)
+        left = bar_width // 2 + index * 2 * bar_width
+        draw.rectangle([left, height - 20 - bar_height, left + bar_width, height - 20], fill=color)
+    draw.line([(10, height - 20), (width - 10, height - 20)], fill='black', width=2)
+    return _png_bytes(image)
+
+
+def _screenshot_png(rng: random.Random, width: int = 480, height: int = 300) -> bytes:
+    """A noisy terminal-like capture; incompressible detail makes it costly to encode."""
+    pixels = rng.randbytes(width * height).translate(_DARKEN)
+    image = Image.frombytes('L', (width, height), pixels).convert('RGB')
+    draw = ImageDraw.Draw(image)
+    for line in range(12):
+        draw.text((12, 10 + line * 22), f"$ nmap -sV {rng.choice(_HOSTS)}  {_finding(rng)['cve']}", fill=(90, 220, 90))
+    return _png_bytes(image)
+
+
+def _png_bytes(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def _write_image_page(doc, rng: random.Random, page_number: int):
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    text_box = fitz.Rect(MARGIN, MARGIN, PAGE_WIDTH - MARGIN, MARGIN + 110)
+    page.insert_textbox(text_box, _finding_paragraph(_finding(rng)), fontsize=10, fontname='helv')
+    usable = PAGE_WIDTH - 2 * MARGIN
+    page.insert_image(fitz.Rect(MARGIN, MARGIN + 120, MARGIN + usable, MARGIN + 380), stream=_chart_png(rng))
+    page.insert_image(fitz.Rect(MARGIN, MARGIN + 400, MARGIN + usable, PAGE_HEIGHT - MARGIN),
+                      stream=_screenshot_png(rng))
+
+
+_WRITERS = {
+    'text': _write_text_page,
+    'scanned': _write_scanned_page,
+    'tables': _write_table_page,
+    'images': _write_image_page,
+}
+
+
+def corpus_path(out_dir: str, profile: str, pages: int, seed: int = 7) -> str:
+    return os.path.join(out_dir, f"{profile}_{pages}p_seed{seed}.pdf")
+
+
+def generate_pdf(profile: str, pages: int, out_dir: str, seed: int = 7, overwrite: bool = False) -> str:
+    """Write (or reuse) the synthetic report for ``profile`` and ``pages`` and return its path."""
+    if profile not in _WRITERS:
+        raise ValueError(f"Unknown profile '{profile}'. Expected one of: {', '.join(PROFILES)}")
+    if not MIN_PAGES <= pages <= MAX_PAGES:
+        raise ValueError(f"Page count must be between {MIN_PAGES} and {MAX_PAGES}, got {pages}")
+    path = corpus_path(out_dir, profile, pages, seed)
+    if os.path.exists(path) and not overwrite:
+        return path
+
+    os.makedirs(out_dir, exist_ok=True)
+    # One stream per document, so a page's content does not depend on the page count
+    rng = random.Random(f"{profile}:{seed}")
+    doc = fitz.open()
+    for page_number in range(1, pages + 1):
+        _WRITERS[profile](doc, rng, page_number)
+    doc.set_metadata({
+        'title': f"Synthetic {profile} vulnerability assessment ({pages} pages)",
+        'author': 'benchmarks.corpus',
+        'subject': 'Network vulnerability assessment',
+        'creationDate': 'D:20240101000000',
+    })
+    tmp_path = f"{path}.tmp"
+    doc.save(tmp_path, garbage=3, deflate=True)
+    doc.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+def generate_corpus(profiles: List[str], page_counts: List[int], out_dir: str, seed: int = 7) -> List[str]:
+    return [generate_pdf(profile, pages, out_dir, seed) for profile in profiles for pages in page_counts]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic vulnerability-report PDFs.")
+    parser.add_argument('--profile', default=','.join(PROFILES), help="Comma-separated profiles")
+    parser.add_argument('--pages', default='5,50', help=f"Comma-separated page counts ({MIN_PAGES}-{MAX_PAGES})")
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(__file__), 'corpus'))
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    profiles = [profile.strip() for profile in args.profile.split(',') if profile.strip()]
+    page_counts = [int(pages) for pages in args.pages.split(',') if pages.strip()]
+    for path in generate_corpus(profiles, page_counts, args.out, args.seed):
+        print(f"{path}  ({os.path.getsize(path) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
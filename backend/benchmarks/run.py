@@ -0,0 +1,369 @@
+"""End-to-end benchmark suite.
+
+Usage:
+    python -m benchmarks.run [--profiles text,scanned,tables,images] [--pages 5,50]
+                             [--only extract.,document_processor] [--repeat 3]
+                             [--llm-latency 0] [--output results.json]
+
+Generates (or reuses) the synthetic corpus from benchmarks.corpus, then times
+each extractor, the summarizers and the full DocumentProcessor with the LLM
+replaced by a canned report. Every benchmark runs ``--repeat`` times on every
+document and the median is reported. Results are written as JSON, by default
+to benchmarks/results/<commit>_<timestamp>.json; compare two runs with
+``python -m benchmarks.compare``.
+
+Benchmarks whose dependencies are missing (the tesseract binary, torch and
+the local T5 models) are recorded as skipped rather than failing the run.
+"""
+import gc
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import logging
+import platform
+import argparse
+import statistics
+import subprocess
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime
+from fnmatch import fnmatch
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.corpus import PROFILES, generate_pdf
+
+RESULTS_SCHEMA = 1
+# Key a benchmark's summary may carry per-stage wall times under; they are not output
+STAGES_KEY = '_stages'
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Stands in for the LLM so DocumentProcessor timings measure the pipeline only
+STUB_REPORT = """Executive Summary
+The assessment identified critical and high severity vulnerabilities across the scanned hosts.
+
+Introduction
+This synthetic report is returned by the benchmark's stubbed LLM.
+
+Findings
+Outdated OpenSSL and Apache HTTP Server builds are exposed on several hosts.
+
+Results
+[{"host": "web-01.corp.example", "cve": "CVE-2021-44228", "severity": "Critical"},
+ {"host": "db-01.corp.example", "cve": "CVE-2019-0708", "severity": "High"}]
+
+Recommendations
+Patch the affected services and restrict access to management interfaces.
+
+Conclusion
+Remediating the critical findings removes most of the exposure."""
+
+
+class SkipBenchmark(Exception):
+    """Raised by a benchmark whose dependencies are not available here."""
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, cwd=BENCHMARK_DIR
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def tesseract_available() -> bool:
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+@contextmanager
+def working_directory(path: str):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+class Suite:
+    """The benchmarks by name: each takes a PDF path and returns a small summary of its output.
+
+    The output (character, table or image counts) is stored with the timing so
+    a benchmark that got faster by silently producing less shows up in a diff.
+    It must be deterministic; per-stage timings go under ``STAGES_KEY`` and are
+    stored separately.
+    """
+
+    def __init__(self, has_tesseract: bool, llm_latency: float, workdir: str):
+        self.has_tesseract = has_tesseract
+        self.llm_latency = llm_latency
+        self.workdir = workdir
+        self._summarizers: Dict[str, Any] = {}
+        self._texts: Dict[str, str] = {}
+        self.benchmarks: Dict[str, Dict[str, Any]] = {}
+        self._register()
+
+    def _add(self, name: str, func: Callable[[str], Any], profiles=PROFILES, needs_ocr=('scanned',),
+             setup: Optional[Callable[[str], None]] = None):
+        """Register ``func`` for ``profiles``; on ``needs_ocr`` profiles it is skipped without tesseract.
+
+        ``setup(pdf_path)`` runs once before the timed runs on each document.
+        """
+        self.benchmarks[name] = {'func': func, 'profiles': set(profiles), 'needs_ocr': set(needs_ocr),
+                                 'setup': setup}
+
+    def _register(self):
+        # Text-layer extractors just come back empty on scanned pages; that is still worth timing
+        self._add('extract.pdfplumber', self.extract_pdfplumber, needs_ocr=())
+        self._add('extract.pymupdf', self.extract_pymupdf, needs_ocr=())
+        self._add('extract.ocr', self.extract_ocr, profiles=('scanned',))
+        self._add('extract.tables', self.extract_tables, needs_ocr=())
+        self._add('extract.images', self.extract_images, needs_ocr=())
+        self._add('extract.metadata', self.extract_metadata, needs_ocr=())
+        self._add('extract.page_visitor', self.extract_page_visitor)
+        # Extraction and model loading happen in setup, outside the summarizer timings
+        self._add('summarize.preprocess', self.summarize_preprocess, profiles=('text', 'tables'),
+                  setup=self._text_for)
+        self._add('summarize.optimized', self.summarize_optimized, profiles=('text', 'tables'),
+                  setup=lambda pdf_path: (self._text_for(pdf_path), self._optimized_summarizer()))
+        self._add('summarize.sections', self.summarize_sections, profiles=('text', 'tables'),
+                  setup=lambda pdf_path: (self._text_for(pdf_path), self._sections_summarizer()))
+        self._add('document_processor.cold', self.document_processor_cold, setup=self._import_pipeline)
+        self._add('document_processor.cached', self.document_processor_cached, setup=self._prime_cache)
+
+    # --- extractors ------------------------------------------------------------
+
+    def extract_pdfplumber(self, pdf_path):
+        from extractors.text_extractor import TextExtractor
+        return {'chars': len(TextExtractor().extract_text_with_plumber(pdf_path))}
+
+    def extract_pymupdf(self, pdf_path):
+        from extractors.text_extractor import TextExtractor
+        return {'chars': len(TextExtractor().extract_text_with_pymupdf(pdf_path))}
+
+    def extract_ocr(self, pdf_path):
+        from extractors.text_extractor import TextExtractor
+        return {'chars': len(TextExtractor().extract_text_with_ocr(pdf_path))}
+
+    def extract_tables(self, pdf_path):
+        from extractors.table_extractor import TableExtractor
+        return {'tables': len(TableExtractor().extract(pdf_path))}
+
+    def extract_images(self, pdf_path):
+        from extractors.image_extractor import ImageExtractor
+        return {'images': len(ImageExtractor().extract(pdf_path))}
+
+    def extract_metadata(self, pdf_path):
+        from extractors.metadata_extractor import MetadataExtractor
+        return {'fields': len(MetadataExtractor().extract(pdf_path))}
+
+    def extract_page_visitor(self, pdf_path):
+        from extractors.page_visitor import PdfPageVisitor
+        content = PdfPageVisitor(images=False, ocr=self.has_tesseract).visit(pdf_path)
+        return {'chars': len(content.text), 'tables': sum(len(page.tables) for page in content.pages)}
+
+    # --- summarizers -----------------------------------------------------------
+
+    def _text_for(self, pdf_path: str) -> str:
+        if pdf_path not in self._texts:
+            from extractors.text_extractor import TextExtractor
+            self._texts[pdf_path] = TextExtractor().extract_text_with_pymupdf(pdf_path)
+        return self._texts[pdf_path]
+
+    def _summarizer(self, name: str, factory: Callable[[], Any]):
+        if name not in self._summarizers:
+            try:
+                self._summarizers[name] = factory()
+            except (ImportError, OSError) as e:
+                self._summarizers[name] = SkipBenchmark(f"{name} unavailable: {e}")
+        summarizer = self._summarizers[name]
+        if isinstance(summarizer, SkipBenchmark):
+            raise summarizer
+        return summarizer
+
+    def summarize_preprocess(self, pdf_path):
+        from models.text_normalization import preprocess_text
+        return {'chars': len(preprocess_text(self._text_for(pdf_path)))}
+
+    def _optimized_summarizer(self):
+        def factory():
+            from processors.summarizer import OptimizedSummarizer
+            return OptimizedSummarizer()
+        return self._summarizer('OptimizedSummarizer', factory)
+
+    def _sections_summarizer(self):
+        def factory():
+            from models.summarization_model import SummarizationModel
+            return SummarizationModel()
+        return self._summarizer('SummarizationModel', factory)
+
+    def summarize_optimized(self, pdf_path):
+        summary, _ = self._optimized_summarizer().summarize(self._text_for(pdf_path))
+        return {'chars': len(summary)}
+
+    def summarize_sections(self, pdf_path):
+        summary = self._sections_summarizer().summarize(self._text_for(pdf_path))
+        return {'sections': len(summary)}
+
+    # --- full pipeline ---------------------------------------------------------
+
+    def _stub_llm(self, raw_text, cancel_token=None):
+        if cancel_token:
+            cancel_token.check()
+        if self.llm_latency:
+            time.sleep(self.llm_latency)
+        return STUB_REPORT
+
+    def _import_pipeline(self, pdf_path=None):
+        # intro.py builds its API client at import; the stub means it is never called
+        os.environ.setdefault('GITHUB_TOKEN', 'benchmark-stub')
+        import main  # noqa: F401
+
+    def _run_document_processor(self, pdf_path, cache_dir):
+        import main
+        from pipeline.tracing import Tracer
+        from storage.artifact_cache import ArtifactCache
+
+        main.generate_audit_report = self._stub_llm
+        tracer = Tracer(os.path.basename(pdf_path))
+        # The default artifact cache and the report JSON both live under the working directory
+        with working_directory(self.workdir), tracer.activate():
+            processor = main.DocumentProcessor()
+            processor.artifacts = ArtifactCache(cache_dir)
+            result = asyncio.run(processor.process_document(os.path.abspath(pdf_path)))
+        if 'error' in result:
+            raise RuntimeError(result['error'])
+        stages = tracer.breakdown()['stages']
+        return {
+            'sections': len(result),
+            'chars': len(json.dumps(result, ensure_ascii=False)),
+            # Timings, not output: run_benchmark moves them out of the compared summary
+            STAGES_KEY: {name: round(stage['wall_seconds'], 6) for name, stage in stages.items()
+                         if name in ('extraction', 'llm', 'persistence')}
+        }
+
+    def document_processor_cold(self, pdf_path):
+        return self._run_document_processor(pdf_path, tempfile.mkdtemp(dir=self.workdir))
+
+    def _prime_cache(self, pdf_path):
+        self._import_pipeline()
+        self._run_document_processor(pdf_path, os.path.join(self.workdir, 'warm-cache'))
+
+    def document_processor_cached(self, pdf_path):
+        return self._run_document_processor(pdf_path, os.path.join(self.workdir, 'warm-cache'))
+
+
+def run_benchmark(func: Callable[[str], Any], pdf_path: str, repeat: int,
+                  setup: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    if setup:
+        setup(pdf_path)
+    timings = []
+    stage_runs: Dict[str, List[float]] = {}
+    output = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        output = func(pdf_path)
+        timings.append(time.perf_counter() - started)
+        if isinstance(output, dict) and STAGES_KEY in output:
+            output = dict(output)
+            for stage, seconds in output.pop(STAGES_KEY).items():
+                stage_runs.setdefault(stage, []).append(seconds)
+    result = {'seconds': statistics.median(timings), 'min_seconds': min(timings),
+              'runs': [round(t, 6) for t in timings], 'output': output}
+    if stage_runs:
+        result['stages'] = {stage: statistics.median(runs) for stage, runs in stage_runs.items()}
+    return result
+
+
+def run_suite(suite: Suite, selected: List[str], profiles: List[str], page_counts: List[int],
+              corpus_dir: str, seed: int, repeat: int) -> List[Dict[str, Any]]:
+    results = []
+    for profile in profiles:
+        for pages in page_counts:
+            pdf_path = generate_pdf(profile, pages, corpus_dir, seed)
+            for name in selected:
+                if profile not in suite.benchmarks[name]['profiles']:
+                    continue
+                entry = {'id': f"{name}/{profile}/{pages}p", 'benchmark': name, 'profile': profile, 'pages': pages}
+                try:
+                    if profile in suite.benchmarks[name]['needs_ocr'] and not suite.has_tesseract:
+                        raise SkipBenchmark("tesseract is not installed")
+                    benchmark = suite.benchmarks[name]
+                    entry.update(run_benchmark(benchmark['func'], pdf_path, repeat, benchmark['setup']))
+                    entry['status'] = 'ok'
+                    entry['pages_per_second'] = pages / entry['seconds'] if entry['seconds'] else None
+                    print(f"{entry['id']:<48} {entry['seconds']:>9.3f}s  {entry['pages_per_second']:>9.1f} pages/s")
+                except SkipBenchmark as e:
+                    entry.update(status='skipped', detail=str(e))
+                    print(f"{entry['id']:<48} skipped: {e}")
+                except Exception as e:
+                    entry.update(status='error', detail=f"{type(e).__name__}: {e}")
+                    print(f"{entry['id']:<48} error: {e}")
+                results.append(entry)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the end-to-end benchmark suite.")
+    parser.add_argument('--profiles', default=','.join(PROFILES))
+    parser.add_argument('--pages', default='5,50', help="Comma-separated page counts (5-1000)")
+    parser.add_argument('--only', default='', help="Comma-separated benchmark name patterns (fnmatch or prefix)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--corpus', default=os.path.join(BENCHMARK_DIR, 'corpus'))
+    parser.add_argument('--llm-latency', type=float, default=0.0, help="Seconds the stubbed LLM sleeps per call")
+    parser.add_argument('--output', help="Results file (default benchmarks/results/<commit>_<timestamp>.json)")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    profiles = [profile.strip() for profile in args.profiles.split(',') if profile.strip()]
+    page_counts = [int(pages) for pages in args.pages.split(',') if pages.strip()]
+    patterns = [pattern.strip() for pattern in args.only.split(',') if pattern.strip()]
+
+    workdir = tempfile.mkdtemp(prefix='benchmarks-')
+    suite = Suite(tesseract_available(), args.llm_latency, workdir)
+    selected = [name for name in suite.benchmarks
+                if not patterns or any(fnmatch(name, p) or name.startswith(p) for p in patterns)]
+
+    commit = git_commit()
+    report = {
+        'schema': RESULTS_SCHEMA,
+        'commit': commit,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'llm_latency': args.llm_latency,
+        'results': []
+    }
+
+    try:
+        report['results'] = run_suite(suite, selected, profiles, page_counts, args.corpus, args.seed, args.repeat)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(
+        BENCHMARK_DIR, 'results', f"{commit or 'nocommit'}_{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(report['results'])} results to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,10 +6,29 @@ class Config:
     T5_MODEL_NAME = "t5-base"
     T5_LOCAL_PATH = "./models/t5_model"
     BERT_MODEL_NAME = "multi-qa-mpnet-base-dot-v1"
-    SPACY_MODEL = "en_core_web_trf"
+    # Only noun chunks and sentence parses are used, which the small model covers
+    SPACY_MODEL = os.getenv('SPACY_MODEL', 'en_core_web_sm')
+    # Models to load at startup as 'kind:name' (t5, bart, spacy, sentence, languagetool), comma separated.
+    # With gunicorn --preload they are loaded once in the master and shared by workers.
+    PRELOAD_MODELS = [spec for spec in os.getenv('PRELOAD_MODELS', '').split(',') if spec.strip()]
+    MODEL_MEMORY_BUDGET_MB = float(os.getenv('MODEL_MEMORY_BUDGET_MB', '0'))  # 0 disables eviction
+    MODEL_IDLE_SECONDS = float(os.getenv('MODEL_IDLE_SECONDS', '300'))
+    # T5 inference backend: 'torch' (fp32), 'int8' (dynamic quantization) or 'onnx' (ONNX Runtime)
+    T5_BACKEND = os.getenv('T5_BACKEND', 'torch')
+    MODEL_CACHE_DIR = os.getenv('MODEL_CACHE_DIR', './models/cache')
+    # How cached model files are checked against their manifest at startup: 'size' (cheap)
+    # or 'checksum', which re-hashes every checkpoint file and can take seconds per model
+    MODEL_CACHE_VERIFY = os.getenv('MODEL_CACHE_VERIFY', 'size')
+    # Sentence embeddings kept in memory (LRU), and an optional folder persisting them across restarts
+    EMBEDDING_CACHE_SIZE = int(os.getenv('EMBEDDING_CACHE_SIZE', '50000'))
+    EMBEDDING_CACHE_DIR = os.getenv('EMBEDDING_CACHE_DIR')
     
     # Processing settings
     CHUNK_SIZE = 1000
+    # Batched chunk summarization: padded input tokens per generate call, and
+    # processes to shard batches across on CPU hosts (1 = in-process)
+    CHUNK_BATCH_TOKENS = int(os.getenv('CHUNK_BATCH_TOKENS', '8192'))
+    CHUNK_WORKERS = int(os.getenv('CHUNK_WORKERS', '1'))
     MAX_SUMMARY_LENGTH = 300
     MIN_SUMMARY_LENGTH = 50
     OCR_RESOLUTION = 300
@@ -17,20 +36,61 @@ class Config:
     # File paths
     FEEDBACK_FILE = "feedback_data.json"
     UPLOAD_FOLDER = 'uploads/'
+    AUDIO_FOLDER = os.getenv('AUDIO_FOLDER', 'audio/')
+    AUDIO_URL_PREFIX = '/audio/'
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
-    
+    MAX_PDF_PAGES = int(os.getenv('MAX_PDF_PAGES', '1000'))  # 0 disables the page limit
+    MAX_BATCH_FILES = int(os.getenv('MAX_BATCH_FILES', '200'))
+    # Whole /api/batch request body; each PDF in it is still held to MAX_CONTENT_LENGTH
+    MAX_BATCH_CONTENT_LENGTH = int(os.getenv('MAX_BATCH_CONTENT_LENGTH', str(1024 * 1024 * 1024)))  # 1GB
+
+    # Result storage
+    RESULT_STORE_BACKEND = os.getenv('RESULT_STORE_BACKEND', 'filesystem')  # 'filesystem' or 'sqlite'
+    RESULT_STORE_PATH = os.getenv('RESULT_STORE_PATH')  # Folder or .db file; backend default if unset
+    # Results older than this many days are deleted when the app starts; 0 keeps them forever
+    RESULT_RETENTION_DAYS = float(os.getenv('RESULT_RETENTION_DAYS', '0'))
+
+    # Content-addressed artifact cache (SQLite index + blob files); 0 MB disables the size cap
+    ARTIFACT_CACHE_DIR = os.getenv('ARTIFACT_CACHE_DIR', 'cache/artifacts')
+    ARTIFACT_CACHE_MAX_MB = float(os.getenv('ARTIFACT_CACHE_MAX_MB', '1024'))
+
+    # Job scheduling
+    SCHEDULER_WORKERS = int(os.getenv('SCHEDULER_WORKERS', '2'))
+    PER_CLIENT_CONCURRENCY = int(os.getenv('PER_CLIENT_CONCURRENCY', '1'))
+    # Proxy addresses allowed to name the client with X-Client-Id; anyone else is keyed by address
+    TRUSTED_PROXIES = {addr.strip() for addr in os.getenv('TRUSTED_PROXIES', '').split(',') if addr.strip()}
+
+    # Per-stage deadlines for DocumentProcessor jobs in seconds; 0 disables a stage's timeout
+    STAGE_TIMEOUTS = {
+        'extraction': float(os.getenv('EXTRACTION_TIMEOUT', '600')),
+        'llm': float(os.getenv('LLM_TIMEOUT', '300')),
+        'persistence': float(os.getenv('PERSISTENCE_TIMEOUT', '60')),
+    }
+
+    # Metrics: with several worker processes (gunicorn) point this at an empty,
+    # shared folder so /metrics aggregates all of them; prometheus_client reads
+    # the same variable when it is imported.
+    PROMETHEUS_MULTIPROC_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+
     # Logging configuration
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     LOG_LEVEL = "INFO"
     LOG_FILE = "pdf_summarizer.log"
     LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+    # Share of records whose verbose payload (text, reports, result JSON) is kept, and its cap in characters
+    LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv('LOG_PAYLOAD_SAMPLE_RATE', '0.01'))
+    LOG_PAYLOAD_MAX_CHARS = int(os.getenv('LOG_PAYLOAD_MAX_CHARS', '2000'))
     
     # Debug settings
     DEBUG = os.getenv('DEBUG', 'False').lower() == 'true'
     
     @classmethod
     def get_log_config(cls):
-        """Get logging configuration dictionary."""
+        """Get logging configuration dictionary.
+
+        These are the output handlers; pipeline.logs.configure_logging puts
+        them behind a queue so they run on a listener thread.
+        """
         return {
             'version': 1,
             'disable_existing_loggers': False,
@@ -39,17 +99,21 @@ class Config:
                     'format': cls.LOG_FORMAT,
                     'datefmt': cls.LOG_DATE_FORMAT,
                 },
+                'json': {
+                    '()': 'pipeline.logs.JsonFormatter',
+                    'max_payload_chars': cls.LOG_PAYLOAD_MAX_CHARS,
+                },
             },
             'handlers': {
                 'console': {
                     'level': cls.LOG_LEVEL,
-                    'formatter': 'standard',
+                    'formatter': 'json',
                     'class': 'logging.StreamHandler',
                     'stream': 'ext://sys.stdout',
                 },
                 'file': {
                     'level': 'DEBUG',
-                    'formatter': 'standard',
+                    'formatter': 'json',
                     'class': 'logging.FileHandler',
                     'filename': cls.LOG_FILE,
                     'mode': 'a',
@@ -31,7 +31,7 @@ class ImageExtractor:
     def __init__(self, config: ImageConfig = None):
         self.config = config or ImageConfig()
         self.processed_hashes = set()
-        self._setup_logging()
+        self.logger = logging.getLogger(__name__)
 
     def _optimize_image_storage(self, image: Image.Image) -> bytes:
         """Optimize image storage while maintaining quality"""
@@ -49,7 +49,7 @@ class ImageExtractor:
             
             return buffer.getvalue()
         except Exception as e:
-            logging.error(f"Image optimization failed: {e}")
+            self.logger.error(f"Image optimization failed: {e}")
             return None
 
 
@@ -77,17 +77,11 @@ class ImageExtractor:
             
             return image
         except Exception as e:
-            logging.error(f"Image enhancement failed: {e}")
+            self.logger.error(f"Image enhancement failed: {e}")
             return image
         
-    def _setup_logging(self):
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
 
-    def extract(self, pdf_path: str,  *args, **kwargs) -> List[Dict]:
+    def extract(self, pdf_path: str,  *args, cancel_token=None, **kwargs) -> List[Dict]:
         """Extract and process images from PDF."""
         images_data = []
         total_processed = 0
@@ -99,24 +93,31 @@ class ImageExtractor:
                 with ThreadPoolExecutor() as executor:
                     futures = []
                     for page_num, page in enumerate(pdf.pages, 1):
-                        future = executor.submit(self._process_page, page, page_num)
+                        future = executor.submit(self._process_page, page, page_num, cancel_token)
                         futures.append(future)
                     
-                    for future in futures:
-                        page_images = future.result()
-                        if page_images:
-                            images_data.extend(page_images)
-                        total_processed += 1
+                    try:
+                        for future in futures:
+                            page_images = future.result()
+                            if page_images:
+                                images_data.extend(page_images)
+                            total_processed += 1
+                    except BaseException:
+                        # Cancellation or timeout: drop queued pages instead of rendering them.
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        raise
                         
                 
         except Exception as e:
-            logging.error(f"PDF processing error: {str(e)}")
+            self.logger.error(f"PDF processing error: {str(e)}")
         
         return self._deduplicate_images(images_data)
 
-    def _process_page(self, page, page_num: int) -> List[Dict]:
+    def _process_page(self, page, page_num: int, cancel_token=None) -> List[Dict]:
         """Process single page for image extraction."""
         page_images = []
+        if cancel_token:
+            cancel_token.check()
         
         try:
             # Extract page image
@@ -127,7 +128,7 @@ class ImageExtractor:
             if pil_image.mode not in ('RGB', 'L'):
                 pil_image = pil_image.convert('RGB')
             
-            logging.info(f"Processing page {page_num} - Size: {pil_image.size}, Mode: {pil_image.mode}")
+            self.logger.info(f"Processing page {page_num} - Size: {pil_image.size}, Mode: {pil_image.mode}")
             
             if self._is_valid_image(pil_image):
                 enhanced_image = self._enhance_image(pil_image)
@@ -135,12 +136,12 @@ class ImageExtractor:
                 
                 if image_data:
                     page_images.append(image_data)
-                    logging.info(f"Successfully processed image from page {page_num}")
+                    self.logger.info(f"Successfully processed image from page {page_num}")
             else:
-                logging.warning(f"Invalid image on page {page_num}")
+                self.logger.warning(f"Invalid image on page {page_num}")
                     
         except Exception as e:
-            logging.error(f"Error processing page {page_num}: {str(e)}")
+            self.logger.error(f"Error processing page {page_num}: {str(e)}")
             
         return page_images
 
@@ -153,7 +154,7 @@ class ImageExtractor:
         
         try:
             width, height = image.size
-            logging.info(f"Validating image: {width}x{height}, Mode: {image.mode}")
+            self.logger.info(f"Validating image: {width}x{height}, Mode: {image.mode}")
             
             return (
                 width >= self.config.MIN_WIDTH and
@@ -162,7 +163,7 @@ class ImageExtractor:
                 height <= self.config.MAX_SIZE
             )
         except Exception as e:
-            logging.error(f"Image validation error: {str(e)}")
+            self.logger.error(f"Image validation error: {str(e)}")
             return False
 
 
@@ -185,7 +186,7 @@ class ImageExtractor:
             return image
             
         except Exception as e:
-            logging.error(f"Image enhancement failed: {str(e)}")
+            self.logger.error(f"Image enhancement failed: {str(e)}")
             return image
 
     def _prepare_image_data(self, image: Image.Image, page_num: int) -> Optional[Dict]:
@@ -214,7 +215,7 @@ class ImageExtractor:
             }
             
         except Exception as e:
-            logging.error(f"Error preparing image data: {str(e)}")
+            self.logger.error(f"Error preparing image data: {str(e)}")
             return None
             
     def _calculate_image_hash(self, image: Image.Image) -> str:
@@ -0,0 +1,145 @@
+import io
+import os
+import base64
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import pdfplumber
+import pytesseract
+
+
+@dataclass
+class PageProducts:
+    """Everything extracted from one page."""
+    page_number: int
+    text: str = ""
+    tables: List[List[List[Any]]] = field(default_factory=list)
+    image_base64: Optional[str] = None
+
+
+@dataclass
+class PdfContent:
+    """Products of one fused pass over a PDF, in page order."""
+    page_count: int = 0
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    pages: List[PageProducts] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        return "\n".join(page.text for page in self.pages if page.text)
+
+
+class PdfPageVisitor:
+    """Extracts text, tables, page images and metadata in a single walk over the pages.
+
+    The document is opened once per worker instead of once per product, and
+    each page is visited once: its text layer, tables and (when images are
+    requested, or OCR needs one) its rendered image all come from the same page
+    object, and a rendered image is reused for OCR. Pages are split into
+    contiguous ranges across ``workers`` threads, each with its own handle on
+    the file, and results are returned in page order. Every product can be
+    switched off.
+    """
+
+    def __init__(self, text: bool = True, tables: bool = True, images: bool = True, metadata: bool = True,
+                 ocr: bool = True, image_resolution: int = 300, workers: Optional[int] = None):
+        self.text = text
+        self.tables = tables
+        self.images = images
+        self.metadata = metadata
+        self.ocr = ocr
+        self.image_resolution = image_resolution
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.logger = logging.getLogger(__name__)
+
+    def visit(self, pdf_path: str, progress_callback: Optional[Callable[[int, int], None]] = None,
+              cancel_token=None) -> PdfContent:
+        """Visit every page; ``progress_callback(done_pages, total_pages)`` runs after each page."""
+        content = PdfContent()
+        with pdfplumber.open(pdf_path) as pdf:
+            content.page_count = len(pdf.pages)
+            if self.metadata:
+                content.metadata = dict(pdf.metadata or {})
+            if not (self.text or self.tables or self.images) or not content.page_count:
+                return content
+
+            workers = max(1, min(self.workers, content.page_count))
+            step = -(-content.page_count // workers)
+            ranges = [range(start, min(start + step, content.page_count))
+                      for start in range(0, content.page_count, step)]
+            done = [0]
+            lock = threading.Lock()
+
+            def page_done():
+                with lock:
+                    done[0] += 1
+                    if progress_callback:
+                        progress_callback(done[0], content.page_count)
+
+            if len(ranges) == 1:
+                content.pages = self._visit_range(pdf, ranges[0], page_done, cancel_token)
+                return content
+
+        with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+            futures = [executor.submit(self._visit_file_range, pdf_path, pages, page_done, cancel_token)
+                       for pages in ranges]
+            for future in futures:
+                content.pages.extend(future.result())
+        return content
+
+    def _visit_file_range(self, pdf_path: str, pages: range, page_done, cancel_token) -> List[PageProducts]:
+        # pdfplumber documents are not safe to share between threads
+        with pdfplumber.open(pdf_path) as pdf:
+            return self._visit_range(pdf, pages, page_done, cancel_token)
+
+    def _visit_range(self, pdf, pages: range, page_done, cancel_token) -> List[PageProducts]:
+        products = []
+        for index in pages:
+            if cancel_token:
+                cancel_token.check()
+            page_number = index + 1
+            try:
+                products.append(self._visit_page(pdf.pages[index], page_number))
+            except Exception as e:
+                self.logger.error(f"Error processing page {page_number}: {e}")
+                products.append(PageProducts(page_number))
+            page_done()
+        return products
+
+    def _visit_page(self, page, page_number: int) -> PageProducts:
+        # Each product fails on its own, so e.g. a table parse error keeps the page's text
+        products = PageProducts(page_number)
+        rendered = None
+        if self.images:
+            try:
+                rendered = page.to_image(resolution=self.image_resolution).original
+                buffered = io.BytesIO()
+                rendered.save(buffered, format="PNG")
+                products.image_base64 = base64.b64encode(buffered.getvalue()).decode('utf-8')
+            except Exception as e:
+                self.logger.error(f"Error rendering page {page_number}: {e}")
+
+        if self.tables:
+            try:
+                products.tables = page.extract_tables() or []
+            except Exception as e:
+                self.logger.error(f"Error extracting tables from page {page_number}: {e}")
+
+        if self.text:
+            try:
+                text = page.extract_text() or ""
+            except Exception as e:
+                self.logger.error(f"Error extracting text from page {page_number}: {e}")
+                text = ""
+            if not text.strip() and self.ocr:
+                try:
+                    if rendered is None:
+                        rendered = page.to_image().original
+                    text = pytesseract.image_to_string(rendered.convert('L'), lang="eng")
+                except Exception as e:
+                    self.logger.error(f"Error running OCR on page {page_number}: {e}")
+            products.text = text.strip()
+        return products
@@ -24,14 +24,8 @@ class ExtractorConfig:
 class TableExtractor:
     def __init__(self, config: ExtractorConfig = None):
         self.config = config or ExtractorConfig()
-        self._setup_logging()
+        self.logger = logging.getLogger(__name__)
         
-    def _setup_logging(self):
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
         
     def _ocr_table_extraction(self, page) -> List[Dict[str, Any]]:
         """Perform OCR on table regions."""
@@ -45,7 +39,7 @@ class TableExtractor:
             )
             ocr_tables.extend(self._parse_ocr_text_into_tables(text))
         except Exception as e:
-            logging.warning(f"OCR table extraction failed: {e}")
+            self.logger.warning(f"OCR table extraction failed: {e}")
         return ocr_tables
 
     def _is_valid_table(self, table):
@@ -90,7 +84,7 @@ class TableExtractor:
                 if detected_tables:
                     tables.extend(detected_tables)
             except Exception as e:
-                logging.debug(f"Table detection failed with settings {settings}: {e}")
+                self.logger.debug(f"Table detection failed with settings {settings}: {e}")
                 continue
         
         # Deduplicate tables
@@ -150,7 +144,7 @@ class TableExtractor:
         
         return True
     
-    def extract(self, pdf_path: Path, progress_tracker=None) -> List[Dict[str, Any]]:
+    def extract(self, pdf_path: Path, progress_tracker=None, cancel_token=None) -> List[Dict[str, Any]]:
         """Extract tables from PDF with progress tracking."""
         tables = []
         try:
@@ -158,6 +152,8 @@ class TableExtractor:
                 total_pages = len(pdf.pages)
                 
                 for page_num, page in enumerate(pdf.pages, 1):
+                    if cancel_token:
+                        cancel_token.check()
                     try:
                         # First try regular table extraction
                         extracted_tables = self._improve_table_detection(page)
@@ -187,11 +183,11 @@ class TableExtractor:
                             progress_tracker.update(progress)
                             
                     except Exception as e:
-                        logging.error(f"Error processing page {page_num}: {str(e)}")
+                        self.logger.error(f"Error processing page {page_num}: {str(e)}")
                         continue
                         
         except Exception as e:
-            logging.error(f"Failed to process PDF: {str(e)}")
+            self.logger.error(f"Failed to process PDF: {str(e)}")
             raise
             
         return tables
@@ -211,7 +207,7 @@ class TableExtractor:
                         page_tables.append(processed_table)
                         
         except Exception as e:
-            logging.error(f"Error processing tables on page {page_num}: {e}")
+            self.logger.error(f"Error processing tables on page {page_num}: {e}")
             
         return page_tables
 
@@ -234,7 +230,7 @@ class TableExtractor:
             }
 
         except Exception as e:
-            logging.error(f"Error processing table: {e}")
+            self.logger.error(f"Error processing table: {e}")
             return None
 
 
@@ -272,7 +268,7 @@ class TableExtractor:
             return df
             
         except Exception as e:
-            logging.error(f"Table cleaning error: {e}")
+            self.logger.error(f"Table cleaning error: {e}")
             return pd.DataFrame()
 
     def _convert_column_type(self, series):
@@ -295,7 +291,7 @@ class TableExtractor:
             return series.astype(str).replace('nan', '')
             
         except Exception as e:
-            logging.debug(f"Column type conversion failed: {e}")
+            self.logger.debug(f"Column type conversion failed: {e}")
             return series
 
     def _generate_table_description(self, df: pd.DataFrame) -> str:
@@ -304,6 +300,7 @@ class TableExtractor:
 
         
 def main():
+    logging.basicConfig(level=logging.INFO)
     pdf_path = "../sample/sample.pdf"
     output_dir = "extracted_tables"
     os.makedirs(output_dir, exist_ok=True)
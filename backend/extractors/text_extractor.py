@@ -4,59 +4,77 @@ import pytesseract
 from PIL import Image
 import logging
 
-# Initialize logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from pipeline.tracing import span
+
+# Part of the cache key for extracted text; bump it when extraction output changes
+EXTRACTOR_VERSION = 1
 
 class TextExtractor:
     def __init__(self):
         """Initialize TextExtractor."""
         self.logger = logging.getLogger(__name__)
 
-    def extract_text_with_plumber(self, pdf_path):
+    def extract_text_with_plumber(self, pdf_path, cancel_token=None):
         """Extract text using pdfplumber."""
         text = ""
         try:
             with pdfplumber.open(pdf_path) as pdf:
                 for page in pdf.pages:
-                    text += page.extract_text() or ""
+                    if cancel_token:
+                        cancel_token.check()
+                    with span('extract.pdfplumber.page', level=logging.DEBUG, page=page.page_number) as page_span:
+                        page_text = page.extract_text() or ""
+                        page_span.bytes_out = len(page_text)
+                    text += page_text
             self.logger.info("Text extraction with pdfplumber completed.")
         except Exception as e:
             self.logger.error(f"Error with pdfplumber: {e}")
         return text
 
-    def extract_text_with_pymupdf(self, pdf_path):
+    def extract_text_with_pymupdf(self, pdf_path, cancel_token=None):
         """Extract text using PyMuPDF."""
         text = ""
         try:
             doc = fitz.open(pdf_path)
             for page in doc:
-                text += page.get_text()
+                if cancel_token:
+                    cancel_token.check()
+                with span('extract.pymupdf.page', level=logging.DEBUG, page=page.number + 1) as page_span:
+                    page_text = page.get_text()
+                    page_span.bytes_out = len(page_text)
+                text += page_text
             self.logger.info("Text extraction with PyMuPDF completed.")
         except Exception as e:
             self.logger.error(f"Error with PyMuPDF: {e}")
         return text
 
-    def extract_text_with_ocr(self, pdf_path):
+    def extract_text_with_ocr(self, pdf_path, cancel_token=None):
         """Extract text using OCR for scanned PDFs."""
         text = ""
         try:
             doc = fitz.open(pdf_path)
             for page_num in range(len(doc)):
-                pix = doc[page_num].get_pixmap()
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                text += pytesseract.image_to_string(img, config='--psm 6', lang='eng')
+                if cancel_token:
+                    cancel_token.check()
+                with span('extract.ocr.page', level=logging.DEBUG, page=page_num + 1) as page_span:
+                    pix = doc[page_num].get_pixmap()
+                    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                    page_text = pytesseract.image_to_string(img, config='--psm 6', lang='eng')
+                    page_span.bytes_out = len(page_text)
+                text += page_text
             self.logger.info("Text extraction with OCR completed.")
         except Exception as e:
             self.logger.error(f"Error with OCR: {e}")
         return text
 
 
-    def extract(self, pdf_path):
+    def extract(self, pdf_path, cancel_token=None):
         """
         Extract text from PDF using multiple methods if needed
         
         Args:
             pdf_path (str): Path to the PDF file
+            cancel_token (CancellationToken, optional): Checked between pages
         
         Returns:
             str: Extracted text
@@ -64,11 +82,11 @@ class TextExtractor:
         self.logger.info(f"Extracting text from: {pdf_path}")
 
         # Try different extraction methods in order
-        text = self.extract_text_with_plumber(pdf_path)
+        text = self.extract_text_with_plumber(pdf_path, cancel_token)
         if not text.strip():
-            text = self.extract_text_with_pymupdf(pdf_path)
+            text = self.extract_text_with_pymupdf(pdf_path, cancel_token)
         if not text.strip():
-            text = self.extract_text_with_ocr(pdf_path)
+            text = self.extract_text_with_ocr(pdf_path, cancel_token)
 
         return text
 
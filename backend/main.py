@@ -2,6 +2,8 @@ import os
 import sys
 import json
 import asyncio
+import logging
+import hashlib
 from datetime import datetime
 from pathlib import Path
 
@@ -10,58 +12,97 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.append(project_root)
 
 # Import components
-from extractors.text_extractor import TextExtractor
+from extractors.text_extractor import TextExtractor, EXTRACTOR_VERSION
+from config.config import Config
+from pipeline.cancellation import CancellationToken
+from pipeline.logs import configure_logging
+from pipeline.tracing import span
+from storage.artifact_cache import ArtifactCache
 from backend.models.intro import generate_audit_report, save_report_to_advanced_json, load_json_data  # Use load_json_data for accessing saved file
 
+logger = logging.getLogger(__name__)
+
 class DocumentProcessor:
     def __init__(self):
         self.text_extractor = TextExtractor()
+        # Extracted text is cached by PDF content, so re-uploads skip extraction
+        self.artifacts = ArtifactCache(Config.ARTIFACT_CACHE_DIR, int(Config.ARTIFACT_CACHE_MAX_MB * 1024 * 1024))
 
-    async def process_document(self, pdf_path):
+    async def process_document(self, pdf_path, cancel_token=None, digest=None):
         """
         Main document processing workflow:
         1. Extract text from PDF
         2. Generate cybersecurity report
         3. Save results in a structured JSON format
         4. Access saved file and display its contents
+
+        Each step runs as a stage of cancel_token with its deadline from
+        Config.STAGE_TIMEOUTS; JobCancelled / StageTimeout propagate to the caller.
+        ``digest`` is the PDF's SHA-256 when the caller already has it (uploads
+        are hashed while streaming); otherwise the file is hashed here.
         """
+        cancel_token = cancel_token or CancellationToken()
         try:
             # Step 1: Extract text from PDF
-            print(f"Extracting text from: {pdf_path}")
-            extracted_text = self.text_extractor.extract(pdf_path)
-            print("Extracted text:", extracted_text[:500])  # Display a snippet of extracted text for debug
+            logger.info("Extracting text", extra={'pdf_path': pdf_path})
+            with cancel_token.stage('extraction', Config.STAGE_TIMEOUTS['extraction']), \
+                    span('extraction', bytes_in=os.path.getsize(pdf_path)) as extraction_span:
+                digest = digest or self._file_digest(pdf_path)
+                text_key = f"extracted_text/v{EXTRACTOR_VERSION}/{digest}"
+                extracted_text = self.artifacts.get_text(text_key)
+                extraction_span.attributes['cached'] = extracted_text is not None
+                if extracted_text is None:
+                    extracted_text = self.text_extractor.extract(pdf_path, cancel_token)
+                    if extracted_text.strip():
+                        self.artifacts.put_text(text_key, extracted_text)
+                else:
+                    logger.info("Using cached extracted text", extra={'artifact_key': text_key})
+                extraction_span.bytes_out = len(extracted_text)
+            logger.debug("Extracted text", extra={'chars': len(extracted_text), 'payload': extracted_text})
             
             if len(extracted_text.strip()) == 0:
                 raise ValueError("No text could be extracted from the provided PDF file.")
 
             # Step 2: Generate cybersecurity report
-            print("Generating cybersecurity report...")
-            report = generate_audit_report(extracted_text)
-            print("Generated report:", report)
+            logger.info("Generating cybersecurity report")
+            with cancel_token.stage('llm', Config.STAGE_TIMEOUTS['llm']), \
+                    span('llm', bytes_in=len(extracted_text)) as llm_span:
+                report = generate_audit_report(extracted_text, cancel_token)
+                llm_span.bytes_out = len(report)
+            logger.debug("Generated report", extra={'chars': len(report), 'payload': report})
 
             if "An error occurred" in report:
                 raise RuntimeError("Error while generating the report: " + report)
 
             # Step 3: Save the report in structured JSON format and get the saved file path
-            report_file_path = self._save_report(report, pdf_path)
-           
-            # Step 4: Access saved file and load data
-            print("Accessing saved report...")
-            saved_data = load_json_data(report_file_path)
+            with cancel_token.stage('persistence', Config.STAGE_TIMEOUTS['persistence']), \
+                    span('persistence', bytes_in=len(report)):
+                report_file_path = self._save_report(report, pdf_path)
+                cancel_token.check()
+
+                # Step 4: Access saved file and load data
+                logger.debug("Loading saved report", extra={'report_path': report_file_path})
+                saved_data = load_json_data(report_file_path)
 
-            # Display the saved JSON data
             if saved_data:
-                print("\n--- SAVED REPORT CONTENTS ---")
-                print(json.dumps(saved_data, indent=4))
+                logger.debug("Saved report contents", extra={'payload': saved_data})
             else:
-                print("Could not access saved JSON file content.")
+                logger.warning("Could not access saved JSON file content", extra={'report_path': report_file_path})
 
             return saved_data
 
         except Exception as e:
-            print(f"Processing error: {e}")
+            logger.error(f"Processing error: {e}")
             return {"error": str(e)}
 
+    def _file_digest(self, pdf_path):
+        """SHA-256 of the PDF's bytes, the cache key for everything derived from it."""
+        digest = hashlib.sha256()
+        with open(pdf_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
     def _save_report(self, report, pdf_path):
         """
         Save processing results to structured JSON and return the saved file path
@@ -72,17 +113,17 @@ class DocumentProcessor:
         # Save the report in structured format
         saved_file_path = save_report_to_advanced_json(report, filename=report_file)
 
-        print(f"Cybersecurity report saved to: {saved_file_path}")
+        logger.info("Cybersecurity report saved", extra={'report_path': saved_file_path})
         return saved_file_path  # Return the saved filepath to be used later
 
 
 async def main():
-    # Update this with your own sample PDF path
-    pdf_path = "sample/sample.pdf"  # Replace with the actual path to your PDF
+    # Pass a PDF path on the command line; use `python -m backend.batch <dir>` for directories
+    pdf_path = sys.argv[1] if len(sys.argv) > 1 else "sample/sample.pdf"
 
+    configure_logging()
     processor = DocumentProcessor()
 
-    print("Starting document processing...")
     result = await processor.process_document(pdf_path)
 
     # Display the final result or error
@@ -1,40 +1,45 @@
-from transformers import T5ForConditionalGeneration, T5Tokenizer
 from sklearn.feature_extraction.text import TfidfVectorizer
 from nltk.tokenize import sent_tokenize
 import re
-import spacy
 import json
 import os
 import numpy as np
-from sentence_transformers import SentenceTransformer
-import networkx as nx
 import pandas as pd
 
+from config.config import Config
+from models.registry import get_t5
+from models.embedding_cache import get_embedding_cache
+from models.doc_analysis import get_doc_cache
+from processors.textrank import rank_sentences
+
 class SummarizationModel:
-    def __init__(self, model_name="t5-small", local_path="./models/t5_model"):
+    def __init__(self, model_name="t5-small", local_path="./models/t5_model", textrank_top_k=None):
         self.local_path = local_path
         self.model_name = model_name
+        self.textrank_top_k = textrank_top_k
 
-        # Load the T5 model and tokenizer
-        self.tokenizer = T5Tokenizer.from_pretrained(model_name)
-        self.model = T5ForConditionalGeneration.from_pretrained(model_name)
+        # T5 and Sentence-BERT (semantic similarity) come from the shared model
+        # registry and are loaded on first use; spaCy parses go through the shared Doc cache.
+        self.docs = get_doc_cache(Config.SPACY_MODEL)
 
-        # Save locally (optional)
-        self.tokenizer.save_pretrained(local_path)
-        self.model.save_pretrained(local_path)
+    @property
+    def tokenizer(self):
+        return get_t5(self.model_name, local_path=self.local_path)[0]
 
-        # Load spaCy model for Named Entity Recognition
-        self.nlp = spacy.load("en_core_web_sm")
+    @property
+    def model(self):
+        return get_t5(self.model_name, local_path=self.local_path)[1]
 
-        # Load Sentence-BERT model for semantic similarity
-        self.sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
+    @property
+    def sentence_model(self):
+        return get_embedding_cache('all-MiniLM-L6-v2')
 
     def extract_main_idea(self, text, title):
         if title:
             return title.strip()
         
         # Fallback to extracting keywords from text
-        doc = self.nlp(text)
+        doc = self.docs.get(text, 'noun_chunks')
         keywords = [chunk.text for chunk in doc.noun_chunks]
         return ' '.join(set(keywords))[:100]  # Return unique keywords as main idea
 
@@ -56,7 +61,7 @@ class SummarizationModel:
         for typo, correction in corrections.items():
             text = re.sub(r'\b' + typo + r'\b', correction, text)
 
-        doc = self.nlp(text)
+        doc = self.docs.get(text, 'lemmas')
         words = [token.lemma_ for token in doc if not token.is_stop and token.is_alpha]
 
         return ' '.join(words)
@@ -71,18 +76,9 @@ class SummarizationModel:
         if len(unique_sentences) < num_sentences:
             return unique_sentences
 
-        # Create a similarity matrix using BERT embeddings
+        # Rank sentences with TextRank over their BERT embedding similarities
         embeddings = self.sentence_model.encode(unique_sentences)
-        similarity_matrix = np.inner(embeddings, embeddings)
-
-        # Create a graph from the similarity matrix
-        nx_graph = nx.from_numpy_array(similarity_matrix)
-
-        # Use PageRank algorithm to rank sentences
-        scores = nx.pagerank(nx_graph)
-
-        # Get indices of top sentences based on PageRank scores
-        top_sentence_indices = sorted(scores, key=scores.get, reverse=True)[:num_sentences]
+        top_sentence_indices = rank_sentences(embeddings, num_sentences, top_k=self.textrank_top_k)
 
         return [unique_sentences[i] for i in sorted(top_sentence_indices)]
 
@@ -1,19 +1,201 @@
-import pyttsx3
 import os
-import uuid
+import glob
+import wave
+import shutil
+import hashlib
+import logging
+import threading
+import multiprocessing as mp
+from typing import List, Optional
 
-# Initialize the TTS engine once
-engine = pyttsx3.init()
+from config.config import Config
 
-def generate_audio(summary_text, output_dir="audio"):
+# Bumped whenever the rendered audio would change for the same text
+AUDIO_CACHE_VERSION = 1
+
+
+def audio_key(summary_text: str) -> str:
+    return hashlib.sha256(f"{AUDIO_CACHE_VERSION}:{summary_text}".encode('utf-8')).hexdigest()
+
+
+def split_paragraphs(summary_text: str) -> List[str]:
+    return [paragraph.strip() for paragraph in summary_text.split('\n\n') if paragraph.strip()]
+
+
+def _synthesize_paragraphs(engine, paragraphs: List[str], partial_path: str, parts_dir: str):
+    """Render paragraphs one by one, appending each to ``partial_path``.
+
+    The driver's output for each paragraph must be WAV (espeak and sapi5 write
+    WAV; nsss on macOS writes AIFF, which is rejected here). ``wave`` rewrites the
+    header on every write, so the partial file's header covers what has been
+    appended so far.
     """
-    Generate audio from summary text
+    output = sink = None
+    try:
+        for index, paragraph in enumerate(paragraphs):
+            part_path = os.path.join(parts_dir, f"{index}.wav")
+            engine.save_to_file(paragraph, part_path)
+            engine.runAndWait()
+            try:
+                part = wave.open(part_path, 'rb')
+            except (wave.Error, EOFError) as e:
+                raise RuntimeError(f"TTS driver did not produce a WAV file ({e})") from e
+            with part:
+                if output is None:
+                    sink = open(partial_path, 'wb')
+                    output = wave.open(sink, 'wb')
+                    output.setparams(part.getparams())
+                # The header is patched after each write; flushing makes it and the
+                # frames visible to readers streaming what has been rendered so far.
+                output.writeframes(part.readframes(part.getnframes()))
+                sink.flush()
+            os.remove(part_path)
+    finally:
+        if output is not None:
+            output.close()
+        if sink is not None:
+            sink.close()
+
+
+def _audio_worker(tasks, output_dir: str):
+    """Worker process: owns the only pyttsx3 engine and renders queued summaries in order."""
+    import pyttsx3
+
+    logger = logging.getLogger(__name__)
+    engine = pyttsx3.init()
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        key, paragraphs = task
+        final_path = os.path.join(output_dir, f"{key}.wav")
+        if os.path.exists(final_path):
+            continue
+        partial_path = os.path.join(output_dir, f"{key}.partial.wav")
+        parts_dir = os.path.join(output_dir, f"{key}.parts")
+        try:
+            os.makedirs(parts_dir, exist_ok=True)
+            _synthesize_paragraphs(engine, paragraphs, partial_path, parts_dir)
+            os.replace(partial_path, final_path)
+        except Exception as e:
+            logger.error(f"Audio synthesis failed for {key}: {e}")
+            # A truncated partial must not be served or mistaken for a render in progress
+            try:
+                os.remove(partial_path)
+            except OSError:
+                pass
+            with open(os.path.join(output_dir, f"{key}.failed"), 'w') as f:
+                f.write(str(e))
+        finally:
+            shutil.rmtree(parts_dir, ignore_errors=True)
+
+
+class AudioService:
+    """Text-to-speech rendered in a dedicated worker process.
+
+    ``request`` returns the audio URL immediately and queues the summary; the
+    worker synthesizes it paragraph by paragraph into ``<hash>.partial.wav``,
+    whose WAV header is updated as each paragraph is appended, and renames it to
+    ``<hash>.wav`` when done. This needs a pyttsx3 driver that writes WAV. Audio
+    is cached by the hash of the summary text, so repeated summaries are never
+    rendered twice. The service owns its output
+    folder: partial files that no live worker is writing are stale and are
+    deleted when a worker starts, and their text is rendered again on request.
     """
-    os.makedirs(output_dir, exist_ok=True)
-    unique_filename = f"summary_audio_{uuid.uuid4().hex}.mp3"
-    output_path = os.path.join(output_dir, unique_filename)
-    
-    engine.save_to_file(summary_text, output_path)
-    engine.runAndWait()
-
-    return output_path
+
+    def __init__(self, output_dir: str = None, url_prefix: str = None):
+        self.output_dir = output_dir or Config.AUDIO_FOLDER
+        self.url_prefix = url_prefix or Config.AUDIO_URL_PREFIX
+        self.logger = logging.getLogger(__name__)
+        self._context = mp.get_context('spawn')
+        self._tasks = None
+        self._process = None
+        self._queued = set()
+        self._lock = threading.Lock()
+
+    def _worker_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def _remove_stale_partials(self):
+        for path in glob.glob(os.path.join(self.output_dir, '*.partial.wav')):
+            os.remove(path)
+        for path in glob.glob(os.path.join(self.output_dir, '*.parts')):
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _ensure_worker(self):
+        if not self._worker_alive():
+            os.makedirs(self.output_dir, exist_ok=True)
+            # Left by a worker that died or an app that restarted mid-render
+            self._remove_stale_partials()
+            self._tasks = self._context.Queue()
+            # Anything queued for a dead worker has to be queued again
+            self._queued.clear()
+            self._process = self._context.Process(
+                target=_audio_worker, args=(self._tasks, self.output_dir), daemon=True
+            )
+            self._process.start()
+            self.logger.info(f"Started audio worker (pid {self._process.pid})")
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.output_dir, f"{key}.wav")
+
+    def url_for(self, key: str) -> str:
+        return f"{self.url_prefix}{key}.wav"
+
+    def _partial_path(self, key: str) -> str:
+        return os.path.join(self.output_dir, f"{key}.partial.wav")
+
+    def status(self, key: str) -> str:
+        """'ready', 'failed', 'rendering' (partial audio available) or 'pending'."""
+        if os.path.exists(self.path_for(key)):
+            return 'ready'
+        if os.path.exists(os.path.join(self.output_dir, f"{key}.failed")):
+            return 'failed'
+        # A partial only counts while a live worker still has the key; otherwise it is stale
+        if key in self._queued and self._worker_alive() and os.path.exists(self._partial_path(key)):
+            return 'rendering'
+        return 'pending'
+
+    def playable_path(self, key: str) -> Optional[str]:
+        """The finished file, or the partial one while rendering, if any audio exists yet."""
+        status = self.status(key)
+        if status == 'ready':
+            return self.path_for(key)
+        if status == 'rendering':
+            return self._partial_path(key)
+        return None
+
+    def request(self, summary_text: str) -> Optional[str]:
+        """Queue audio for the summary (unless cached) and return its URL; None for empty text."""
+        paragraphs = split_paragraphs(summary_text or '')
+        if not paragraphs:
+            return None
+        key = audio_key(summary_text)
+        status = self.status(key)
+        with self._lock:
+            if status == 'failed':
+                # Retry once the text is requested again
+                os.remove(os.path.join(self.output_dir, f"{key}.failed"))
+                self._queued.discard(key)
+            if status in ('pending', 'failed'):
+                # Restarting a dead worker forgets its queue, so the key is queued again
+                self._ensure_worker()
+                if key not in self._queued:
+                    self._tasks.put((key, paragraphs))
+                    self._queued.add(key)
+        return self.url_for(key)
+
+    def close(self):
+        with self._lock:
+            if self._process is not None and self._process.is_alive():
+                self._tasks.put(None)
+                self._process.join(timeout=30)
+            self._process = None
+
+
+audio_service = AudioService()
+
+
+def generate_audio(summary_text: str) -> Optional[str]:
+    """URL of the summary's audio; rendering continues in the background."""
+    return audio_service.request(summary_text)
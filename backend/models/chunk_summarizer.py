@@ -0,0 +1,157 @@
+import os
+import logging
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional
+
+import torch
+
+from config.config import Config
+from models.registry import get_t5
+from models.t5_backends import inference_device, validate_backend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChunkGenerationConfig:
+    """Generation settings shared by every chunk."""
+    prefix: str = "summarize: "
+    max_input_tokens: int = 1024
+    max_length: int = 200
+    min_length: int = 50
+    num_beams: int = 4
+    length_penalty: float = 2.0
+
+
+def plan_batches(lengths: List[int], max_batch_tokens: int, max_batch_size: int = 32) -> List[List[int]]:
+    """Group row indices into batches of similar length.
+
+    Rows are sorted by length and a batch grows until its padded size
+    (rows x longest row) would pass ``max_batch_tokens``, so short chunks are
+    batched together and long ones run in small batches. A row longer than the
+    budget gets a batch of its own.
+    """
+    batches: List[List[int]] = []
+    batch: List[int] = []
+    for index in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+        padded = (len(batch) + 1) * lengths[index]
+        if batch and (padded > max_batch_tokens or len(batch) >= max_batch_size):
+            batches.append(batch)
+            batch = []
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _generate_batch(tokenizer, model, device, rows: List[List[int]], generation: Dict) -> List[str]:
+    inputs = tokenizer.pad({"input_ids": rows}, return_tensors="pt").to(device)
+    with torch.inference_mode():
+        outputs = model.generate(
+            input_ids=inputs["input_ids"],
+            attention_mask=inputs["attention_mask"],
+            max_length=generation["max_length"],
+            min_length=generation["min_length"],
+            length_penalty=generation["length_penalty"],
+            num_beams=generation["num_beams"],
+            early_stopping=True
+        )
+    return tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+
+# Worker processes load their own copy of the model once, in the initializer.
+_worker_model = None
+
+
+def _init_worker(model_name: str, local_path: Optional[str], backend: str, threads: int):
+    global _worker_model
+    torch.set_num_threads(threads)
+    _worker_model = get_t5(model_name, 'cpu', local_path, backend=backend)
+
+
+def _worker_generate(rows: List[List[int]], generation: Dict) -> List[str]:
+    tokenizer, model = _worker_model
+    return _generate_batch(tokenizer, model, 'cpu', rows, generation)
+
+
+class BatchedChunkSummarizer:
+    """Summarizes many text chunks with batched ``generate`` calls.
+
+    Chunks are tokenized once, grouped into length buckets under a padded-token
+    budget and generated batch by batch; summaries come back in chunk order.
+    With ``workers > 1`` (CPU only) batches are sharded across processes that
+    each hold a model copy and split the machine's cores between them.
+    """
+
+    def __init__(self, model_name: str, local_path: Optional[str] = None, backend: Optional[str] = None,
+                 max_batch_tokens: Optional[int] = None, max_batch_size: int = 32,
+                 workers: Optional[int] = None, generation: Optional[ChunkGenerationConfig] = None):
+        self.model_name = model_name
+        self.local_path = local_path
+        self.backend = validate_backend(backend or Config.T5_BACKEND)
+        self.device = inference_device(self.backend)
+        self.max_batch_tokens = max_batch_tokens or Config.CHUNK_BATCH_TOKENS
+        self.max_batch_size = max_batch_size
+        self.workers = workers or Config.CHUNK_WORKERS
+        if self.workers > 1 and self.device.type != 'cpu':
+            logger.info("Chunk workers are a CPU option; generating in-process on GPU")
+            self.workers = 1
+        self.generation = generation or ChunkGenerationConfig()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _t5(self):
+        return get_t5(self.model_name, str(self.device), self.local_path, backend=self.backend)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            # spawn: forking a process that has already started torch's thread pools can deadlock
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=mp.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.local_path, self.backend, threads)
+            )
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def summarize(self, chunks: List[str],
+                  progress_callback: Optional[Callable[[int, int], None]] = None) -> List[str]:
+        """Summaries for ``chunks`` in order; ``progress_callback(done, total)`` runs after each batch."""
+        if not chunks:
+            return []
+        tokenizer, model = self._t5()
+        settings = self.generation
+        rows = tokenizer(
+            [settings.prefix + chunk for chunk in chunks],
+            max_length=settings.max_input_tokens,
+            truncation=True
+        )["input_ids"]
+        batches = plan_batches([len(row) for row in rows], self.max_batch_tokens, self.max_batch_size)
+        logger.info(f"Summarizing {len(chunks)} chunks in {len(batches)} batches "
+                    f"({self.workers} worker{'s' if self.workers > 1 else ''})")
+
+        generation = asdict(settings)
+        summaries: List[str] = [""] * len(chunks)
+        if self.workers > 1:
+            pool = self._get_pool()
+            futures = {
+                pool.submit(_worker_generate, [rows[i] for i in batch], generation): batch for batch in batches
+            }
+            results = ((futures[future], future.result()) for future in as_completed(futures))
+        else:
+            results = ((batch, _generate_batch(tokenizer, model, self.device, [rows[i] for i in batch], generation))
+                       for batch in batches)
+
+        for done, (batch, outputs) in enumerate(results, 1):
+            for index, summary in zip(batch, outputs):
+                summaries[index] = summary
+            if progress_callback:
+                progress_callback(done, len(batches))
+        return summaries
@@ -0,0 +1,125 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List
+
+from models.registry import get_spacy
+from pipeline.metrics import cache_lookup
+
+# Pipeline components each kind of analysis needs. Everything else is disabled
+# while parsing; the shared embedding layer is always kept for its listeners.
+USE_COMPONENTS = {
+    'sentences': ('parser',),
+    'entities': ('ner',),
+    'noun_chunks': ('tagger', 'attribute_ruler', 'parser'),
+    'lemmas': ('tagger', 'attribute_ruler', 'lemmatizer'),
+}
+SHARED_COMPONENTS = ('tok2vec', 'transformer')
+
+
+@dataclass
+class _CachedDoc:
+    doc: object
+    components: FrozenSet[str]
+
+
+class DocAnalysisCache:
+    """Parses each text once and shares the spaCy Doc between pipeline stages.
+
+    Callers ask for a text together with the analyses they need (``'sentences'``,
+    ``'entities'``, ``'noun_chunks'``, ``'lemmas'``). Only the components those
+    analyses require are run, misses are parsed together with ``nlp.pipe``, and
+    a cached Doc is reused whenever it already carries the requested annotations;
+    otherwise the text is parsed again with the union of old and new components.
+    """
+
+    def __init__(self, model_name: str, max_docs: int = 32, batch_size: int = 16):
+        self.model_name = model_name
+        self.max_docs = max_docs
+        self.batch_size = batch_size
+        self.logger = logging.getLogger(__name__)
+        self._docs: "OrderedDict[str, _CachedDoc]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def nlp(self):
+        return get_spacy(self.model_name)
+
+    def _components(self, uses) -> FrozenSet[str]:
+        unknown = [use for use in uses if use not in USE_COMPONENTS]
+        if unknown:
+            raise ValueError(f"Unknown analysis {unknown}; expected one of {sorted(USE_COMPONENTS)}")
+        wanted = set(SHARED_COMPONENTS)
+        for use in uses:
+            wanted.update(USE_COMPONENTS[use])
+        return frozenset(wanted & set(self.nlp.pipe_names))
+
+    def get(self, text: str, *uses: str):
+        return self.get_many([text], *uses)[0]
+
+    def get_many(self, texts: List[str], *uses: str) -> List[object]:
+        """Docs for texts carrying at least the annotations for ``uses``."""
+        needed = self._components(uses)
+        results: List[object] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        components = set(needed)
+
+        with self._lock:
+            for position, text in enumerate(texts):
+                key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+                cached = self._docs.get(key)
+                if cached is not None and needed <= cached.components:
+                    self._docs.move_to_end(key)
+                    results[position] = cached.doc
+                    self.hits += 1
+                    continue
+                if cached is not None:
+                    components |= cached.components
+                missing.setdefault(key, []).append(position)
+                self.misses += 1
+
+        misses = sum(len(positions) for positions in missing.values())
+        cache_lookup('spacy_docs', hit=True, count=len(texts) - misses)
+        cache_lookup('spacy_docs', hit=False, count=misses)
+
+        if missing:
+            nlp = self.nlp
+            disable = [name for name in nlp.pipe_names if name not in components]
+            keys = list(missing)
+            docs = list(nlp.pipe(
+                (texts[missing[key][0]] for key in keys), disable=disable, batch_size=self.batch_size
+            ))
+            with self._lock:
+                for key, doc in zip(keys, docs):
+                    for position in missing[key]:
+                        results[position] = doc
+                    self._docs[key] = _CachedDoc(doc, frozenset(components))
+                    self._docs.move_to_end(key)
+                while len(self._docs) > self.max_docs:
+                    self._docs.popitem(last=False)
+        return results
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            'docs': len(self._docs),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+
+_caches: Dict[str, DocAnalysisCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_doc_cache(model_name: str) -> DocAnalysisCache:
+    """Process-wide Doc cache for a spaCy model, shared by every summarizer."""
+    with _caches_lock:
+        if model_name not in _caches:
+            _caches[model_name] = DocAnalysisCache(model_name)
+        return _caches[model_name]
@@ -0,0 +1,216 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config.config import Config
+from models.model_cache import file_lock, safe_name
+from models.registry import get_sentence_transformer
+from pipeline.metrics import cache_lookup
+
+
+def sentence_key(sentence: str) -> str:
+    return hashlib.sha1(sentence.encode('utf-8')).hexdigest()
+
+
+class EmbeddingStore:
+    """Append-only on-disk embedding table for one model, read through a memmap.
+
+    ``keys.txt`` holds one sentence hash per line and ``vectors.f32`` the matching
+    float32 rows in the same order. Vectors are appended before their keys, so a
+    key is only ever visible once its row is fully written; rows without a key
+    (from an interrupted append) are cut off before the next append, so row
+    numbers keep matching key order. Appends from several worker processes are
+    serialized with a file lock, and threads of one process share ``_lock``
+    around every read and update of the key index.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.keys_path = os.path.join(directory, 'keys.txt')
+        self.vectors_path = os.path.join(directory, 'vectors.f32')
+        self.lock_path = os.path.join(directory, '.lock')
+        self.dim: Optional[int] = None
+        self._rows: Dict[str, int] = {}
+        self._keys_offset = 0
+        self._memmap: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        """Pick up keys appended since the last read (possibly by other processes)."""
+        try:
+            with open(self.keys_path, 'r', encoding='ascii') as f:
+                f.seek(self._keys_offset)
+                added = f.read()
+        except FileNotFoundError:
+            return
+        # Only complete lines count; a partial trailing line is read next time
+        complete = added[:added.rfind('\n') + 1]
+        if not complete:
+            return
+        self._keys_offset += len(complete)
+        for line in complete.splitlines():
+            if line.startswith('#dim '):
+                self.dim = int(line[5:])
+                continue
+            self._rows.setdefault(line, len(self._rows))
+        self._memmap = None
+
+    def _vectors(self) -> Optional[np.memmap]:
+        if self._memmap is None and self.dim and self._rows:
+            self._memmap = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(len(self._rows), self.dim))
+        return self._memmap
+
+    def get(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        with self._lock:
+            if any(key not in self._rows for key in keys):
+                self._refresh()
+            vectors = self._vectors()
+            if vectors is None:
+                return {}
+            return {key: np.array(vectors[self._rows[key]]) for key in keys if key in self._rows}
+
+    def add(self, entries: Dict[str, np.ndarray]):
+        # Thread lock first: _refresh advances _keys_offset and must not run twice at once
+        with self._lock, file_lock(self.lock_path):
+            self._refresh()
+            new = {key: vector for key, vector in entries.items() if key not in self._rows}
+            if not new:
+                return
+            matrix = np.asarray(list(new.values()), dtype=np.float32)
+            header = ''
+            if self.dim is None:
+                self.dim = matrix.shape[1]
+                header = f"#dim {self.dim}\n"
+            elif matrix.shape[1] != self.dim:
+                raise ValueError(f"Embedding dimension {matrix.shape[1]} does not match store dimension {self.dim}")
+            with open(self.vectors_path, 'ab') as f:
+                # Drop orphan rows left by an append that died before writing its keys
+                keyed_bytes = len(self._rows) * self.dim * matrix.itemsize
+                if os.fstat(f.fileno()).st_size > keyed_bytes:
+                    f.truncate(keyed_bytes)
+                f.write(matrix.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.keys_path, 'a', encoding='ascii') as f:
+                f.write(header + ''.join(f"{key}\n" for key in new))
+            self._refresh()
+
+
+class EmbeddingCache:
+    """Sentence embeddings cached by model name and sentence hash.
+
+    ``encode`` looks every sentence up in an in-memory LRU, then in the optional
+    on-disk store, and runs the model once, batched, over the misses only. The
+    result has the same rows ``SentenceTransformer.encode`` would return.
+    """
+
+    def __init__(self, model_name: str, device: Optional[str] = None, max_entries: int = 50000,
+                 store_dir: Optional[str] = None, batch_size: int = 64):
+        self.model_name = model_name
+        self.device = device
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.logger = logging.getLogger(__name__)
+        self.store = EmbeddingStore(os.path.join(store_dir, safe_name(model_name))) if store_dir else None
+        self._vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.encode_seconds = 0.0
+
+    @property
+    def model(self):
+        return get_sentence_transformer(self.model_name, self.device)
+
+    def _remember(self, entries: Dict[str, np.ndarray]):
+        for key, vector in entries.items():
+            self._vectors[key] = vector
+            self._vectors.move_to_end(key)
+        while len(self._vectors) > self.max_entries:
+            self._vectors.popitem(last=False)
+
+    def encode(self, sentences: List[str]) -> np.ndarray:
+        """Embeddings for ``sentences`` in order, encoding only those not cached."""
+        keys = [sentence_key(sentence) for sentence in sentences]
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._vectors.get(key)
+                if vector is not None:
+                    self._vectors.move_to_end(key)
+                    found[key] = vector
+
+        missing = {key: sentence for key, sentence in zip(keys, sentences) if key not in found}
+        if missing and self.store is not None:
+            with self._lock:
+                stored = self.store.get(list(missing))
+                self._remember(stored)
+            found.update(stored)
+            for key in stored:
+                del missing[key]
+
+        encoded: Dict[str, np.ndarray] = {}
+        if missing:
+            started = time.perf_counter()
+            vectors = self.model.encode(list(missing.values()), batch_size=self.batch_size, show_progress_bar=False)
+            elapsed = time.perf_counter() - started
+            encoded = dict(zip(missing, np.asarray(vectors, dtype=np.float32)))
+            with self._lock:
+                self._remember(encoded)
+                self.encode_seconds += elapsed
+            if self.store is not None:
+                try:
+                    self.store.add(encoded)
+                except (OSError, ValueError) as e:
+                    self.logger.warning(f"Could not persist embeddings for {self.model_name}: {e}")
+            found.update(encoded)
+
+        with self._lock:
+            self.misses += len(encoded)
+            self.hits += len(sentences) - len(encoded)
+        cache_lookup('embeddings', hit=True, count=len(sentences) - len(encoded))
+        cache_lookup('embeddings', hit=False, count=len(encoded))
+
+        if not sentences:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack([found[key] for key in keys])
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        seconds_per_sentence = self.encode_seconds / self.misses if self.misses else 0.0
+        return {
+            'entries': len(self._vectors),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'encode_seconds': self.encode_seconds,
+            # Estimated from the average encode time of the sentences that missed
+            'saved_seconds': self.hits * seconds_per_sentence
+        }
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name: str, device: Optional[str] = None) -> EmbeddingCache:
+    """Process-wide embedding cache for a sentence-transformers model, shared by every summarizer."""
+    key = f"{model_name}:{device or 'cpu'}"
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = EmbeddingCache(
+                model_name, device, max_entries=Config.EMBEDDING_CACHE_SIZE, store_dir=Config.EMBEDDING_CACHE_DIR
+            )
+        return _caches[key]
+
+
+def embedding_cache_stats() -> Dict[str, Dict[str, float]]:
+    with _caches_lock:
+        return {key: cache.stats() for key, cache in _caches.items()}
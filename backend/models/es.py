@@ -1,53 +1,156 @@
+import copy
+import math
+import threading
+from collections import Counter
+from typing import List
+
+import numpy as np
 import torch
-from transformers import BartTokenizer, BartForConditionalGeneration
-import language_tool_python  # For grammar and spelling correction
 from sklearn.feature_extraction.text import CountVectorizer  # For keyword extraction
+from sklearn.utils import murmurhash3_32
 from textblob import TextBlob  # For sentiment analysis
 
-def generate_cybersecurity_summary(report_text):
-    
-    # Load the pre-trained BART model and tokenizer
-    model_name = "facebook/bart-large-cnn"
-    tokenizer = BartTokenizer.from_pretrained(model_name)
-    model = BartForConditionalGeneration.from_pretrained(model_name)
-
-    # Preprocess the input text
-    inputs = tokenizer(report_text, max_length=1024, truncation=True, return_tensors="pt")
-
-    # Fine-tuning instructions for better summary generation
-    summary_ids = model.generate(
-        inputs['input_ids'],
-        num_beams=6,  # Increase beam search for better quality
-        length_penalty=1.2,  # Slightly reduce penalty to allow more details
-        max_length=300,  # Allow longer summaries
-        min_length=100,  # Ensure sufficient content
-        no_repeat_ngram_size=3,  # Avoid repetitive phrases
-        early_stopping=True  # Stop generation when the summary is complete
-    )
-
-    # Decode the generated summary
-    summary = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
-
-    # Grammar and spelling correction
-    tool = language_tool_python.LanguageTool('en-US')
-    corrected_summary = tool.correct(summary)
-
-    # Refine the summary to ensure it is cybersecurity-specific and flows logically
-    refined_summary = refine_cybersecurity_summary(corrected_summary, report_text)
-
-    # Perform keyword extraction to highlight vulnerabilities or attack vectors
-    keywords = extract_keywords(report_text)
-
-    # Perform sentiment analysis to assess the severity of risks
-    sentiment = analyze_sentiment(report_text)
-
-    # Append keywords and sentiment analysis results to the summary
-    if keywords:
-        refined_summary += f" Key vulnerabilities or attack vectors identified include: {', '.join(keywords)}."
-    if sentiment:
-        refined_summary += f" Sentiment analysis indicates that the overall risk level is {sentiment}."
+from models.registry import get_bart, get_language_tool
 
-    return refined_summary
+
+class CybersecuritySummaryService:
+    """Long-lived summarizer: BART and LanguageTool are shared and loaded on first use.
+
+    Grammar correction sends a whole batch of texts to LanguageTool in one
+    check, and keyword scores are weighted by how common a term is across every
+    report seen so far (hashed document frequencies, updated per report).
+    """
+
+    # Joins texts in one LanguageTool request; matches spanning it are dropped
+    BATCH_SEPARATOR = "\n\n"
+
+    def __init__(self, model_name: str = "facebook/bart-large-cnn", language: str = 'en-US',
+                 n_features: int = 2 ** 20, batch_size: int = 4):
+        self.model_name = model_name
+        self.language = language
+        self.batch_size = batch_size
+        self.n_features = n_features
+        # Same tokenization as the previous per-call CountVectorizer, built once
+        self._analyzer = CountVectorizer(stop_words='english', ngram_range=(1, 2)).build_analyzer()
+        self._document_frequency = np.zeros(n_features, dtype=np.int32)
+        self._documents = 0
+        self._corpus_lock = threading.Lock()
+        self._grammar_lock = threading.Lock()
+
+    @property
+    def tokenizer(self):
+        return get_bart(self.model_name)[0]
+
+    @property
+    def model(self):
+        return get_bart(self.model_name)[1]
+
+    @property
+    def grammar_tool(self):
+        return get_language_tool(self.language)
+
+    def generate(self, report_texts: List[str]) -> List[str]:
+        """BART summaries for several reports, in padded batches."""
+        summaries = []
+        for start in range(0, len(report_texts), self.batch_size):
+            batch = report_texts[start:start + self.batch_size]
+            inputs = self.tokenizer(batch, max_length=1024, truncation=True, padding=True, return_tensors="pt")
+            with torch.inference_mode():
+                summary_ids = self.model.generate(
+                    inputs['input_ids'],
+                    attention_mask=inputs['attention_mask'],
+                    num_beams=6,  # Increase beam search for better quality
+                    length_penalty=1.2,  # Slightly reduce penalty to allow more details
+                    max_length=300,  # Allow longer summaries
+                    min_length=100,  # Ensure sufficient content
+                    no_repeat_ngram_size=3,  # Avoid repetitive phrases
+                    early_stopping=True  # Stop generation when the summary is complete
+                )
+            summaries.extend(self.tokenizer.batch_decode(summary_ids, skip_special_tokens=True))
+        return summaries
+
+    def correct(self, texts: List[str]) -> List[str]:
+        """Grammar and spelling correction for a batch of texts with a single LanguageTool check."""
+        from language_tool_python.utils import correct
+
+        if not texts:
+            return []
+        starts, offset = [], 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + len(self.BATCH_SEPARATOR)
+        with self._grammar_lock:
+            matches = self.grammar_tool.check(self.BATCH_SEPARATOR.join(texts))
+
+        per_text = [[] for _ in texts]
+        for match in matches:
+            for index in range(len(texts) - 1, -1, -1):
+                if match.offset >= starts[index]:
+                    break
+            local = copy.copy(match)
+            local.offset = match.offset - starts[index]
+            if local.offset + match.errorLength <= len(texts[index]):
+                per_text[index].append(local)
+        return [correct(text, text_matches) for text, text_matches in zip(texts, per_text)]
+
+    def _term_index(self, term: str) -> int:
+        return murmurhash3_32(term, positive=True) % self.n_features
+
+    def extract_keywords(self, text: str, top_n: int = 5, update_corpus: bool = True) -> List[str]:
+        """Top terms by count, doubled for cybersecurity terms and scaled by corpus IDF.
+
+        With a single report in the corpus the IDF factor is 1, which gives the
+        same ranking as the previous per-call CountVectorizer; as more reports
+        are seen, boilerplate that appears in every report is pushed down.
+        """
+        counts = Counter(self._analyzer(text))
+        if not counts:
+            return []
+        indices = {term: self._term_index(term) for term in counts}
+        with self._corpus_lock:
+            if update_corpus:
+                self._document_frequency[np.unique(list(indices.values()))] += 1
+                self._documents += 1
+            documents = self._documents
+            frequencies = {term: int(self._document_frequency[index]) for term, index in indices.items()}
+
+        keyword_scores = {}
+        for term, count in counts.items():
+            idf = math.log((1 + documents) / (1 + frequencies[term])) + 1
+            boost = 2 if term in CYBERSECURITY_TERMS else 1  # Prioritize cybersecurity terms
+            keyword_scores[term] = count * boost * idf
+        # Ties fall back to alphabetical order, like CountVectorizer's sorted vocabulary
+        ranked = sorted(keyword_scores.items(), key=lambda item: (-item[1], item[0]))[:top_n]
+        return [kw for kw, _ in ranked]
+
+    def summarize_many(self, report_texts: List[str]) -> List[str]:
+        """Full summaries (generation, correction, refinement, keywords, sentiment) for several reports."""
+        corrected = self.correct(self.generate(report_texts))
+        results = []
+        for report_text, corrected_summary in zip(report_texts, corrected):
+            # Refine the summary to ensure it is cybersecurity-specific and flows logically
+            refined_summary = refine_cybersecurity_summary(corrected_summary, report_text)
+
+            # Perform keyword extraction to highlight vulnerabilities or attack vectors
+            keywords = self.extract_keywords(report_text)
+
+            # Perform sentiment analysis to assess the severity of risks
+            sentiment = analyze_sentiment(report_text)
+
+            # Append keywords and sentiment analysis results to the summary
+            if keywords:
+                refined_summary += f" Key vulnerabilities or attack vectors identified include: {', '.join(keywords)}."
+            if sentiment:
+                refined_summary += f" Sentiment analysis indicates that the overall risk level is {sentiment}."
+            results.append(refined_summary)
+        return results
+
+    def summarize(self, report_text: str) -> str:
+        return self.summarize_many([report_text])[0]
+
+
+def generate_cybersecurity_summary(report_text):
+    return summary_service.summarize(report_text)
 
 
 def refine_cybersecurity_summary(summary, report_text):
@@ -90,56 +193,40 @@ def refine_cybersecurity_summary(summary, report_text):
     return refined_summary
 
 
-def extract_keywords(text):
+# Cybersecurity-related terms to prioritize in keyword extraction
+CYBERSECURITY_TERMS = {
+    "vulnerability", "exploit", "attack vector", "threat actor", "phishing",
+    "malware", "ransomware", "data breach", "unauthorized access", "zero-day",
+    "firewall", "intrusion detection", "encryption", "multi-factor authentication",
     
-    # Define a custom list of cybersecurity-related terms to prioritize
-    cybersecurity_terms = [
-        "vulnerability", "exploit", "attack vector", "threat actor", "phishing",
-        "malware", "ransomware", "data breach", "unauthorized access", "zero-day",
-        "firewall", "intrusion detection", "encryption", "multi-factor authentication",
-        
-        # Additional terms:
-        "adversary", "APT (Advanced Persistent Threat)", "backdoor", "botnet", 
-        "brute force attack", "credential stuffing", "cross-site scripting (XSS)",
-        "denial of service (DoS)", "distributed denial of service (DDoS)", 
-        "endpoint security", "honeypot", "incident response", "keylogger", 
-        "man-in-the-middle (MitM) attack", "patch management", "payload", 
-        "penetration testing", "privilege escalation", "rootkit", "sandbox", 
-        "social engineering", "spyware", "SQL injection", "threat intelligence", 
-        "two-factor authentication (2FA)", "virtual private network (VPN)", 
-        "virus", "worm", "whaling", "watering hole attack", "white hat", 
-        "black hat", "gray hat", "red team", "blue team", "purple team", 
-        "security information and event management (SIEM)", 
-        "security operations center (SOC)", "zero trust architecture", 
-        "biometric authentication", "blockchain", "cloud security", 
-        "cryptocurrency", "dark web", "digital certificate", "digital forensics", 
-        "DNS spoofing", "fileless malware", "hash function", "insider threat", 
-        "least privilege", "logic bomb", "macro virus", "network segmentation", 
-        "obfuscation", "open redirect", "password cracking", "password spraying", 
-        "port scanning", "protocol", "quantum cryptography", "risk assessment", 
-        "rogue software", "secure socket layer (SSL)", "session hijacking", 
-        "sniffing", "spoofing", "supply chain attack", "threat hunting", 
-        "tokenization", "Trojan horse", "USB drop attack", "web application firewall (WAF)", 
-        "wireless security", "zero knowledge proof"
-    ]
+    # Additional terms:
+    "adversary", "APT (Advanced Persistent Threat)", "backdoor", "botnet", 
+    "brute force attack", "credential stuffing", "cross-site scripting (XSS)",
+    "denial of service (DoS)", "distributed denial of service (DDoS)", 
+    "endpoint security", "honeypot", "incident response", "keylogger", 
+    "man-in-the-middle (MitM) attack", "patch management", "payload", 
+    "penetration testing", "privilege escalation", "rootkit", "sandbox", 
+    "social engineering", "spyware", "SQL injection", "threat intelligence", 
+    "two-factor authentication (2FA)", "virtual private network (VPN)", 
+    "virus", "worm", "whaling", "watering hole attack", "white hat", 
+    "black hat", "gray hat", "red team", "blue team", "purple team", 
+    "security information and event management (SIEM)", 
+    "security operations center (SOC)", "zero trust architecture", 
+    "biometric authentication", "blockchain", "cloud security", 
+    "cryptocurrency", "dark web", "digital certificate", "digital forensics", 
+    "DNS spoofing", "fileless malware", "hash function", "insider threat", 
+    "least privilege", "logic bomb", "macro virus", "network segmentation", 
+    "obfuscation", "open redirect", "password cracking", "password spraying", 
+    "port scanning", "protocol", "quantum cryptography", "risk assessment", 
+    "rogue software", "secure socket layer (SSL)", "session hijacking", 
+    "sniffing", "spoofing", "supply chain attack", "threat hunting", 
+    "tokenization", "Trojan horse", "USB drop attack", "web application firewall (WAF)", 
+    "wireless security", "zero knowledge proof"
+}
 
-    # Use CountVectorizer to extract top keywords
-    vectorizer = CountVectorizer(stop_words='english', ngram_range=(1, 2))
-    X = vectorizer.fit_transform([text])
-    feature_array = vectorizer.get_feature_names_out()
-    word_counts = X.toarray().flatten()
 
-    # Combine term frequency with custom prioritization
-    keyword_scores = {}
-    for term, count in zip(feature_array, word_counts):
-        if term in cybersecurity_terms:
-            keyword_scores[term] = count * 2  # Prioritize cybersecurity terms
-        else:
-            keyword_scores[term] = count
-
-    # Sort keywords by score and return top 5
-    sorted_keywords = sorted(keyword_scores.items(), key=lambda x: x[1], reverse=True)[:5]
-    return [kw for kw, _ in sorted_keywords]
+def extract_keywords(text):
+    return summary_service.extract_keywords(text)
 
 
 def analyze_sentiment(text):
@@ -156,6 +243,9 @@ def analyze_sentiment(text):
 
 
 
+summary_service = CybersecuritySummaryService()
+
+
 def main():
     # Example input text (can be replaced with any type of document)
     input_text = """
@@ -1,6 +1,12 @@
 import os
 import json
-from openai import OpenAI
+import logging
+from openai import OpenAI, APITimeoutError
+
+from pipeline.metrics import LLM_SECONDS, LLM_TOKENS
+from pipeline.tracing import span
+
+logger = logging.getLogger(__name__)
 
 # Configure the API client
 token = os.environ.get("GITHUB_TOKEN")  # Ensure your GITHUB_TOKEN is properly set in the environment
@@ -13,13 +19,19 @@ client = OpenAI(
 )
 
 
-def generate_audit_report(raw_text):
+def generate_audit_report(raw_text, cancel_token=None):
     """
     Generates a cybersecurity audit report using the GPT-4 model hosted on infrastructure.
+    When a cancel_token is given the response is streamed so that a cancelled or
+    timed-out job stops generation (and token spend) between chunks.
     """
     try:
+        if cancel_token:
+            cancel_token.check()
+
         # The enhanced prompt to instruct GPT-4 to generate a detailed and accurate report
-        prompt = f"""
+        with span('llm.prompt_build', bytes_in=len(raw_text)) as prompt_span:
+            prompt = f"""
 You are a professional cybersecurity analyst tasked with generating a comprehensive cybersecurity audit report based on the 
 provided raw text from a cybersecurity document. The report should be tailored to the specific focus of the document, 
 whether it be vulnerabilities, compliance issues, or other security concerns, vulnerability assessment, penetration test summary, 
@@ -132,9 +144,10 @@ Use the raw text below as input information for creating the report:
 
 Begin writing the report:
 """
+            prompt_span.bytes_out = len(prompt)
 
         # Sending the enhanced prompt to the API
-        response = client.chat.completions.create(
+        request_args = dict(
             messages=[
                 {
                     "role": "system",
@@ -151,14 +164,61 @@ Begin writing the report:
             model=model_name,
         )
 
-        # Extract the generated content
-        report = response.choices[0].message.content
+        streamed = cancel_token is not None
+        with span('llm.call', bytes_in=len(prompt), model=model_name, streamed=streamed) as call_span, \
+                LLM_SECONDS.labels(model_name, str(streamed).lower()).time():
+            if cancel_token is None:
+                response = client.chat.completions.create(**request_args)
+                _record_usage(response.usage)
+
+                # Extract the generated content
+                report = response.choices[0].message.content
+            else:
+                report = _stream_report(request_args, cancel_token)
+            call_span.bytes_out = len(report or "")
         return report
 
     except Exception as e:
         return f"An error occurred: {str(e)}"
 
 
+def _stream_report(request_args, cancel_token):
+    """Stream the completion, checking the cancellation token between chunks."""
+    timeout = cancel_token.remaining()
+    api = client.with_options(timeout=timeout) if timeout else client
+    try:
+        # The final chunk carries the token usage when include_usage is set.
+        stream = api.chat.completions.create(stream=True, stream_options={"include_usage": True}, **request_args)
+    except APITimeoutError as e:
+        # The client timeout is the stage deadline; report it as such, not as a failure
+        raise cancel_token.stage_timeout() from e
+    parts = []
+    try:
+        for chunk in stream:
+            cancel_token.check()
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+            if getattr(chunk, 'usage', None):
+                _record_usage(chunk.usage)
+    except Exception as e:
+        # A read timeout mid-stream surfaces as the HTTP library's own error, not
+        # APITimeoutError; once the deadline has passed, any failure is the timeout
+        if isinstance(e, APITimeoutError) or cancel_token.remaining() == 0:
+            raise cancel_token.stage_timeout() from e
+        raise
+    finally:
+        # Closing the stream drops the HTTP connection and ends generation early.
+        stream.close()
+    return "".join(parts)
+
+
+def _record_usage(usage):
+    if usage is None:
+        return
+    LLM_TOKENS.labels(model_name, 'prompt').inc(usage.prompt_tokens or 0)
+    LLM_TOKENS.labels(model_name, 'completion').inc(usage.completion_tokens or 0)
+
+
 import json
 
 def parse_results(results_content):
@@ -171,10 +231,11 @@ def parse_results(results_content):
             results_content = results_content.strip("```json").strip("```").strip()
         
         # Attempt to parse the results content as JSON
-        return json.loads(results_content)
+        with span('report.json_parse', bytes_in=len(results_content)):
+            return json.loads(results_content)
     except json.JSONDecodeError as e:
-        print(f"Error parsing Results section as JSON: {e}")
-        print("Problematic Results content:\n", results_content)
+        # Prose sections land here on every report, so the content is a sampled payload
+        logger.debug(f"Section is not valid JSON: {e}", extra={'payload': results_content})
         
         # Return a default/fallback structure in case of error
         return {
@@ -226,10 +287,10 @@ def save_report_to_advanced_json(report, filename="Updated_cybersecurity_audit_r
         # Save the structured report as a JSON file with UTF-8 encoding
         with open(filename, "w", encoding="utf-8") as json_file:
             json.dump(report_data, json_file, indent=4, ensure_ascii=False)
-        print(f"Report successfully saved to {filename}")
+        logger.debug(f"Report saved to {filename}")
         return filename  # Return the saved file path
     except Exception as e:
-        print(f"An error occurred while saving the report: {str(e)}")
+        logger.error(f"An error occurred while saving the report: {str(e)}")
         return None  # Return None if there was an error
     
 
@@ -240,16 +301,16 @@ def load_json_data(file_path):
     try:
         with open(file_path, "r", encoding="utf-8") as json_file:
             data = json.load(json_file)  # Load JSON content into a Python dictionary
-            print(f"Successfully loaded data from: {file_path}")
+            logger.debug(f"Loaded data from: {file_path}")
             return data
     except FileNotFoundError:
-        print(f"File not found: {file_path}")
+        logger.error(f"File not found: {file_path}")
         return None
     except json.JSONDecodeError as e:
-        print(f"Error decoding JSON from file {file_path}: {e}")
+        logger.error(f"Error decoding JSON from file {file_path}: {e}")
         return None
     except Exception as e:
-        print(f"An unexpected error occurred while reading the file: {e}")
+        logger.error(f"An unexpected error occurred while reading the file: {e}")
         return None
 
 
@@ -1,15 +1,15 @@
-from transformers import pipeline
+import time
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
 
-def format_findings_and_vulnerabilities_free(raw_text):
-    """
-    Function to structure extracted raw text into a well-formatted 'Findings and Vulnerabilities' section
-    using a free Hugging Face model.
-    """
-    # Load a summarization pipeline with a free Hugging Face model
-    summarizer = pipeline("summarization", model="google/flan-t5-base", tokenizer="google/flan-t5-base")
+from models.registry import get_pipeline
+from models.windowing import TokenWindower
+
+MODEL_NAME = "google/flan-t5-base"
 
-    # Prompt to organize findings
-    prompt = f"""
+# Prompt to organize findings; {raw_text} is one segment of the extracted text
+PROMPT_TEMPLATE = """
     You are a cybersecurity expert. The following text is extracted from a document and contains findings and vulnerabilities.
     Your task is to:
     1. Summarize and organize the findings into clear, concise bullet points.
@@ -22,11 +22,82 @@ def format_findings_and_vulnerabilities_free(raw_text):
     Provide the formatted output.
     """
 
-    # Generate the summary using the model
-    summary = summarizer(prompt, max_length=512, min_length=100, do_sample=False)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchThroughput:
+    """Timing of one pipeline batch."""
+    segments: int
+    input_tokens: int
+    seconds: float
+
+    @property
+    def segments_per_second(self) -> float:
+        return self.segments / self.seconds if self.seconds else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.input_tokens / self.seconds if self.seconds else 0.0
+
+
+def get_summarizer():
+    """Shared summarization pipeline with a free Hugging Face model (loaded once per process)."""
+    return get_pipeline("summarization", MODEL_NAME)
+
 
-    # Extract and return the summary text
-    return summary[0]['summary_text']
+def segment_text(raw_text: str, max_input_tokens: int = 512) -> List[str]:
+    """Split raw text on sentence boundaries into segments that fit the prompt's token budget."""
+    tokenizer = get_summarizer().tokenizer
+    prompt_tokens = len(tokenizer(PROMPT_TEMPLATE.format(raw_text=""))["input_ids"])
+    windower = TokenWindower(tokenizer, overlap_tokens=0)
+    windows = windower.windows(raw_text, max_input_tokens - prompt_tokens)
+    return [tokenizer.decode(ids, skip_special_tokens=True) for ids in windows if ids]
+
+
+def format_findings_batch(segments: List[str], batch_size: int = 8, truncation: bool = True,
+                          max_length: int = 512, min_length: int = 100,
+                          throughput: Optional[List[BatchThroughput]] = None) -> List[str]:
+    """Format many raw-text segments, ``batch_size`` prompts per pipeline call.
+
+    With ``truncation`` prompts longer than the model's input limit are cut
+    (use ``segment_text`` first to avoid losing text). Timing for every batch
+    is logged and, when a ``throughput`` list is passed, appended to it.
+    """
+    summarizer = get_summarizer()
+    tokenizer = summarizer.tokenizer
+    outputs: List[str] = []
+    for start in range(0, len(segments), batch_size):
+        prompts = [PROMPT_TEMPLATE.format(raw_text=segment) for segment in segments[start:start + batch_size]]
+        input_tokens = sum(
+            min(len(ids), tokenizer.model_max_length) if truncation else len(ids)
+            for ids in tokenizer(prompts)["input_ids"]
+        )
+        started = time.perf_counter()
+        results = summarizer(
+            prompts, batch_size=batch_size, truncation=truncation, max_length=max_length, min_length=min_length,
+            do_sample=False
+        )
+        batch = BatchThroughput(len(prompts), input_tokens, time.perf_counter() - started)
+        logger.info(f"Batch {start // batch_size + 1}: {batch.segments} segments in {batch.seconds:.2f}s "
+                    f"({batch.segments_per_second:.2f} segments/s, {batch.tokens_per_second:.0f} input tokens/s)")
+        if throughput is not None:
+            throughput.append(batch)
+        outputs.extend(result['summary_text'] for result in results)
+    return outputs
+
+
+def format_findings_and_vulnerabilities_free(raw_text, batch_size: int = 8, max_input_tokens: int = 512):
+    """
+    Function to structure extracted raw text into a well-formatted 'Findings and Vulnerabilities' section
+    using a free Hugging Face model.
+
+    Long text is split into segments that fit the model's input, and the segments are formatted in batches.
+    """
+    segments = segment_text(raw_text, max_input_tokens)
+    if not segments:
+        return ""
+    return "\n\n".join(format_findings_batch(segments, batch_size))
 
 
 # Example usage
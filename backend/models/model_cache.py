@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+
+def _sha256_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def safe_name(model_name: str) -> str:
+    """Directory name for a model id such as 'org/model'."""
+    return model_name.replace('/', '--')
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive inter-process lock so concurrent workers download a model only once."""
+    with open(path, 'a+') as handle:
+        try:
+            import fcntl
+        except ImportError:  # Windows: fall back to no locking
+            yield
+            return
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+class LocalModelCache:
+    """Versioned on-disk model cache with a checksum manifest.
+
+    Each model lives in ``<root>/<model name>/<revision>/`` next to a
+    ``manifest.json`` listing every file's size and SHA-256. A cache entry is
+    only used when it matches its manifest; otherwise it is fetched into a
+    temporary directory and renamed into place, so a crash mid-download never
+    leaves a half-written model behind and an existing entry is never rewritten.
+
+    By default an entry is checked by file size only; ``verify='checksum'``
+    re-hashes every file on each check, which is slow for large checkpoints.
+    """
+
+    def __init__(self, root: str, verify: str = 'size'):
+        if verify not in ('checksum', 'size'):
+            raise ValueError("verify must be 'checksum' or 'size'")
+        self.root = root
+        self.verify = verify
+        self.logger = logging.getLogger(__name__)
+
+    def path_for(self, model_name: str, revision: str = 'main') -> str:
+        return os.path.join(self.root, safe_name(model_name), safe_name(revision))
+
+    def read_manifest(self, path: str) -> Optional[Dict]:
+        try:
+            with open(os.path.join(path, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_valid(self, path: str) -> bool:
+        manifest = self.read_manifest(path)
+        if not manifest or manifest.get('version') != MANIFEST_VERSION or not manifest.get('files'):
+            return False
+        for relpath, info in manifest['files'].items():
+            file_path = os.path.join(path, relpath)
+            try:
+                if os.path.getsize(file_path) != info['size']:
+                    return False
+            except OSError:
+                return False
+            if self.verify == 'checksum' and _sha256_file(file_path) != info['sha256']:
+                self.logger.warning(f"Checksum mismatch for {file_path}")
+                return False
+        return True
+
+    def ensure(self, model_name: str, fetch: Callable[[str], None], revision: str = 'main') -> str:
+        """Return the cache directory for a model, calling fetch(target_dir) only when missing."""
+        path = self.path_for(model_name, revision)
+        if self.is_valid(path):
+            return path
+
+        parent = os.path.dirname(path)
+        os.makedirs(parent, exist_ok=True)
+        with file_lock(os.path.join(parent, '.lock')):
+            # Another process may have finished the download while we waited.
+            if self.is_valid(path):
+                return path
+
+            self.logger.info(f"Caching model '{model_name}' ({revision}) in {path}")
+            started = time.perf_counter()
+            staging = tempfile.mkdtemp(prefix='.staging-', dir=parent)
+            try:
+                fetch(staging)
+                self._write_manifest(staging, model_name, revision)
+                if os.path.exists(path):
+                    stale = f"{path}.stale-{os.getpid()}"
+                    os.replace(path, stale)
+                    shutil.rmtree(stale, ignore_errors=True)
+                os.replace(staging, path)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+            self.logger.info(f"Cached model '{model_name}' in {time.perf_counter() - started:.1f}s")
+        return path
+
+    def _write_manifest(self, directory: str, model_name: str, revision: str):
+        files = {}
+        for root, _, names in os.walk(directory):
+            for name in names:
+                file_path = os.path.join(root, name)
+                relpath = os.path.relpath(file_path, directory).replace(os.sep, '/')
+                files[relpath] = {'size': os.path.getsize(file_path), 'sha256': _sha256_file(file_path)}
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'model_name': model_name,
+            'revision': revision,
+            'created_at': time.time(),
+            'files': files
+        }
+        with open(os.path.join(directory, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,304 @@
+import gc
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from config.config import Config
+from models.model_cache import LocalModelCache
+from pipeline.metrics import cache_lookup
+
+
+def _current_rss_bytes() -> int:
+    """Resident set size of this process (Linux /proc, falling back to ru_maxrss)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _tensor_bytes(obj: Any) -> int:
+    """Parameter + buffer bytes for torch modules (or tuples containing them)."""
+    if isinstance(obj, (tuple, list)):
+        return sum(_tensor_bytes(item) for item in obj)
+    parameters = getattr(obj, 'parameters', None)
+    buffers = getattr(obj, 'buffers', None)
+    if not callable(parameters) or not callable(buffers):
+        return 0
+    try:
+        return sum(t.numel() * t.element_size() for t in parameters()) + \
+            sum(t.numel() * t.element_size() for t in buffers())
+    except Exception:
+        return 0
+
+
+def _make_read_only(obj: Any):
+    """Put torch modules in eval mode without gradients so instances can be shared."""
+    if isinstance(obj, (tuple, list)):
+        for item in obj:
+            _make_read_only(item)
+        return
+    if callable(getattr(obj, 'eval', None)) and callable(getattr(obj, 'requires_grad_', None)):
+        obj.eval()
+        obj.requires_grad_(False)
+
+
+@dataclass
+class ModelEntry:
+    key: str
+    loader: Callable[[], Any]
+    instance: Any = None
+    load_seconds: float = 0.0
+    resident_bytes: int = 0
+    last_used: float = 0.0
+    hits: int = 0
+    loads: int = 0
+    pinned: bool = False
+
+
+class ModelRegistry:
+    """Process-wide cache of heavyweight NLP models.
+
+    Each model is loaded lazily the first time ``get`` is called for its key and
+    the same read-only instance is handed to every caller afterwards. When a
+    memory budget is set, least-recently-used models that have been idle for
+    ``idle_seconds`` are dropped (callers holding a reference keep it alive until
+    they let go). ``preload`` loads models up front and freezes the GC so that
+    pre-forked workers (gunicorn ``--preload``) share the weights copy-on-write.
+    """
+
+    def __init__(self, memory_budget_mb: float = 0, idle_seconds: float = 300):
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 * 1024)
+        self.idle_seconds = idle_seconds
+        self.logger = logging.getLogger(__name__)
+        self._entries: Dict[str, ModelEntry] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def register(self, key: str, loader: Callable[[], Any]):
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = ModelEntry(key, loader)
+                self._key_locks[key] = threading.Lock()
+
+    def get(self, key: str, loader: Optional[Callable[[], Any]] = None) -> Any:
+        """Return the shared instance for key, loading it on first use."""
+        if loader is not None:
+            self.register(key, loader)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                raise KeyError(f"No model registered under '{key}'")
+            key_lock = self._key_locks[key]
+
+        # Hand back the instance read here: a concurrent evict() may clear the entry
+        instance = entry.instance
+        loaded = instance is not None
+        if not loaded:
+            # Per-key lock: two threads asking for the same model load it once,
+            # while different models can load concurrently.
+            with key_lock:
+                if entry.instance is None:
+                    self._load(entry)
+                instance = entry.instance
+            # Outside the key lock, since evicting takes the other models' key locks
+            self._enforce_budget(exclude=key)
+
+        cache_lookup('models', hit=loaded)
+        entry.hits += 1
+        entry.last_used = time.monotonic()
+        return instance
+
+    def _load(self, entry: ModelEntry):
+        self.logger.info(f"Loading model '{entry.key}'...")
+        rss_before = _current_rss_bytes()
+        started = time.perf_counter()
+        instance = entry.loader()
+        entry.load_seconds = time.perf_counter() - started
+        _make_read_only(instance)
+        entry.resident_bytes = _tensor_bytes(instance) or max(0, _current_rss_bytes() - rss_before)
+        entry.instance = instance
+        entry.loads += 1
+        self.logger.info(
+            f"Loaded model '{entry.key}' in {entry.load_seconds:.2f}s "
+            f"({entry.resident_bytes / (1024 * 1024):.1f} MB)"
+        )
+
+    def _enforce_budget(self, exclude: Optional[str] = None):
+        if not self.memory_budget_bytes:
+            return
+        with self._lock:
+            loaded = [e for e in self._entries.values() if e.instance is not None]
+        total = sum(e.resident_bytes for e in loaded)
+        now = time.monotonic()
+        for entry in sorted(loaded, key=lambda e: e.last_used):
+            if total <= self.memory_budget_bytes:
+                break
+            if entry.key == exclude or entry.pinned or now - entry.last_used < self.idle_seconds:
+                continue
+            if self.evict(entry.key):
+                total -= entry.resident_bytes
+
+    def evict(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            key_lock = self._key_locks.get(key)
+        if entry is None:
+            return False
+        # Under the key lock so an eviction cannot interleave with a load of the same model
+        with key_lock:
+            if entry.instance is None:
+                return False
+            entry.instance = None
+        gc.collect()
+        self.logger.info(f"Evicted idle model '{key}'")
+        return True
+
+    def preload(self, keys: Iterable[str]):
+        """Load registered models now, e.g. in the gunicorn master before forking."""
+        for key in keys:
+            self.get(key)
+        self.freeze_for_fork()
+
+    def freeze_for_fork(self):
+        """Pin every loaded model and freeze the GC ahead of forking workers."""
+        with self._lock:
+            for entry in self._entries.values():
+                if entry.instance is not None:
+                    entry.pinned = True
+        # Move everything allocated so far out of the collector's generations so
+        # forked children do not dirty (and copy) those pages during GC passes.
+        gc.collect()
+        gc.freeze()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            e.key: {
+                'loaded': e.instance is not None,
+                'load_seconds': e.load_seconds,
+                'resident_mb': e.resident_bytes / (1024 * 1024),
+                'hits': e.hits,
+                'loads': e.loads,
+                'pinned': e.pinned
+            }
+            for e in entries
+        }
+
+
+registry = ModelRegistry(
+    memory_budget_mb=Config.MODEL_MEMORY_BUDGET_MB,
+    idle_seconds=Config.MODEL_IDLE_SECONDS
+)
+
+
+def _normalize_sentence_model(name: str) -> str:
+    return name.split('/', 1)[1] if name.startswith('sentence-transformers/') else name
+
+
+def get_t5(model_name: str, device: Optional[str] = None, local_path: Optional[str] = None,
+           revision: str = 'main', backend: str = 'torch'):
+    """Shared (tokenizer, model) pair for a T5 checkpoint.
+
+    With local_path the checkpoint goes through the versioned local model cache:
+    it is downloaded and written once, then loaded from safetensors (memory
+    mapped) on every later start. ``backend`` selects fp32 PyTorch ('torch'),
+    dynamic int8 quantization ('int8') or ONNX Runtime ('onnx'); the last two
+    always run on CPU.
+    """
+    from models.t5_backends import load_t5_for_backend, validate_backend
+    validate_backend(backend)
+    if backend != 'torch':
+        device = 'cpu'
+
+    def fetch(target: str):
+        from transformers import T5Tokenizer, T5ForConditionalGeneration
+        T5Tokenizer.from_pretrained(model_name, revision=revision).save_pretrained(target)
+        T5ForConditionalGeneration.from_pretrained(model_name, revision=revision).save_pretrained(
+            target, safe_serialization=True
+        )
+
+    def load():
+        from transformers import T5Tokenizer
+        source = None
+        if local_path:
+            source = LocalModelCache(local_path, Config.MODEL_CACHE_VERIFY).ensure(model_name, fetch, revision)
+            tokenizer = T5Tokenizer.from_pretrained(source)
+        else:
+            tokenizer = T5Tokenizer.from_pretrained(model_name, revision=revision)
+        model = load_t5_for_backend(
+            model_name, backend, source, local_path or Config.MODEL_CACHE_DIR, revision, Config.MODEL_CACHE_VERIFY
+        )
+        if device:
+            model = model.to(device)
+        return tokenizer, model
+    return registry.get(f"t5:{model_name}@{revision}:{backend}:{device or 'cpu'}", load)
+
+
+def get_bart(model_name: str = "facebook/bart-large-cnn"):
+    """Shared (tokenizer, model) pair for a BART checkpoint."""
+    def load():
+        from transformers import BartTokenizer, BartForConditionalGeneration
+        return BartTokenizer.from_pretrained(model_name), BartForConditionalGeneration.from_pretrained(model_name)
+    return registry.get(f"bart:{model_name}", load)
+
+
+def get_language_tool(language: str = 'en-US'):
+    """Shared LanguageTool instance; starting one launches a local Java server."""
+    def load():
+        import language_tool_python
+        return language_tool_python.LanguageTool(language)
+    return registry.get(f"languagetool:{language}", load)
+
+
+def get_spacy(model_name: str):
+    def load():
+        import spacy
+        return spacy.load(model_name)
+    return registry.get(f"spacy:{model_name}", load)
+
+
+def get_sentence_transformer(model_name: str, device: Optional[str] = None):
+    model_name = _normalize_sentence_model(model_name)
+
+    def load():
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name, device=device)
+    return registry.get(f"sentence:{model_name}:{device or 'cpu'}", load)
+
+
+def get_pipeline(task: str, model_name: str):
+    """Shared Hugging Face pipeline instance."""
+    def load():
+        from transformers import pipeline
+        return pipeline(task, model=model_name, tokenizer=model_name)
+    return registry.get(f"pipeline:{task}:{model_name}", load)
+
+
+def _preload_t5(model_name: str):
+    from models.t5_backends import inference_device
+    return get_t5(model_name, str(inference_device(Config.T5_BACKEND)), backend=Config.T5_BACKEND)
+
+
+_SPEC_LOADERS = {
+    't5': _preload_t5,
+    'bart': get_bart,
+    'spacy': get_spacy,
+    'sentence': get_sentence_transformer,
+    'languagetool': get_language_tool,
+}
+
+
+def preload_models(specs: Iterable[str]):
+    """Load models given as 'kind:name' (e.g. 'spacy:en_core_web_sm') and prepare for fork."""
+    for spec in specs:
+        kind, _, name = spec.strip().partition(':')
+        if kind not in _SPEC_LOADERS or not name:
+            raise ValueError(f"Invalid model spec '{spec}'; expected one of {sorted(_SPEC_LOADERS)}:<name>")
+        _SPEC_LOADERS[kind](name)
+    registry.freeze_for_fork()
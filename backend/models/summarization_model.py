@@ -1,27 +1,59 @@
-import unicodedata
-from transformers import T5Tokenizer, T5ForConditionalGeneration
 import torch
 import os
 import logging
 import re
-from typing import Dict, Any
+from typing import Dict, Any, List
 from pathlib import Path
 from datetime import datetime
 import asyncio  # Add this import
 
+from config.config import Config
+from models.registry import get_t5
+from models.t5_backends import inference_device, validate_backend
+from models.windowing import TokenWindower
+from models.text_normalization import clean_output, preprocess_text
+
+
+class _PerRowLengthProcessor:
+    """Enforces a separate min/max output length for every row of a batched generate.
+
+    Rows shorter than their minimum cannot emit EOS; rows at their maximum can
+    only emit EOS (after which generate pads them while longer rows continue).
+    """
+
+    def __init__(self, min_lengths: List[int], max_lengths: List[int], eos_token_id: int, num_beams: int = 1):
+        self.min_lengths = min_lengths
+        self.max_lengths = max_lengths
+        self.eos_token_id = eos_token_id
+        self.num_beams = num_beams
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        cur_len = input_ids.shape[-1]
+        for row in range(scores.shape[0]):
+            index = row // self.num_beams
+            if cur_len < self.min_lengths[index]:
+                scores[row, self.eos_token_id] = -float('inf')
+            elif cur_len >= self.max_lengths[index] - 1:
+                eos_score = scores[row, self.eos_token_id].clone()
+                scores[row, :] = -float('inf')
+                scores[row, self.eos_token_id] = eos_score if torch.isfinite(eos_score) else 0.0
+        return scores
+
 class SummarizationModel:
-    def __init__(self, model_name: str = "google/flan-t5-large", local_path: str = "./models/flan-t5-large"):
+    def __init__(self, model_name: str = "google/flan-t5-large", local_path: str = "./models/flan-t5-large",
+                 max_input_tokens: int = 1024, window_overlap: int = 128, batch_size: int = 4,
+                 max_merge_rounds: int = 3, backend: str = None):
         """Initialize the summarization model with local caching."""
         self.logger = logging.getLogger(__name__)
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self.backend = validate_backend(backend or Config.T5_BACKEND)
+        self.device = inference_device(self.backend)
         self.local_path = Path(local_path)
         self.model_name = model_name
-
-        # Setup logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
+        self.max_input_tokens = max_input_tokens
+        self.window_overlap = window_overlap
+        self.batch_size = batch_size
+        self.max_merge_rounds = max_merge_rounds
+        self._windower = None
 
         try:
             self._setup_model()
@@ -35,112 +67,35 @@ class SummarizationModel:
             # Create local directory if it doesn't exist
             self.local_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Load or download model and tokenizer
-            if self.local_path.exists():
-                self.logger.info("Loading model from local cache...")
-                self.tokenizer = T5Tokenizer.from_pretrained(self.local_path)
-                self.model = T5ForConditionalGeneration.from_pretrained(self.local_path)
-            else:
-                self.logger.info("Downloading model...")
-                self.tokenizer = T5Tokenizer.from_pretrained(self.model_name)
-                self.model = T5ForConditionalGeneration.from_pretrained(self.model_name)
-                
-                # Save model locally
-                self.logger.info("Saving model to local cache...")
-                self.tokenizer.save_pretrained(self.local_path)
-                self.model.save_pretrained(self.local_path)
-
-            # Move model to device
-            self.model.to(self.device)
+            # Warm the shared registry entry (downloads and saves locally on first use)
+            self._t5()
             self.logger.info(f"Model loaded successfully on {self.device}")
 
         except Exception as e:
             self.logger.error(f"Model setup failed: {str(e)}")
             raise
 
+    def _t5(self):
+        return get_t5(self.model_name, str(self.device), str(self.local_path), backend=self.backend)
+
+    @property
+    def tokenizer(self):
+        return self._t5()[0]
+
+    @property
+    def model(self):
+        return self._t5()[1]
+
+    @property
+    def windower(self) -> TokenWindower:
+        if self._windower is None:
+            self._windower = TokenWindower(self.tokenizer, self.window_overlap)
+        return self._windower
+
     def _clean_output(self, text: str) -> str:
         """Enhanced cleaning of generated output text."""
         try:
-            # Remove noise and format issues
-            noise_patterns = {
-                r'\s*\.\s*\.\s*\.': '...',  # Fix ellipsis
-                r'­+': '',                   # Remove soft hyphens
-                r'_{2,}': '',                # Remove multiple underscores
-                r'\?{3,}': '?',              # Fix multiple question marks
-                r'-{3,}': '--',              # Standardize long dashes
-                r'\s{2,}': ' ',              # Remove multiple spaces
-                r'[\(\)\/]{2,}': '',         # Remove multiple parentheses/slashes
-                r'(?i)true:\s*': '',         # Remove True: prefix
-                r'(?i)false:\s*': '',        # Remove False: prefix
-                r'(?i)null:\s*': '',         # Remove Null: prefix
-                r'back to mail:.*': '',      # Remove mail references
-                r'http[s]?://\S+': '',       # Remove URLs
-                r'\d+\.\s*\d+\.\s*\d+\.': lambda m: m.group(0).replace(' ', ''),  # Fix version numbers
-            }
-            
-            for pattern, replacement in noise_patterns.items():
-                text = re.sub(pattern, replacement, text)
-
-            # Enhance formatting of security-specific content
-            security_formatting = {
-                # Format CVE references
-                r'(?i)\b(cve-\d{4}-\d+)\b': lambda m: m.group(1).upper(),
-                
-                # Format CVSS scores
-                r'(?i)cvss(?:\s+score)?:\s*(\d+\.?\d*)': r'CVSS Score: \1',
-                
-                # Format severity levels
-                r'(?i)\b(critical|high|medium|low)\s+severity\b': 
-                    lambda m: m.group(1).upper() + ' Severity',
-                
-                # Format vulnerability counts
-                r'(\d+)\s+vulnerabilities': r'\1 Vulnerabilities',
-                
-                # Format risk levels
-                r'(?i)\b(critical|high|medium|low)\s+risk\b':
-                    lambda m: m.group(1).upper() + ' Risk',
-            }
-            
-            for pattern, replacement in security_formatting.items():
-                text = re.sub(pattern, replacement, text)
-
-            # Clean up sentences and structure
-            sentences = text.split('.')
-            cleaned_sentences = []
-            
-            for sentence in sentences:
-                sentence = sentence.strip()
-                # Keep only meaningful sentences
-                if (len(sentence) > 10 and 
-                    not any(x in sentence.lower() for x in ['...', '___', '???']) and
-                    not re.match(r'^[^a-zA-Z]*$', sentence)):
-                    
-                    # Capitalize first letter if needed
-                    if sentence and sentence[0].isalpha():
-                        sentence = sentence[0].upper() + sentence[1:]
-                    
-                    cleaned_sentences.append(sentence)
-
-            # Join sentences and fix final formatting
-            text = '. '.join(cleaned_sentences)
-            
-            # Final cleanup
-            text = re.sub(r'\s*\.\s*', '. ', text)  # Fix spacing around periods
-            text = re.sub(r'\s*,\s*', ', ', text)   # Fix spacing around commas
-            text = re.sub(r'\s*:\s*', ': ', text)   # Fix spacing around colons
-            text = re.sub(r'\s*;\s*', '; ', text)   # Fix spacing around semicolons
-            text = re.sub(r'\s*\(\s*', ' (', text)  # Fix spacing around parentheses
-            text = re.sub(r'\s*\)\s*', ') ', text)
-            
-            # Ensure proper paragraph separation
-            text = re.sub(r'([.!?])\s*([A-Z])', r'\1\n\n\2', text)
-            
-            # Remove any remaining excessive whitespace
-            text = re.sub(r'\n{3,}', '\n\n', text)
-            text = re.sub(r'\s+', ' ', text)
-            
-            return text.strip()
-            
+            return clean_output(text)
         except Exception as e:
             self.logger.error(f"Output cleaning failed: {str(e)}")
             return text
@@ -148,69 +103,14 @@ class SummarizationModel:
     def _preprocess_text(self, text: str) -> str:
         """Advanced preprocessing of input text."""
         try:
-            # Initial cleanup
-            text = unicodedata.normalize('NFKC', text)
-            
-            # Remove common document artifacts
-            artifacts = [
-                r'I\s*P\s*age',                    # Page markers
-                r'Page\s*\d+\s*of\s*\d+',          # Page numbers
-                r'Table\s+of\s+Contents.*?(?=\d+\.)', # Table of contents
-                r'©.*?(?=\d{4})',                  # Copyright notices
-                r'Confidential[^\n]*',             # Confidentiality notices
-                r'Draft\s+Version[^\n]*',          # Draft markers
-                r'Document\s+Status[^\n]*',        # Status headers
-                r'Last\s+Updated[^\n]*',           # Update timestamps
-                r'Generated\s+by[^\n]*',           # Generation notices
-                r'\[+\s*\]+',                      # Empty brackets
-                r'_{3,}',                          # Horizontal lines
-                r'-{3,}',                          # Dash lines
-            ]
-            
-            for pattern in artifacts:
-                text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.MULTILINE)
-
-            # Normalize security-related terms
-            security_terms = {
-                r'(?i)cve-\d{4}-\d+': lambda m: m.group(0).upper(),  # CVE IDs
-                r'(?i)cvss\s*:?\s*(\d+\.?\d*)': r'CVSS Score: \1',   # CVSS scores
-                r'(?i)severity\s*:?\s*(critical|high|medium|low)': lambda m: f"Severity: {m.group(1).upper()}", # Severity levels
-                r'(?i)risk\s*:?\s*(critical|high|medium|low)': lambda m: f"Risk Level: {m.group(1).upper()}"    # Risk levels
-            }
-            
-            for pattern, replacement in security_terms.items():
-                text = re.sub(pattern, replacement, text)
-
-            # Fix version numbers and technical specifications
-            text = re.sub(r'(\d+)\s*\.\s*(\d+)\s*\.\s*(\d+)', r'\1.\2.\3', text)  # Version numbers
-            text = re.sub(r'v(\d)', r'version \1', text, flags=re.IGNORECASE)      # Version indicators
-            
-            # Normalize IP addresses and network ranges
-            text = re.sub(r'(\d{1,3}\.){3}\d{1,3}(/\d{1,2})?', 
-                         lambda m: m.group(0).strip(), text)  # IP addresses
-            
-            # Fix list formatting
-            text = re.sub(r'(?m)^\s*[-•]\s*', '\n• ', text)  # Bullet points
-            text = re.sub(r'(?m)^\s*(\d+)\.\s+', r'\n\1. ', text)  # Numbered lists
-            
-            # Normalize whitespace
-            text = re.sub(r'\s+', ' ', text)
-            text = re.sub(r'\n\s*\n', '\n\n', text)
-            
-            # Ensure proper section separation
-            text = re.sub(r'([.!?])\s*([A-Z])', r'\1\n\n\2', text)
-            
-            return text.strip()
-            
+            return preprocess_text(text)
         except Exception as e:
             self.logger.error(f"Text preprocessing failed: {str(e)}")
             return text
 
     async def generate_section(self, text: str, section: str, prompt: str = None) -> str:
         try:
-            # Ensure text length is within model limits
-            max_length = 1024  # Adjust based on your model's limits
-            text = text[:max_length]  # Truncate if too long
+            # Long text is windowed by tokens in _generate, not truncated here
             
             # Convert any numeric values in prompt to strings
             if prompt:
@@ -224,35 +124,108 @@ class SummarizationModel:
             logging.error(f"Section generation failed: {str(e)}")
             raise RuntimeError(f"Error generating section: {str(e)}")
     async def _generate(self, text: str, section: str, prompt: str = None) -> str:
+        """Generate a section without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._generate_sync, text, section, prompt)
+
+    def _prompt_ids(self, section: str, prompt: str = None):
+        """Token IDs of the prompt text around the content for one section."""
+        prefix = f"Section: {section}\n"
+        if prompt:
+            prefix += f"Instructions: {prompt}\n"
+        prefix += "Content: "
+        suffix = f"\n\nGenerate a detailed {section} section:"
+        prefix_ids, suffix_ids = self.tokenizer([prefix, suffix], add_special_tokens=False)['input_ids']
+        return prefix_ids, suffix_ids
+
+    def _generate_sync(self, text: str, section: str, prompt: str = None) -> str:
         """Generate content for a specific section using the summarization model."""
-        try:
-            # Construct the input prompt
-            section_prompt = f"Section: {section}\n"
-            if prompt:
-                section_prompt += f"Instructions: {prompt}\n"
-            section_prompt += f"Content: {text}\n\nGenerate a detailed {section} section:"
-
-            # Generate response using transformers
-            inputs = self.tokenizer(section_prompt, return_tensors="pt", truncation=True, max_length=1024)
-            outputs = self.model.generate(
-                inputs["input_ids"],
-                max_length=512,
-                min_length=100,
-                num_beams=4,
-                temperature=0.7,
-                no_repeat_ngram_size=3,
-                early_stopping=True
+        config = {"prompt": prompt, "max_length": 512, "min_length": 100}
+        return self.generate_sections(text, {section: config})[section]
+
+    def _generate_rows(self, rows: List[List[int]], min_lengths: List[int], max_lengths: List[int],
+                       num_beams: int) -> List[str]:
+        """Run generate over pre-tokenized rows in padded batches of similar length."""
+        from transformers import LogitsProcessorList
+
+        # Sorting by length keeps padding inside each batch small; results are
+        # written back in the original order.
+        order = sorted(range(len(rows)), key=lambda i: len(rows[i]))
+        results: List[str] = [""] * len(rows)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            inputs = self.tokenizer.pad(
+                {"input_ids": [rows[i] for i in batch]}, return_tensors="pt"
+            ).to(self.device)
+            batch_max = [max_lengths[i] for i in batch]
+            length_processor = _PerRowLengthProcessor(
+                [min_lengths[i] for i in batch], batch_max, self.tokenizer.eos_token_id, num_beams
             )
-            
-            # Decode and clean the response
-            response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-            response = self._clean_response(response)
-            
-            return response
+            with torch.inference_mode():
+                outputs = self.model.generate(
+                    input_ids=inputs["input_ids"],
+                    attention_mask=inputs["attention_mask"],
+                    max_length=max(batch_max),
+                    num_beams=num_beams,
+                    no_repeat_ngram_size=3,
+                    early_stopping=True,
+                    logits_processor=LogitsProcessorList([length_processor])
+                )
+            for i, decoded in zip(batch, self.tokenizer.batch_decode(outputs, skip_special_tokens=True)):
+                results[i] = decoded
+        return results
+
+    def generate_sections(self, text: str, sections: Dict[str, Dict[str, Any]], num_beams: int = 4) -> Dict[str, str]:
+        """Generate several sections with batched generate calls.
+
+        ``sections`` maps a section name to its ``prompt``, ``max_length`` and
+        ``min_length``; each row keeps its own length limits. The text is split
+        into overlapping token windows that fit next to each prompt; when a
+        section spans several windows their partial outputs are merged by
+        running them through the model again until one window remains.
+        """
+        try:
+            eos_id = self.tokenizer.eos_token_id
+            contents = {name: text for name in sections}
+            prompt_ids = {name: self._prompt_ids(name, sections[name].get("prompt")) for name in sections}
+            results: Dict[str, str] = {}
+
+            for merge_round in range(self.max_merge_rounds + 1):
+                pending = [name for name in sections if name not in results]
+                if not pending:
+                    break
+                rows, owners = [], []
+                for name in pending:
+                    prefix_ids, suffix_ids = prompt_ids[name]
+                    budget = self.max_input_tokens - len(prefix_ids) - len(suffix_ids) - 1
+                    windows = self.windower.windows(contents[name], budget)
+                    if merge_round == self.max_merge_rounds:
+                        windows = windows[:1]  # Out of merge rounds: keep the leading window
+                    for window in windows:
+                        rows.append(prefix_ids + window + suffix_ids + [eos_id])
+                        owners.append(name)
+
+                outputs = self._generate_rows(
+                    rows,
+                    [sections[name].get("min_length", 0) for name in owners],
+                    [sections[name].get("max_length", 512) for name in owners],
+                    num_beams
+                )
+                partials: Dict[str, List[str]] = {}
+                for name, output in zip(owners, outputs):
+                    partials.setdefault(name, []).append(output)
+                for name, parts in partials.items():
+                    if len(parts) == 1:
+                        results[name] = self._clean_response(parts[0])
+                    else:
+                        self.logger.info(f"Merging {len(parts)} windows for {name}")
+                        contents[name] = "\n\n".join(parts)
+
+            return {name: results[name] for name in sections}
 
         except Exception as e:
-            logging.error(f"Generation failed for section {section}: {str(e)}")
-            return f"Error generating {section}: {str(e)}"
+            self.logger.error(f"Batched section generation failed: {str(e)}")
+            return {name: f"Error generating {name}: {str(e)}" for name in sections}
 
     def _clean_response(self, text: str) -> str:
         """Clean and format the generated response."""
@@ -390,25 +363,19 @@ class SummarizationModel:
                 }
             }
 
-            # Generate each section
-            report_sections = {}
-            for section_name, config in sections.items():
-                # Format prompt with actual data
-                formatted_prompt = config["prompt"].format(
+            # Format prompts with actual data
+            vulnerability_counts = self._extract_vulnerability_counts(text)
+            for config in sections.values():
+                config["prompt"] = config["prompt"].format(
                     scanned=self._extract_scanned_hosts(text),
                     total=self._extract_total_hosts(text),
-                    vuln_counts=sum(self._extract_vulnerability_counts(text).values()),
-                    **self._extract_vulnerability_counts(text)
-                )
-                
-                self.logger.info(f"Generating {section_name}...")
-                section_content = self.generate_section(
-                    text,
-                    formatted_prompt,
-                    config["max_length"],
-                    config["min_length"]
+                    vuln_counts=sum(vulnerability_counts.values()),
+                    **{f"{severity}_count": count for severity, count in vulnerability_counts.items()}
                 )
-                report_sections[section_name] = section_content
+
+            # Generate all sections in one batch
+            self.logger.info(f"Generating {', '.join(sections)}...")
+            report_sections = self.generate_sections(text, sections)
 
 
             return {
@@ -416,6 +383,7 @@ class SummarizationModel:
                 "metadata": {
                     "model_info": {
                         "name": self.model_name,
+                        "backend": self.backend,
                         "device": str(self.device)
                     },
                     "timestamp": datetime.now().isoformat(),
@@ -423,7 +391,7 @@ class SummarizationModel:
                     "scan_summary": {
                         "total_hosts": self._extract_total_hosts(text),
                         "scanned_hosts": self._extract_scanned_hosts(text),
-                        "vulnerability_counts": self._extract_vulnerability_counts(text)
+                        "vulnerability_counts": vulnerability_counts
                     }
                 }
             }
@@ -432,6 +400,11 @@ class SummarizationModel:
             self.logger.error(f"Summarization failed: {str(e)}")
             return {"error": str(e)}
 
+    async def summarize_async(self, text: str) -> Dict[str, Any]:
+        """Async summarize; the blocking generate runs in the default executor."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.summarize, text)
+
 def main():
     """Test the summarization model."""
     # Setup logging
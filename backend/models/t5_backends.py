@@ -0,0 +1,70 @@
+import logging
+from typing import Optional
+
+import torch
+
+from models.model_cache import LocalModelCache
+
+T5_BACKENDS = ('torch', 'int8', 'onnx')
+
+logger = logging.getLogger(__name__)
+
+
+def validate_backend(backend: str) -> str:
+    if backend not in T5_BACKENDS:
+        raise ValueError(f"Unknown T5 backend '{backend}'; expected one of {', '.join(T5_BACKENDS)}")
+    return backend
+
+
+def inference_device(backend: str) -> torch.device:
+    """Only the plain PyTorch backend runs on GPU; int8 and ONNX Runtime are CPU paths."""
+    if backend == 'torch' and torch.cuda.is_available():
+        return torch.device('cuda')
+    return torch.device('cpu')
+
+
+def quantize_int8(model):
+    """Dynamic int8 quantization of every Linear layer (weights int8, activations fp32)."""
+    return torch.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def load_onnx_seq2seq(model_name: str, cache_root: str, revision: str = 'main', verify: str = 'size'):
+    """ONNX Runtime seq2seq model with separate encoder/decoder graphs and past key values.
+
+    The ONNX export runs once and is stored in the versioned model cache next to
+    the PyTorch weights; later starts load the exported graphs directly.
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError as e:
+        raise ImportError(
+            "The 'onnx' T5 backend requires optimum with ONNX Runtime: pip install optimum[onnxruntime]"
+        ) from e
+
+    def fetch(target: str):
+        from transformers import AutoTokenizer
+        logger.info(f"Exporting {model_name} to ONNX (one-time)...")
+        exported = ORTModelForSeq2SeqLM.from_pretrained(model_name, revision=revision, export=True, use_cache=True)
+        exported.save_pretrained(target)
+        AutoTokenizer.from_pretrained(model_name, revision=revision).save_pretrained(target)
+
+    path = LocalModelCache(cache_root, verify).ensure(model_name, fetch, f"{revision}-onnx")
+    return ORTModelForSeq2SeqLM.from_pretrained(path, use_cache=True, provider='CPUExecutionProvider')
+
+
+def load_t5_for_backend(model_name: str, backend: str, source: Optional[str], cache_root: str,
+                        revision: str = 'main', verify: str = 'size'):
+    """Load the generation model for a backend; ``source`` is a local checkpoint dir, if any."""
+    from transformers import T5ForConditionalGeneration
+
+    validate_backend(backend)
+    if backend == 'onnx':
+        return load_onnx_seq2seq(model_name, cache_root, revision, verify)
+
+    if source:
+        model = T5ForConditionalGeneration.from_pretrained(source, use_safetensors=True, low_cpu_mem_usage=True)
+    else:
+        model = T5ForConditionalGeneration.from_pretrained(model_name, revision=revision)
+    if backend == 'int8':
+        model = quantize_int8(model)
+    return model
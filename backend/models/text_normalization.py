@@ -0,0 +1,173 @@
+"""Compiled text-normalization passes for SummarizationModel.
+
+The rules overlap ("//" inside a URL is also slash noise, a table of contents
+can swallow a page marker, a soft hyphen can join two dots into an ellipsis),
+so they still run in the order of the original rule tables and the output is
+identical to the old chained ``re.sub`` calls.
+
+Two groups of rules are merged without changing that order. The first seven
+noise rules and the six punctuation-spacing rules only ever match and insert
+characters from a small set (whitespace plus ``.?-_()/`` and soft hyphens, or
+whitespace plus ``.,:;()``), so no match can cross a character outside it. Each
+group is one scan for runs of its characters; the rules are replayed in order
+on every run, memoized because the same runs (". ", ", ", "  ") repeat. Passes
+that can never change the result are dropped: the IP-address rule, and the
+numbered-list, blank-line and extra-newline rules that only produced
+whitespace collapsed right after them.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+SEVERITY_LEVELS = r'critical|high|medium|low'
+
+# --- _clean_output -----------------------------------------------------------
+
+# These only match and insert whitespace and .?-_()/\xad; see _replay
+_NOISE_RUN_PASSES = [
+    (re.compile(r'\s*\.\s*\.\s*\.'), '...'),   # Fix ellipsis
+    (re.compile('\xad+'), ''),                # Remove soft hyphens
+    (re.compile(r'_{2,}'), ''),               # Remove multiple underscores
+    (re.compile(r'\?{3,}'), '?'),             # Fix multiple question marks
+    (re.compile(r'-{3,}'), '--'),             # Standardize long dashes
+    (re.compile(r'\s{2,}'), ' '),             # Remove multiple spaces
+    (re.compile(r'[()/]{2,}'), ''),           # Remove multiple parentheses/slashes
+]
+# A single character from the set is left alone by every rule above, except a soft hyphen
+_NOISE_RUNS = re.compile(r'[\s.?\-_()/\xad]{2,}|\xad')
+
+_NOISE_PATTERNS = [
+    (re.compile(r'true:\s*', re.IGNORECASE), ''),   # Remove True: prefix
+    (re.compile(r'false:\s*', re.IGNORECASE), ''),  # Remove False: prefix
+    (re.compile(r'null:\s*', re.IGNORECASE), ''),   # Remove Null: prefix
+    (re.compile(r'back to mail:.*'), ''),     # Remove mail references
+    # Runs after the slash rule above, as it always has, so "scheme://" is already gone
+    (re.compile(r'https?://\S+'), ''),        # Remove URLs
+    (re.compile(r'\d+\.\s*\d+\.\s*\d+\.'), lambda m: m.group(0).replace(' ', '')),  # Fix version numbers
+]
+
+_SECURITY_FORMATTING = [
+    (re.compile(r'\b(cve-\d{4}-\d+)\b', re.IGNORECASE), lambda m: m.group(1).upper()),  # CVE references
+    (re.compile(r'cvss(?:\s+score)?:\s*(\d+\.?\d*)', re.IGNORECASE), r'CVSS Score: \1'),  # CVSS scores
+    (re.compile(rf'\b({SEVERITY_LEVELS})\s+severity\b', re.IGNORECASE),
+     lambda m: m.group(1).upper() + ' Severity'),                                         # Severity levels
+    (re.compile(r'(\d+)\s+vulnerabilities'), r'\1 Vulnerabilities'),                       # Vulnerability counts
+    (re.compile(rf'\b({SEVERITY_LEVELS})\s+risk\b', re.IGNORECASE),
+     lambda m: m.group(1).upper() + ' Risk'),                                             # Risk levels
+]
+
+_NON_ALPHA_SENTENCE = re.compile(r'[^a-zA-Z]*')
+
+# Spacing around punctuation, in order; each pass sees the previous one's spaces.
+# They only match and insert whitespace and .,:;() ; see _replay
+_PUNCTUATION_RUN_PASSES = [
+    (re.compile(r'\s*\.\s*'), '. '),
+    (re.compile(r'\s*,\s*'), ', '),
+    (re.compile(r'\s*:\s*'), ': '),
+    (re.compile(r'\s*;\s*'), '; '),
+    (re.compile(r'\s*\(\s*'), ' ('),
+    (re.compile(r'\s*\)\s*'), ') '),
+]
+_PUNCTUATION_RUNS = re.compile(r'[\s.,:;()]*[.,:;()][\s.,:;()]*')
+
+_PARAGRAPH_BREAK = re.compile(r'([.!?])\s*([A-Z])')
+# clean_output collapses whitespace after the paragraph break, which leaves just a space
+_SENTENCE_END = re.compile(r'([.!?])(?=[A-Z])')
+
+
+@lru_cache(maxsize=4096)
+def _replay(group: str, run: str) -> str:
+    """Apply one group's rules, in order, to a maximal run of the group's characters.
+
+    A match of any rule in the group consists of the group's characters only, and
+    replacements insert nothing else, so rewriting each run on its own gives the
+    same result as running every rule over the whole text.
+    """
+    for pattern, replacement in _RUN_PASSES[group]:
+        run = pattern.sub(replacement, run)
+    return run
+
+
+_RUN_PASSES = {'noise': _NOISE_RUN_PASSES, 'punctuation': _PUNCTUATION_RUN_PASSES}
+
+
+def _replay_noise(match):
+    return _replay('noise', match.group(0))
+
+
+def _replay_punctuation(match):
+    return _replay('punctuation', match.group(0))
+
+
+def clean_output(text: str) -> str:
+    """Clean and format generated model output."""
+    text = _NOISE_RUNS.sub(_replay_noise, text)
+    for pattern, replacement in _NOISE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    for pattern, replacement in _SECURITY_FORMATTING:
+        text = pattern.sub(replacement, text)
+
+    # Keep only meaningful sentences, capitalizing the first letter if needed
+    cleaned_sentences = []
+    for sentence in text.split('.'):
+        sentence = sentence.strip()
+        if len(sentence) <= 10:
+            continue
+        lowered = sentence.lower()
+        if (not any(x in lowered for x in ['...', '___', '???']) and
+                not _NON_ALPHA_SENTENCE.fullmatch(sentence)):
+            if sentence[0].isalpha():
+                sentence = sentence[0].upper() + sentence[1:]
+            cleaned_sentences.append(sentence)
+
+    text = _PUNCTUATION_RUNS.sub(_replay_punctuation, '. '.join(cleaned_sentences))
+    # The paragraph break and the final whitespace collapse together add one space
+    text = _SENTENCE_END.sub(r'\1 ', text)
+    return ' '.join(text.split())
+
+
+# --- _preprocess_text --------------------------------------------------------
+
+_ARTIFACTS = [re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in (
+    r'I\s*P\s*age',                       # Page markers
+    r'Page\s*\d+\s*of\s*\d+',             # Page numbers
+    r'Table\s+of\s+Contents.*?(?=\d+\.)', # Table of contents
+    r'©.*?(?=\d{4})',                     # Copyright notices
+    r'Confidential[^\n]*',                # Confidentiality notices
+    r'Draft\s+Version[^\n]*',             # Draft markers
+    r'Document\s+Status[^\n]*',           # Status headers
+    r'Last\s+Updated[^\n]*',              # Update timestamps
+    r'Generated\s+by[^\n]*',              # Generation notices
+    r'\[+\s*\]+',                         # Empty brackets
+    r'_{3,}',                             # Horizontal lines
+    r'-{3,}',                             # Dash lines
+)]
+
+_SECURITY_TERMS = [
+    (re.compile(r'cve-\d{4}-\d+', re.IGNORECASE), lambda m: m.group(0).upper()),  # CVE IDs
+    (re.compile(r'cvss\s*:?\s*(\d+\.?\d*)', re.IGNORECASE), r'CVSS Score: \1'),   # CVSS scores
+    (re.compile(rf'severity\s*:?\s*({SEVERITY_LEVELS})', re.IGNORECASE),
+     lambda m: f"Severity: {m.group(1).upper()}"),                                 # Severity levels
+    (re.compile(rf'risk\s*:?\s*({SEVERITY_LEVELS})', re.IGNORECASE),
+     lambda m: f"Risk Level: {m.group(1).upper()}"),                               # Risk levels
+]
+
+_VERSION_NUMBERS = re.compile(r'(\d+)\s*\.\s*(\d+)\s*\.\s*(\d+)')
+_VERSION_PREFIX = re.compile(r'v(\d)', re.IGNORECASE)
+_BULLETS = re.compile(r'^\s*[-•]\s*', re.MULTILINE)
+
+
+def preprocess_text(text: str) -> str:
+    """Normalize extracted report text before it goes to the model."""
+    text = unicodedata.normalize('NFKC', text)
+    for pattern in _ARTIFACTS:
+        text = pattern.sub('', text)
+    for pattern, replacement in _SECURITY_TERMS:
+        text = pattern.sub(replacement, text)
+
+    text = _VERSION_NUMBERS.sub(r'\1.\2.\3', text)
+    text = _VERSION_PREFIX.sub(r'version \1', text)
+    text = _BULLETS.sub('\n• ', text)
+
+    text = ' '.join(text.split())
+    return _PARAGRAPH_BREAK.sub(r'\1\n\n\2', text)
@@ -0,0 +1,72 @@
+import re
+import hashlib
+from collections import OrderedDict
+from typing import List
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n{2,}')
+
+
+class TokenWindower:
+    """Splits text into overlapping, token-budgeted windows on sentence boundaries.
+
+    Text is split into sentences and tokenized once in a single batched call;
+    the per-sentence token IDs are cached by content hash so every section (and
+    every budget) windows the same document without re-tokenizing it.
+    """
+
+    def __init__(self, tokenizer, overlap_tokens: int = 128, cache_size: int = 32):
+        self.tokenizer = tokenizer
+        self.overlap_tokens = overlap_tokens
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, List[List[int]]]" = OrderedDict()
+
+    def sentence_ids(self, text: str) -> List[List[int]]:
+        """Token IDs for each sentence of text (no special tokens), cached."""
+        key = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        sentences = [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s and s.strip()]
+        ids = self.tokenizer(sentences, add_special_tokens=False)['input_ids'] if sentences else []
+        self._cache[key] = ids
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return ids
+
+    def windows(self, text: str, budget: int) -> List[List[int]]:
+        """Pack sentences into windows of at most ``budget`` tokens.
+
+        Consecutive windows share trailing sentences worth up to
+        ``overlap_tokens`` so context is not lost at the seams. A sentence longer
+        than the budget is split into budget-sized pieces.
+        """
+        budget = max(1, budget)
+        pieces: List[List[int]] = []
+        for ids in self.sentence_ids(text):
+            if len(ids) <= budget:
+                pieces.append(ids)
+            else:
+                pieces.extend(ids[i:i + budget] for i in range(0, len(ids), budget))
+        if not pieces:
+            return [[]]
+
+        windows: List[List[int]] = []
+        start = 0
+        while start < len(pieces):
+            end, used = start, 0
+            while end < len(pieces) and used + len(pieces[end]) <= budget:
+                used += len(pieces[end])
+                end += 1
+            windows.append([token for piece in pieces[start:end] for token in piece])
+            if end >= len(pieces):
+                break
+
+            # Step back over trailing sentences that fit in the overlap, but always advance.
+            next_start, overlap = end, 0
+            while next_start - 1 > start and overlap + len(pieces[next_start - 1]) <= self.overlap_tokens:
+                next_start -= 1
+                overlap += len(pieces[next_start])
+            start = next_start
+        return windows
@@ -0,0 +1,117 @@
+import time
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class JobCancelled(BaseException):
+    """Raised inside a pipeline stage once its job has been cancelled.
+
+    Derives from BaseException (like asyncio.CancelledError) so the many
+    ``except Exception`` blocks in the extractors and models do not swallow it.
+    """
+
+    def __init__(self, reason: str = 'cancelled', stage: Optional[str] = None):
+        super().__init__(reason if not stage else f"{reason} during {stage}")
+        self.reason = reason
+        self.stage = stage
+
+
+class StageTimeout(JobCancelled):
+    """Raised when a stage runs past its deadline."""
+
+    def __init__(self, stage: str, timeout: float):
+        super().__init__('timeout', stage)
+        self.timeout = timeout
+
+
+class CancellationToken:
+    """Cooperative cancellation flag with optional per-stage deadlines.
+
+    Long-running code calls ``check()`` between pages, chunks and API calls;
+    it raises JobCancelled after ``cancel()`` and StageTimeout once the current
+    stage's deadline has passed.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self.reason: Optional[str] = None
+        self.stage_name: Optional[str] = None
+        self._stage_timeout: Optional[float] = None
+        self._deadline: Optional[float] = None
+
+    def cancel(self, reason: str = 'cancelled'):
+        with self._lock:
+            if self.reason is None:
+                self.reason = reason
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the current stage deadline, or None when unbounded."""
+        if self._deadline is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def check(self):
+        if self._event.is_set():
+            raise JobCancelled(self.reason or 'cancelled', self.stage_name)
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            raise StageTimeout(self.stage_name, self._stage_timeout)
+
+    def stage_timeout(self) -> StageTimeout:
+        """The StageTimeout for the current stage, for code whose own timeout fired at the deadline."""
+        return StageTimeout(self.stage_name, self._stage_timeout)
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep up to ``seconds``, waking early on cancel. Returns True if cancelled."""
+        return self._event.wait(seconds)
+
+    @contextmanager
+    def stage(self, name: str, timeout: Optional[float] = None):
+        """Run a block as a named stage with its own deadline."""
+        previous = (self.stage_name, self._stage_timeout, self._deadline)
+        self.stage_name = name
+        self._stage_timeout = timeout
+        self._deadline = time.monotonic() + timeout if timeout else None
+        try:
+            self.check()
+            yield self
+        finally:
+            self.stage_name, self._stage_timeout, self._deadline = previous
+
+
+class JobRegistry:
+    """Thread-safe map of running job ids to their cancellation tokens."""
+
+    def __init__(self):
+        self._jobs: Dict[str, CancellationToken] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def register(self, job_id: str) -> CancellationToken:
+        token = CancellationToken()
+        with self._lock:
+            self._jobs[job_id] = token
+        return token
+
+    def get(self, job_id: str) -> Optional[CancellationToken]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str, reason: str = 'cancelled') -> bool:
+        token = self.get(job_id)
+        if token is None:
+            return False
+        token.cancel(reason)
+        self.logger.info(f"Cancellation requested for job {job_id}")
+        return True
+
+    def finish(self, job_id: str):
+        with self._lock:
+            self._jobs.pop(job_id, None)
@@ -0,0 +1,147 @@
+import copy
+import json
+import queue
+import atexit
+import random
+import logging
+import logging.config
+import threading
+import dataclasses
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+from config.config import Config
+from pipeline.tracing import current_tracer
+
+# Attributes every LogRecord has; anything else was passed through ``extra``.
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_listener: Optional[QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def _json_default(value: Any) -> Any:
+    # Dataclasses (e.g. tracing spans) are passed as-is and expanded here, on the listener
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return str(value)
+
+
+class JobContextFilter(logging.Filter):
+    """Stamps records with the id of the job traced on the calling thread."""
+
+    def filter(self, record):
+        if getattr(record, 'job_id', None) is None:
+            tracer = current_tracer()
+            record.job_id = tracer.job_id if tracer is not None else None
+        return True
+
+
+class PayloadSamplingFilter(logging.Filter):
+    """Keeps the ``payload`` of only a sample of records.
+
+    Verbose bodies (extracted text, reports, result JSON) are logged with
+    ``extra={'payload': ...}``. The record itself always gets through; for the
+    records not sampled the payload is dropped, so the cost of serializing and
+    writing it is only paid for ``sample_rate`` of them.
+    """
+
+    def __init__(self, sample_rate: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record):
+        if hasattr(record, 'payload') and random.random() >= self.sample_rate:
+            del record.payload
+            record.payload_sampled = False
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, job id and any extras."""
+
+    def __init__(self, max_payload_chars: int = 2000):
+        super().__init__()
+        self.max_payload_chars = max_payload_chars
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if 'payload' in entry:
+            entry['payload'] = self._truncate(entry['payload'])
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=_json_default, ensure_ascii=False)
+
+    def _truncate(self, payload: Any) -> str:
+        text = payload if isinstance(payload, str) else json.dumps(payload, default=_json_default, ensure_ascii=False)
+        if len(text) > self.max_payload_chars:
+            return f"{text[:self.max_payload_chars]}... [{len(text) - self.max_payload_chars} more chars]"
+        return text
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread.
+
+    The stock ``prepare`` fully formats the record on the calling thread. Here
+    only the message arguments are merged (so later changes to them cannot leak
+    into the log) and the record is queued; JSON encoding, traceback rendering
+    and I/O all happen on the listener.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def configure_logging(force: bool = False) -> QueueListener:
+    """Route all logging through a queue to the handlers in ``Config.get_log_config``.
+
+    The handlers from the configuration are detached from the root logger and
+    served by a background ``QueueListener``; the root logger keeps a single
+    non-blocking queue handler. Safe to call more than once.
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            if not force:
+                return _listener
+            _listener.stop()
+
+        logging.config.dictConfig(Config.get_log_config())
+        root = logging.getLogger()
+        handlers = list(root.handlers)
+        for handler in handlers:
+            root.removeHandler(handler)
+
+        records = queue.SimpleQueue()
+        queue_handler = DeferredQueueHandler(records)
+        queue_handler.addFilter(JobContextFilter())
+        queue_handler.addFilter(PayloadSamplingFilter(Config.LOG_PAYLOAD_SAMPLE_RATE))
+        root.addHandler(queue_handler)
+
+        _listener = QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        return _listener
+
+
+@atexit.register
+def stop_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
@@ -0,0 +1,69 @@
+from typing import Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+)
+from prometheus_client import multiprocess
+
+from config.config import Config
+
+# In multi-process mode every process writes its samples to its own mmap'd
+# file, so updates on the hot path never contend across processes.
+MULTIPROC_DIR = Config.PROMETHEUS_MULTIPROC_DIR
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+_STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+_SIZE_BUCKETS = tuple(2 ** power for power in range(10, 26, 2))  # 1 KiB .. 32 MiB
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'Latency of HTTP requests by route',
+    ['method', 'route', 'status'], buckets=_LATENCY_BUCKETS
+)
+STAGE_SECONDS = Histogram(
+    'pipeline_stage_duration_seconds', 'Wall time of traced pipeline stages '
+    '(the _count of extract.ocr.page is the number of OCR pages)',
+    ['stage'], buckets=_STAGE_BUCKETS
+)
+STAGE_ERRORS = Counter('pipeline_stage_errors_total', 'Traced pipeline stages that raised', ['stage'])
+JOB_SECONDS = Histogram(
+    'pipeline_job_duration_seconds', 'Wall time of whole jobs by outcome', ['outcome'], buckets=_STAGE_BUCKETS
+)
+QUEUE_DEPTH = Gauge(
+    'scheduler_queue_depth', 'Jobs waiting for a worker', ['priority'], multiprocess_mode='livesum'
+)
+IN_FLIGHT = Gauge('scheduler_jobs_in_flight', 'Jobs running on a worker', multiprocess_mode='livesum')
+LLM_SECONDS = Histogram(
+    'llm_request_duration_seconds', 'Latency of LLM completions', ['model', 'streamed'],
+    buckets=_STAGE_BUCKETS
+)
+LLM_TOKENS = Counter('llm_tokens_total', 'LLM tokens by direction (prompt/completion)', ['model', 'direction'])
+CACHE_LOOKUPS = Counter('cache_lookups_total', 'Cache lookups by cache and result (hit/miss)', ['cache', 'result'])
+RESULT_BYTES = Histogram('result_size_bytes', 'Serialized size of stored job results', buckets=_SIZE_BUCKETS)
+
+
+def cache_lookup(cache: str, hit: bool, count: int = 1):
+    """Count ``count`` lookups on ``cache``; the hit ratio is hits / (hits + misses)."""
+    if count:
+        CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc(count)
+
+
+def observe_stage(name: str, seconds: float, failed: bool = False):
+    STAGE_SECONDS.labels(name).observe(seconds)
+    if failed:
+        STAGE_ERRORS.labels(name).inc()
+
+
+def render() -> Tuple[bytes, str]:
+    """Exposition body and content type, merged across processes in multi-process mode."""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    """Drop a finished worker's live gauges (call from gunicorn's child_exit hook)."""
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,217 @@
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional, Deque
+
+from pipeline.metrics import IN_FLIGHT, QUEUE_DEPTH
+
+PRIORITY_CLASSES = ('interactive', 'batch')
+
+
+@dataclass
+class ScheduledJob:
+    job_id: str
+    client_id: str
+    priority: str
+    func: Callable[[], None]
+    cost: float = 1.0
+    enqueued_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+
+
+@dataclass
+class _ClientQueue:
+    jobs: Deque[ScheduledJob] = field(default_factory=deque)
+    deficit: float = 0.0
+
+
+class _WaitStats:
+    """Running queue-wait statistics for one priority class."""
+
+    def __init__(self, window: int = 500):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def record(self, wait: float):
+        self.count += 1
+        self.total += wait
+        self.max = max(self.max, wait)
+        self.recent.append(wait)
+
+    def snapshot(self) -> Dict[str, float]:
+        recent = sorted(self.recent)
+
+        def percentile(p):
+            if not recent:
+                return 0.0
+            return recent[min(len(recent) - 1, int(p * len(recent)))]
+
+        return {
+            'started': self.count,
+            'avg_wait_seconds': self.total / self.count if self.count else 0.0,
+            'p50_wait_seconds': percentile(0.50),
+            'p95_wait_seconds': percentile(0.95),
+            'max_wait_seconds': self.max
+        }
+
+
+class FairScheduler:
+    """Runs jobs on a fixed worker pool with priority classes and per-client fairness.
+
+    Interactive jobs always go before batch jobs. Inside a class, clients are
+    served by deficit round robin: each visit adds ``quantum * weight`` to a
+    client's deficit and the head job runs once the deficit covers its cost
+    (e.g. its page count), so a client with 200 queued PDFs gets the same share
+    as a client with one. A client never has more than ``per_client_limit`` jobs
+    running at once.
+    """
+
+    def __init__(self, max_workers: int = 2, per_client_limit: int = 1, quantum: float = 1.0,
+                 client_weights: Optional[Dict[str, float]] = None):
+        self.max_workers = max_workers
+        self.per_client_limit = per_client_limit
+        self.quantum = quantum
+        self.client_weights = client_weights or {}
+        self.logger = logging.getLogger(__name__)
+
+        self._queues: Dict[str, "OrderedDict[str, _ClientQueue]"] = {
+            priority: OrderedDict() for priority in PRIORITY_CLASSES
+        }
+        self._running: Dict[str, int] = {}
+        self._queued_ids: Dict[str, ScheduledJob] = {}
+        self._wait_stats = {priority: _WaitStats() for priority in PRIORITY_CLASSES}
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._shutdown = False
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"scheduler-worker-{i}", daemon=True)
+            for i in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, job_id: str, client_id: str, func: Callable[[], None],
+               priority: str = 'interactive', cost: float = 1.0) -> ScheduledJob:
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class: {priority}")
+        job = ScheduledJob(job_id, client_id, priority, func, max(cost, 1.0))
+        with self._condition:
+            client_queue = self._queues[priority].setdefault(client_id, _ClientQueue())
+            client_queue.jobs.append(job)
+            self._queued_ids[job_id] = job
+            QUEUE_DEPTH.labels(priority).inc()
+            self._condition.notify()
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Remove a job that has not started yet. Returns False if it is unknown or running."""
+        with self._condition:
+            job = self._queued_ids.pop(job_id, None)
+            if job is None:
+                return False
+            client_queue = self._queues[job.priority].get(job.client_id)
+            if client_queue:
+                client_queue.jobs.remove(job)
+                if not client_queue.jobs:
+                    del self._queues[job.priority][job.client_id]
+            QUEUE_DEPTH.labels(job.priority).dec()
+            return True
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Approximate number of queued jobs ahead of job_id in its class (None if not queued)."""
+        with self._condition:
+            job = self._queued_ids.get(job_id)
+            if job is None:
+                return None
+            ahead = sum(len(q.jobs) for p in PRIORITY_CLASSES[:PRIORITY_CLASSES.index(job.priority)]
+                        for q in self._queues[p].values())
+            ahead += list(self._queues[job.priority][job.client_id].jobs).index(job)
+            return ahead
+
+    def stats(self) -> Dict[str, object]:
+        with self._condition:
+            return {
+                'workers': self.max_workers,
+                'in_flight': self._in_flight,
+                'queue_depth': {
+                    priority: sum(len(q.jobs) for q in queues.values())
+                    for priority, queues in self._queues.items()
+                },
+                'running_per_client': dict(self._running),
+                'wait_times': {
+                    priority: stats.snapshot() for priority, stats in self._wait_stats.items()
+                }
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _next_job(self) -> Optional[ScheduledJob]:
+        """Pick the next runnable job using strict priority, then deficit round robin."""
+        for priority in PRIORITY_CLASSES:
+            queues = self._queues[priority]
+            eligible = [client for client in queues
+                        if self._running.get(client, 0) < self.per_client_limit]
+            if not eligible:
+                continue
+            while True:
+                for client_id in list(queues):
+                    if self._running.get(client_id, 0) >= self.per_client_limit:
+                        continue
+                    client_queue = queues[client_id]
+                    head = client_queue.jobs[0]
+                    if client_queue.deficit < head.cost:
+                        client_queue.deficit += self.quantum * self.client_weights.get(client_id, 1.0)
+                    if client_queue.deficit >= head.cost:
+                        client_queue.jobs.popleft()
+                        client_queue.deficit -= head.cost
+                        if not client_queue.jobs:
+                            del queues[client_id]
+                        elif client_queue.deficit < client_queue.jobs[0].cost:
+                            # Turn is over; a client whose deficit still covers its next
+                            # job keeps its place, which is what makes weights count.
+                            queues.move_to_end(client_id)
+                        return head
+        return None
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                job = None
+                while not self._shutdown:
+                    job = self._next_job()
+                    if job is not None:
+                        break
+                    self._condition.wait()
+                if job is None:
+                    return
+                self._queued_ids.pop(job.job_id, None)
+                self._running[job.client_id] = self._running.get(job.client_id, 0) + 1
+                self._in_flight += 1
+                QUEUE_DEPTH.labels(job.priority).dec()
+                IN_FLIGHT.inc()
+                job.started_at = time.monotonic()
+                self._wait_stats[job.priority].record(job.started_at - job.enqueued_at)
+
+            try:
+                job.func()
+            except Exception as e:
+                self.logger.error(f"Scheduled job {job.job_id} failed: {e}")
+            finally:
+                with self._condition:
+                    self._running[job.client_id] -= 1
+                    if not self._running[job.client_id]:
+                        del self._running[job.client_id]
+                    self._in_flight -= 1
+                    IN_FLIGHT.dec()
+                    # A finished job may unblock a capped client for any waiting worker.
+                    self._condition.notify_all()
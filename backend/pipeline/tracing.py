@@ -0,0 +1,129 @@
+import sys
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from pipeline.metrics import observe_stage
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger('pipeline.tracing')
+
+_current_tracer: contextvars.ContextVar = contextvars.ContextVar('current_tracer', default=None)
+
+
+def _peak_rss_bytes() -> int:
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+@dataclass
+class Span:
+    """Timing and resource use of one traced block."""
+    name: str
+    job_id: Optional[str] = None
+    started_at: float = 0.0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_delta_bytes: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class Tracer:
+    """Collects spans for one job and aggregates them into a timing breakdown.
+
+    Spans record wall time, CPU time of the running thread, how far the
+    process's peak RSS rose, and the bytes the block consumed and produced.
+    Each finished span is written to the ``pipeline.tracing`` logger with the
+    span in the record's ``span`` field, and its duration feeds the per-stage
+    histogram in ``pipeline.metrics``. ``activate`` makes the tracer current for
+    the calling context so code deep in the pipeline can open spans with the
+    module-level ``span`` without a tracer being passed around.
+    """
+
+    def __init__(self, job_id: Optional[str] = None):
+        self.job_id = job_id
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        reset = _current_tracer.set(self)
+        try:
+            yield self
+        finally:
+            _current_tracer.reset(reset)
+
+    @contextmanager
+    def span(self, name: str, bytes_in: int = 0, level: int = logging.INFO, **attributes):
+        """Trace a block; set ``bytes_out`` (or more attributes) on the yielded span."""
+        record = Span(name, self.job_id, time.time(), bytes_in=bytes_in, attributes=attributes)
+        rss_before = _peak_rss_bytes()
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield record
+        except BaseException as e:
+            record.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record.wall_seconds = time.perf_counter() - wall_start
+            record.cpu_seconds = time.thread_time() - cpu_start
+            record.peak_rss_delta_bytes = _peak_rss_bytes() - rss_before
+            observe_stage(name, record.wall_seconds, record.error is not None)
+            with self._lock:
+                self.spans.append(record)
+            if logger.isEnabledFor(level):
+                # The span travels as a field; the log formatter encodes it off this thread.
+                # job_id is explicit so spans opened outside activate() still carry it.
+                logger.log(level, f"span {name}", extra={'span': record, 'job_id': self.job_id})
+
+    def breakdown(self) -> Dict[str, Any]:
+        """Per-stage totals (count, wall, CPU, RSS growth, bytes) in first-seen order."""
+        stages: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for record in spans:
+            stage = stages.setdefault(record.name, {
+                'count': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0,
+                'peak_rss_delta_bytes': 0, 'bytes_in': 0, 'bytes_out': 0, 'errors': 0
+            })
+            stage['count'] += 1
+            stage['wall_seconds'] += record.wall_seconds
+            stage['cpu_seconds'] += record.cpu_seconds
+            stage['peak_rss_delta_bytes'] += record.peak_rss_delta_bytes
+            stage['bytes_in'] += record.bytes_in
+            stage['bytes_out'] += record.bytes_out
+            stage['errors'] += record.error is not None
+        return {'job_id': self.job_id, 'stages': stages}
+
+
+class _NullSpan(Span):
+    """Span handed out when no tracer is active; updates to it are discarded."""
+
+
+def current_tracer() -> Optional[Tracer]:
+    return _current_tracer.get()
+
+
+@contextmanager
+def span(name: str, bytes_in: int = 0, level: int = logging.INFO, **attributes):
+    """Open a span on the current tracer, or do nothing if no tracer is active."""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield _NullSpan(name)
+        return
+    with tracer.span(name, bytes_in, level, **attributes) as record:
+        yield record
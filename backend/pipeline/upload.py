@@ -0,0 +1,215 @@
+import os
+import re
+import hashlib
+import logging
+import tempfile
+import zlib
+import zipfile
+from typing import Optional, Iterator, Tuple
+
+PDF_MAGIC = b'%PDF-'
+PDF_EOF_MARKER = b'%%EOF'
+# The PDF spec allows junk before the header and after the trailer; readers scan this far.
+MAGIC_SEARCH_WINDOW = 1024
+TRAILER_SEARCH_WINDOW = 2048
+# Matches page objects but not the /Pages tree nodes.
+PAGE_OBJECT_PATTERN = re.compile(rb'/Type\s*/Page(?![A-Za-z])')
+PAGE_PATTERN_OVERLAP = 32
+
+
+class UploadRejected(Exception):
+    """Raised while streaming an upload that can never become a valid job."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class PDFFingerprint:
+    """Incremental PDF checks fed one chunk at a time.
+
+    Tracks the SHA-256, the ``%PDF`` header, the size limit and a page-object
+    count, raising UploadRejected as soon as a limit is crossed. Pages stored
+    inside compressed object streams are not visible to the page count, so it
+    is a lower bound.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, max_pages: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.page_count = 0
+        self._head = b''
+        self._tail = b''
+        self._magic_checked = False
+
+    def update(self, data: bytes):
+        self.size += len(data)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            raise UploadRejected(f"File exceeds the maximum upload size of {self.max_bytes} bytes", 413)
+
+        if not self._magic_checked:
+            self._head += data[:MAGIC_SEARCH_WINDOW]
+            if PDF_MAGIC in self._head[:MAGIC_SEARCH_WINDOW]:
+                self._magic_checked = True
+                self._head = b''
+            elif len(self._head) >= MAGIC_SEARCH_WINDOW:
+                raise UploadRejected("Uploaded file is not a PDF (missing %PDF header)")
+
+        # Count page objects across chunk boundaries by re-scanning a small overlap.
+        # A match touching the end of the window is deferred until the next chunk
+        # shows whether it is really ``/Page`` rather than ``/Pages``.
+        window = self._tail[-PAGE_PATTERN_OVERLAP:] + data
+        overlap = min(len(self._tail), PAGE_PATTERN_OVERLAP)
+        self.page_count += sum(
+            1 for match in PAGE_OBJECT_PATTERN.finditer(window)
+            if overlap <= match.end() < len(window)
+        )
+        if self.max_pages is not None and self.page_count > self.max_pages:
+            raise UploadRejected(f"PDF exceeds the maximum of {self.max_pages} pages", 413)
+        self._tail = (self._tail + data)[-TRAILER_SEARCH_WINDOW:]
+
+        self.sha256.update(data)
+
+    def verify(self) -> dict:
+        """Check the header and trailer once all data is in; return the fingerprint."""
+        if not self._magic_checked:
+            raise UploadRejected("Uploaded file is not a PDF (missing %PDF header)")
+        if PDF_EOF_MARKER not in self._tail:
+            raise UploadRejected("Uploaded PDF is truncated (missing %%EOF trailer)")
+        return {
+            'sha256': self.sha256.hexdigest(),
+            'size': self.size,
+            'pages': self.page_count
+        }
+
+
+def scan_pdf_file(path: str, chunk_size: int = 1024 * 1024, max_bytes: Optional[int] = None,
+                  max_pages: Optional[int] = None) -> dict:
+    """Fingerprint a PDF already on disk (sha256, size, pages) with the upload checks."""
+    fingerprint = PDFFingerprint(max_bytes, max_pages)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            fingerprint.update(chunk)
+    return fingerprint.verify()
+
+
+class PDFUploadStream:
+    """Writable sink used as werkzeug's file stream for uploaded PDFs.
+
+    Chunks are written straight to a temporary file in the upload folder while
+    a PDFFingerprint checks them, so bad uploads are rejected before they are
+    fully read. Call ``finalize`` to verify the trailer and move the file to its
+    final path.
+    """
+
+    def __init__(self, upload_folder: str, max_bytes: Optional[int] = None,
+                 max_pages: Optional[int] = None):
+        os.makedirs(upload_folder, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+        self.fingerprint = PDFFingerprint(max_bytes, max_pages)
+        self._file = tempfile.NamedTemporaryFile(
+            dir=upload_folder, prefix='upload_', suffix='.part', delete=False
+        )
+        self.path = self._file.name
+
+    def write(self, data: bytes) -> int:
+        if not data:
+            return 0
+        try:
+            self.fingerprint.update(data)
+        except UploadRejected as e:
+            self._reject(e)
+        self._file.write(data)
+        return len(data)
+
+    def finalize(self, destination: str) -> dict:
+        """Validate the trailer, move the upload into place and return its fingerprint."""
+        try:
+            info = self.fingerprint.verify()
+        except UploadRejected as e:
+            self._reject(e)
+        self._file.close()
+        os.replace(self.path, destination)
+        self.path = destination
+        return info
+
+    def discard(self):
+        """Close and delete the partially written upload."""
+        try:
+            self._file.close()
+        finally:
+            if self.path.endswith('.part') and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def _reject(self, error: UploadRejected):
+        self.discard()
+        self.logger.warning(f"Upload rejected after {self.fingerprint.size} bytes: {error}")
+        raise error
+
+    # werkzeug rewinds the container after the last chunk and FileStorage may
+    # read from it; delegate those calls to the underlying file.
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if self._file.closed:
+            return 0
+        return self._file.seek(offset, whence)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def flush(self):
+        if not self._file.closed:
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+
+def iter_zip_pdfs(fileobj, upload_folder: str, max_bytes: Optional[int] = None,
+                  max_pages: Optional[int] = None, max_files: Optional[int] = None,
+                  chunk_size: int = 1024 * 1024) -> Iterator[Tuple[str, Optional[PDFUploadStream], Optional[str]]]:
+    """Stream every PDF member of a zip archive through PDFUploadStream.
+
+    Yields ``(filename, stream, error)``; ``stream`` is ready for ``finalize``
+    unless the member was rejected, in which case ``error`` explains why. Members
+    whose declared size already exceeds ``max_bytes`` are rejected without being
+    decompressed, and members that cannot be read (encrypted, corrupt, or using an
+    unsupported compression method) are rejected with their partial file removed.
+    """
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile:
+        raise UploadRejected("Uploaded archive is not a valid zip file")
+
+    with archive:
+        members = [member for member in archive.infolist()
+                   if not member.is_dir() and member.filename.lower().endswith('.pdf')]
+        if max_files is not None and len(members) > max_files:
+            raise UploadRejected(f"Archive contains more than {max_files} PDF files", 413)
+
+        for member in members:
+            filename = os.path.basename(member.filename)
+            if max_bytes is not None and member.file_size > max_bytes:
+                yield filename, None, f"File exceeds the maximum upload size of {max_bytes} bytes"
+                continue
+            stream = PDFUploadStream(upload_folder, max_bytes, max_pages)
+            try:
+                with archive.open(member) as source:
+                    for chunk in iter(lambda: source.read(chunk_size), b''):
+                        stream.write(chunk)
+            except UploadRejected as e:
+                yield filename, None, str(e)
+                continue
+            except (RuntimeError, NotImplementedError, zipfile.BadZipFile, zlib.error, OSError) as e:
+                stream.discard()
+                yield filename, None, f"Could not read archive member: {e}"
+                continue
+            yield filename, stream, None
@@ -0,0 +1,80 @@
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """L2-normalize each row once; zero vectors stay zero (similar to nothing)."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return np.divide(embeddings, norms, out=np.zeros_like(embeddings), where=norms > 0)
+
+
+def _hnsw_index(dim: int):
+    """Inner-product HNSW index from faiss, or None when faiss is not installed."""
+    try:
+        import faiss
+    except ImportError:
+        return None
+    return faiss.IndexHNSWFlat(dim, 32, faiss.METRIC_INNER_PRODUCT)
+
+
+def semantic_dedupe(embeddings: np.ndarray, threshold: float = 0.85, block_size: int = 1024,
+                    ann_min_size: Optional[int] = 50000) -> List[int]:
+    """Indices of rows to keep, dropping any row too similar to an earlier kept row.
+
+    Same rule as comparing each sentence against every kept sentence in order:
+    a row is kept unless its cosine similarity with some previously kept row is
+    above ``threshold``. Rows are processed in blocks: one matrix product checks
+    a block against everything kept so far, and a small in-block pass resolves
+    duplicates inside the block. Past ``ann_min_size`` rows an approximate HNSW
+    index (faiss) replaces the exact product when faiss is available.
+    """
+    vectors = normalize_rows(embeddings)
+    count = len(vectors)
+    if not count:
+        return []
+
+    index = _hnsw_index(vectors.shape[1]) if ann_min_size is not None and count >= ann_min_size else None
+    if index is not None:
+        logger.info(f"Deduplicating {count} embeddings with an approximate HNSW index")
+
+    kept_vectors = np.empty_like(vectors)
+    kept_count = 0
+    kept: List[int] = []
+
+    for start in range(0, count, block_size):
+        block = vectors[start:start + block_size]
+
+        # Duplicates of anything kept in earlier blocks
+        if not kept_count:
+            candidate = np.ones(len(block), dtype=bool)
+        elif index is not None:
+            similarity, _ = index.search(block, 1)
+            candidate = similarity[:, 0] <= threshold
+        else:
+            candidate = (block @ kept_vectors[:kept_count].T).max(axis=1) <= threshold
+
+        # Duplicates inside the block, resolved in order; only rows similar to
+        # an earlier row of the block need a per-row check.
+        earlier_similar = np.tril(block @ block.T > threshold, k=-1)
+        needs_check = earlier_similar.any(axis=1)
+        kept_mask = np.zeros(len(block), dtype=bool)
+        block_kept: List[int] = []
+        for i in np.flatnonzero(candidate):
+            if needs_check[i] and (kept_mask & earlier_similar[i]).any():
+                continue
+            kept_mask[i] = True
+            block_kept.append(i)
+
+        if block_kept:
+            new_vectors = block[block_kept]
+            kept_vectors[kept_count:kept_count + len(block_kept)] = new_vectors
+            kept_count += len(block_kept)
+            kept.extend(start + int(i) for i in block_kept)
+            if index is not None:
+                index.add(new_vectors)
+    return kept
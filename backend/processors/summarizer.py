@@ -1,16 +1,20 @@
 from dataclasses import dataclass
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
-import spacy
 import torch
-from transformers import T5Tokenizer, T5ForConditionalGeneration
-from sentence_transformers import SentenceTransformer
 from rouge_score import rouge_scorer
 import textstat
 from nltk.tokenize import sent_tokenize
 
+from config.config import Config
+from models.registry import get_t5
+from models.embedding_cache import get_embedding_cache
+from models.doc_analysis import get_doc_cache
+from models.t5_backends import inference_device, validate_backend
+from processors.dedupe import semantic_dedupe
+
 @dataclass
 class SummaryMetrics:
     """Stores metrics for evaluating summary quality."""
@@ -23,41 +27,42 @@ class SummaryMetrics:
 class OptimizedSummarizer:
     """A streamlined text summarization class using T5 and other NLP models."""
     
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None):
         """Initialize models and tokenizers."""
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.backend = validate_backend(backend or Config.T5_BACKEND)
+        self.device = inference_device(self.backend)
         
-        # Initialize core models
-        self.tokenizer = T5Tokenizer.from_pretrained('t5-base')
-        self.model = T5ForConditionalGeneration.from_pretrained('t5-base').to(self.device)
-        self.nlp = spacy.load('en_core_web_sm')
-        self.sentence_transformer = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2').to(self.device)
+        # Core models are shared through the model registry and loaded on first use;
+        # spaCy parses go through the shared Doc cache
+        self.docs = get_doc_cache(Config.SPACY_MODEL)
         self.rouge_scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
         
-        logging.info(f"Initialized OptimizedSummarizer using device: {self.device}")
+        logging.info(f"Initialized OptimizedSummarizer using device: {self.device} (backend: {self.backend})")
+
+    @property
+    def tokenizer(self):
+        return get_t5('t5-base', str(self.device), backend=self.backend)[0]
+
+    @property
+    def model(self):
+        return get_t5('t5-base', str(self.device), backend=self.backend)[1]
+
+    @property
+    def embeddings(self):
+        return get_embedding_cache('all-MiniLM-L6-v2', str(self.device))
 
     def preprocess_text(self, text: str) -> str:
         """Remove duplicates and normalize text."""
-        # Split into sentences and get embeddings
-        sentences = [sent.strip() for sent in self.nlp(text).sents]
-        embeddings = self.sentence_transformer.encode(sentences)
+        # Split into sentences, skipping very short ones
+        sentences = [str(sent).strip() for sent in self.docs.get(text, 'sentences').sents]
+        sentences = [sent for sent in sentences if len(sent.split()) >= 4]
+        if not sentences:
+            return ''
+        embeddings = self.embeddings.encode(sentences)
         
         # Remove duplicate sentences based on semantic similarity
-        unique_sentences = []
-        seen_embeddings = []
-        
-        for sent, emb in zip(sentences, embeddings):
-            # Skip very short sentences
-            if len(sent.split()) < 4:
-                continue
-                
-            # Check if sentence is semantically similar to any previous sentence
-            if not any(np.dot(emb, seen_emb) / (np.linalg.norm(emb) * np.linalg.norm(seen_emb)) > 0.85 
-                      for seen_emb in seen_embeddings):
-                unique_sentences.append(str(sent))
-                seen_embeddings.append(emb)
-        
-        return ' '.join(unique_sentences)
+        keep = semantic_dedupe(embeddings, threshold=0.85)
+        return ' '.join(sentences[i] for i in keep)
 
     def generate_summary(self, text: str, max_length: int = 150) -> str:
         """Generate a summary using T5 model."""
@@ -122,7 +127,7 @@ class OptimizedSummarizer:
         if len(sentences) < 2:
             return 1.0
             
-        embeddings = self.sentence_transformer.encode(sentences)
+        embeddings = self.embeddings.encode(sentences)
         similarities = [
             np.dot(embeddings[i], embeddings[i + 1]) / (
                 np.linalg.norm(embeddings[i]) * np.linalg.norm(embeddings[i + 1])
@@ -132,8 +137,9 @@ class OptimizedSummarizer:
 
     def _calculate_coverage(self, original: str, summary: str) -> float:
         """Calculate what proportion of original entities are covered in summary."""
-        original_entities = set(ent.text.lower() for ent in self.nlp(original).ents)
-        summary_entities = set(ent.text.lower() for ent in self.nlp(summary).ents)
+        original_doc, summary_doc = self.docs.get_many([original, summary], 'entities')
+        original_entities = set(ent.text.lower() for ent in original_doc.ents)
+        summary_entities = set(ent.text.lower() for ent in summary_doc.ents)
         
         if not original_entities:
             return 1.0
@@ -142,6 +148,9 @@ class OptimizedSummarizer:
 
     def summarize(self, text: str, max_length: int = 150) -> Tuple[str, SummaryMetrics]:
         """Main method to generate summary and calculate metrics."""
+        # Parse the original once for both sentence splitting and entity coverage
+        self.docs.get(text, 'sentences', 'entities')
+
         # Preprocess text
         cleaned_text = self.preprocess_text(text)
         
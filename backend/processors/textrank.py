@@ -0,0 +1,76 @@
+import logging
+from typing import List, Optional
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+
+def pagerank(similarity, damping: float = 0.85, tol: float = 1e-6, max_iter: int = 100) -> np.ndarray:
+    """PageRank scores of a weighted, undirected similarity graph by power iteration.
+
+    ``similarity`` is a dense array or SciPy sparse matrix used as the weighted
+    adjacency matrix (self-similarity included), exactly as
+    ``nx.pagerank(nx.from_numpy_array(similarity))`` treats it: rows are
+    normalized to transition probabilities, rows without weight jump uniformly,
+    and iteration stops once the L1 change drops below ``n * tol``. If that
+    does not happen within ``max_iter`` steps the last iterate is returned.
+    """
+    count = similarity.shape[0]
+    if not count:
+        return np.empty(0)
+
+    weights = np.asarray(similarity.sum(axis=1)).ravel()
+    dangling = weights == 0
+    inverse = np.divide(1.0, weights, out=np.zeros_like(weights, dtype=float), where=~dangling)
+    if sparse.issparse(similarity):
+        transition = sparse.diags(inverse) @ similarity.tocsr()
+    else:
+        transition = np.asarray(similarity, dtype=float) * inverse[:, None]
+
+    uniform = np.full(count, 1.0 / count)
+    scores = uniform.copy()
+    for _ in range(max_iter):
+        previous = scores
+        scores = damping * (previous @ transition + previous[dangling].sum() * uniform) + (1 - damping) * uniform
+        if np.abs(scores - previous).sum() < count * tol:
+            return scores
+    logger.warning(f"TextRank did not converge within {max_iter} iterations on {count} sentences")
+    return scores
+
+
+def similarity_graph(embeddings: np.ndarray, top_k: Optional[int] = None, block_size: int = 1024):
+    """Inner-product similarity graph of the embeddings.
+
+    Without ``top_k`` this is the full dense matrix. With ``top_k`` every
+    sentence keeps only edges to its ``top_k`` most similar sentences (kept in
+    both directions so the graph stays undirected), computed block by block so
+    the dense n x n matrix is never materialized.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    count = len(embeddings)
+    if top_k is None or top_k >= count:
+        return np.inner(embeddings, embeddings)
+
+    rows, cols, values = [], [], []
+    for start in range(0, count, block_size):
+        block = embeddings[start:start + block_size] @ embeddings.T
+        nearest = np.argpartition(-block, top_k - 1, axis=1)[:, :top_k]
+        rows.append(np.repeat(np.arange(start, start + len(block)), top_k))
+        cols.append(nearest.ravel())
+        values.append(np.take_along_axis(block, nearest, axis=1).ravel())
+    graph = sparse.csr_matrix(
+        (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))), shape=(count, count)
+    )
+    # Union of both directions; similarities are symmetric, so shared edges agree
+    return graph + graph.T - graph.multiply(graph.T.astype(bool))
+
+
+def rank_sentences(embeddings: np.ndarray, num_sentences: int, top_k: Optional[int] = None) -> List[int]:
+    """Indices of the ``num_sentences`` highest-scoring sentences, best first.
+
+    Ties keep sentence order, matching ``sorted(scores, key=scores.get, reverse=True)``.
+    """
+    scores = pagerank(similarity_graph(embeddings, top_k))
+    return [int(i) for i in np.argsort(-scores, kind='stable')[:num_sentences]]
@@ -0,0 +1,347 @@
+import io
+import os
+import json
+import mmap
+import time
+import sqlite3
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional, Union
+
+from pipeline.metrics import cache_lookup
+
+SCHEMA_VERSION = 1
+
+# How each kind of artifact is stored on disk
+TEXT, IMAGE, TABLE, JSON_KIND = 'text', 'image', 'table', 'json'
+
+
+def _arrow():
+    """pyarrow, or None when it is not installed (tables then fall back to JSON)."""
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        return None
+    return pyarrow
+
+
+class ArtifactCache:
+    """Content-addressed cache of processing artifacts: a SQLite index plus blob files.
+
+    Every artifact is stored once under the SHA-256 of its bytes in
+    ``blobs/<2 hex>/<digest>``: text as UTF-8, images as their raw file bytes,
+    tables as Arrow IPC files (JSON when pyarrow is missing) and other values as
+    JSON. The index maps cache keys to blobs and records size and last access
+    for LRU eviction down to ``max_bytes``. ``open_blob`` maps a blob so a large
+    artifact is only paged in as far as it is read; the ``get_*`` helpers need
+    the whole value and read the file directly. Blobs are written
+    to a temporary file and renamed into place, and index updates are SQLite
+    transactions, so concurrent writers in several processes never expose a
+    partial artifact. An index with another schema version is discarded
+    together with its blobs.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            name TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS artifacts (
+            key TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            digest TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL,
+            info TEXT NOT NULL DEFAULT '{}'
+        );
+        CREATE INDEX IF NOT EXISTS idx_artifacts_last_access ON artifacts(last_access);
+        CREATE INDEX IF NOT EXISTS idx_artifacts_digest ON artifacts(digest);
+    """
+
+    def __init__(self, root: str = 'cache/artifacts', max_bytes: int = 0):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.blob_root = os.path.join(root, 'blobs')
+        self.db_path = os.path.join(root, 'index.sqlite')
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+        os.makedirs(self.blob_root, exist_ok=True)
+        self._check_schema()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return a per-thread connection; sqlite3 connections are not shareable across threads."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _check_schema(self):
+        conn = self._connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            row = conn.execute("SELECT value FROM meta WHERE name = 'schema_version'").fetchone()
+            if row is not None and int(row[0]) != SCHEMA_VERSION:
+                self.logger.info(f"Artifact cache schema {row[0]} is outdated; clearing {self.root}")
+                conn.execute('DROP TABLE IF EXISTS artifacts')
+                self._remove_all_blobs()
+            for statement in self.SCHEMA.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),)
+            )
+
+    def _remove_all_blobs(self):
+        for directory, _, files in os.walk(self.blob_root):
+            for name in files:
+                os.remove(os.path.join(directory, name))
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_root, digest[:2], digest)
+
+    # --- writing ---------------------------------------------------------------
+
+    def _write_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                # Same digest means same bytes, so a concurrent writer's rename is harmless
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return digest
+
+    def _put(self, key: str, kind: str, data: bytes, info: Optional[Dict[str, Any]] = None) -> str:
+        digest = self._write_blob(data)
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO artifacts (key, kind, digest, size, created_at, last_access, info) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, kind, digest, len(data), now, now, json.dumps(info or {}))
+            )
+        if self.max_bytes:
+            self.evict(self.max_bytes)
+        return digest
+
+    def put_text(self, key: str, text: str) -> str:
+        return self._put(key, TEXT, text.encode('utf-8'))
+
+    def put_image(self, key: str, data: bytes, image_format: str = 'png') -> str:
+        return self._put(key, IMAGE, data, {'format': image_format})
+
+    def put_json(self, key: str, value: Any) -> str:
+        return self._put(key, JSON_KIND, json.dumps(value, ensure_ascii=False).encode('utf-8'))
+
+    def put_table(self, key: str, rows: List[Dict[str, Any]]) -> str:
+        """Store table rows as an Arrow IPC file (all values as strings, like extracted PDF cells)."""
+        pa = _arrow()
+        if pa is None:
+            return self._put(key, TABLE, json.dumps(rows, ensure_ascii=False).encode('utf-8'), {'format': 'json'})
+        rows = [{str(name): value for name, value in row.items()} for row in rows]
+        columns: Dict[str, List[Optional[str]]] = {}
+        for row in rows:
+            for name in row:
+                columns.setdefault(name, [])
+        for row in rows:
+            for name in columns:
+                value = row.get(name)
+                columns[name].append(None if value is None else str(value))
+        table = pa.table({name: pa.array(values, type=pa.string()) for name, values in columns.items()})
+        sink = io.BytesIO()
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        return self._put(key, TABLE, sink.getvalue(), {'format': 'arrow'})
+
+    # --- reading ---------------------------------------------------------------
+
+    def _lookup(self, key: str):
+        conn = self._connection()
+        row = conn.execute('SELECT kind, digest, info FROM artifacts WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            cache_lookup('artifacts', hit=False)
+            return None
+        path = self._blob_path(row[1])
+        if not os.path.exists(path):
+            with conn:
+                conn.execute('DELETE FROM artifacts WHERE key = ?', (key,))
+            cache_lookup('artifacts', hit=False)
+            return None
+        cache_lookup('artifacts', hit=True)
+        with conn:
+            conn.execute('UPDATE artifacts SET last_access = ? WHERE key = ?', (time.time(), key))
+        return row[0], path, json.loads(row[2])
+
+    def open_blob(self, key: str) -> Optional[Union[mmap.mmap, memoryview]]:
+        """Read-only memory map of an artifact's bytes; pages load as they are read.
+
+        The caller owns the map and should close it (``with cache.open_blob(key) as blob``).
+        """
+        found = self._lookup(key)
+        if found is None:
+            return None
+        with open(found[1], 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(b'')  # Empty files cannot be mapped; a view closes like a map
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read_blob(self, key: str) -> Optional[bytes]:
+        """An artifact's bytes, read in one go."""
+        found = self._lookup(key)
+        if found is None:
+            return None
+        with open(found[1], 'rb') as f:
+            return f.read()
+
+    def get_text(self, key: str) -> Optional[str]:
+        blob = self.read_blob(key)
+        return None if blob is None else blob.decode('utf-8')
+
+    def get_json(self, key: str) -> Any:
+        blob = self.read_blob(key)
+        return None if blob is None else json.loads(blob)
+
+    def get_image(self, key: str) -> Optional[bytes]:
+        return self.read_blob(key)
+
+    def get_table(self, key: str):
+        """An Arrow table (memory-mapped, zero-copy), or a list of row dicts for JSON-stored tables."""
+        found = self._lookup(key)
+        if found is None:
+            return None
+        _, path, info = found
+        if info.get('format') == 'arrow':
+            pa = _arrow()
+            if pa is None:
+                raise ImportError("Reading Arrow tables from the artifact cache requires pyarrow")
+            return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def exists(self, key: str) -> bool:
+        row = self._connection().execute('SELECT 1 FROM artifacts WHERE key = ?', (key,)).fetchone()
+        return row is not None
+
+    # --- maintenance -------------------------------------------------------------
+
+    def delete(self, key: str) -> bool:
+        conn = self._connection()
+        with conn:
+            row = conn.execute('SELECT digest FROM artifacts WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return False
+            conn.execute('DELETE FROM artifacts WHERE key = ?', (key,))
+        self._remove_unreferenced([row[0]])
+        return True
+
+    def _remove_unreferenced(self, digests: List[str]):
+        conn = self._connection()
+        for digest in set(digests):
+            if conn.execute('SELECT 1 FROM artifacts WHERE digest = ?', (digest,)).fetchone() is None:
+                try:
+                    os.remove(self._blob_path(digest))
+                except FileNotFoundError:
+                    pass
+
+    def total_bytes(self) -> int:
+        row = self._connection().execute(
+            'SELECT COALESCE(SUM(size), 0) FROM (SELECT digest, MAX(size) AS size FROM artifacts GROUP BY digest)'
+        ).fetchone()
+        return row[0]
+
+    def evict(self, max_bytes: int) -> int:
+        """Drop least recently used artifacts until the blobs fit in max_bytes. Returns the number removed."""
+        total = self.total_bytes()
+        if total <= max_bytes:
+            return 0
+        conn = self._connection()
+        removed, digests = 0, []
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            for key, digest, size in conn.execute(
+                'SELECT key, digest, size FROM artifacts ORDER BY last_access'
+            ).fetchall():
+                if total <= max_bytes:
+                    break
+                conn.execute('DELETE FROM artifacts WHERE key = ?', (key,))
+                digests.append(digest)
+                removed += 1
+                if conn.execute('SELECT 1 FROM artifacts WHERE digest = ?', (digest,)).fetchone() is None:
+                    total -= size
+        self._remove_unreferenced(digests)
+        if removed:
+            self.logger.info(f"Evicted {removed} artifacts from {self.root} (now {total / (1024 * 1024):.1f} MB)")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        count = self._connection().execute('SELECT COUNT(*) FROM artifacts').fetchone()[0]
+        return {'artifacts': count, 'bytes': self.total_bytes(), 'max_bytes': self.max_bytes}
+
+
+def import_pickle_cache(cache: ArtifactCache, pickle_path: str) -> List[str]:
+    """Move a legacy ``cache/<name>.cache`` pickle into the artifact cache.
+
+    Only for files this application wrote itself: unpickling runs arbitrary
+    code. The summary becomes text, metadata/metrics/key topics JSON, and each
+    base64 page image a raw image artifact under ``<name>/...`` keys.
+    """
+    import base64
+    import pickle
+
+    name = os.path.splitext(os.path.basename(pickle_path))[0]
+    with open(pickle_path, 'rb') as f:
+        data = pickle.load(f)
+
+    keys = []
+    for field, value in data.items():
+        key = f"{name}/{field}"
+        if field == 'summary':
+            cache.put_text(key, value)
+        elif field == 'tables':
+            entries = []
+            for index, item in enumerate(value):
+                entry = {k: v for k, v in item.items() if k != 'base64_image'}
+                if item.get('base64_image'):
+                    entry['image_key'] = f"{key}/{index}"
+                    cache.put_image(entry['image_key'], base64.b64decode(item['base64_image']))
+                    keys.append(entry['image_key'])
+                entries.append(entry)
+            cache.put_json(key, entries)
+        else:
+            cache.put_json(key, value)
+        keys.append(key)
+    return keys
+
+
+def main():
+    import sys
+    from config.config import Config
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    cache = ArtifactCache(Config.ARTIFACT_CACHE_DIR, int(Config.ARTIFACT_CACHE_MAX_MB * 1024 * 1024))
+    for path in sys.argv[1:]:
+        keys = import_pickle_cache(cache, path)
+        print(f"Imported {path}: {len(keys)} artifacts")
+    print(cache.stats())
+
+
+if __name__ == "__main__":
+    main()
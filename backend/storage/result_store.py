@@ -0,0 +1,230 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, List, Iterable
+
+
+class ResultStore(ABC):
+    """Interface for persisting processed reports keyed by file id."""
+
+    @abstractmethod
+    def save(self, file_id: str, result: Dict[str, Any]) -> None:
+        """Persist a complete result, replacing any previous one."""
+
+    @abstractmethod
+    def load(self, file_id: str, fields: Optional[Iterable[str]] = None) -> Optional[Dict[str, Any]]:
+        """Load a result, optionally restricted to the given top-level fields."""
+
+    @abstractmethod
+    def exists(self, file_id: str) -> bool:
+        """Return True when a result is stored for file_id."""
+
+    @abstractmethod
+    def delete(self, file_id: str) -> bool:
+        """Remove a stored result. Returns True if something was deleted."""
+
+    @abstractmethod
+    def list(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """List stored results, newest first, as dicts with file_id, created_at and size."""
+
+    def purge(self, max_age_seconds: float) -> int:
+        """Delete results older than max_age_seconds. Returns the number removed."""
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for entry in self.list():
+            if entry['created_at'] < cutoff and self.delete(entry['file_id']):
+                removed += 1
+        return removed
+
+    def dumps(self, file_id: str, fields: Optional[Iterable[str]] = None) -> Optional[str]:
+        """Serialize a stored result to a JSON string for download."""
+        result = self.load(file_id, fields)
+        if result is None:
+            return None
+        return json.dumps(result, indent=4, ensure_ascii=False)
+
+
+class FileSystemResultStore(ResultStore):
+    """Stores each result as a single results/<file_id>.json file."""
+
+    def __init__(self, folder: str = 'results'):
+        self.folder = folder
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(self.folder, exist_ok=True)
+
+    def _path(self, file_id: str) -> str:
+        return os.path.join(self.folder, f"{file_id}.json")
+
+    def save(self, file_id, result):
+        path = self._path(file_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def load(self, file_id, fields=None):
+        path = self._path(file_id)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+        if fields is None:
+            return result
+        return {name: result[name] for name in fields if name in result}
+
+    def exists(self, file_id):
+        return os.path.exists(self._path(file_id))
+
+    def delete(self, file_id):
+        try:
+            os.remove(self._path(file_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def list(self, limit=None):
+        entries = []
+        for name in os.listdir(self.folder):
+            if not name.endswith('.json'):
+                continue
+            stat = os.stat(os.path.join(self.folder, name))
+            entries.append({
+                'file_id': name[:-len('.json')],
+                'created_at': stat.st_mtime,
+                'size': stat.st_size
+            })
+        entries.sort(key=lambda entry: entry['created_at'], reverse=True)
+        return entries[:limit] if limit else entries
+
+
+class SQLiteResultStore(ResultStore):
+    """Stores each top-level section of a result as its own row in SQLite (WAL mode).
+
+    Reading a single field only touches that section's row, so a status poll
+    asking for ``ExecutiveSummary`` never deserializes ``Findings`` or images.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            file_id TEXT PRIMARY KEY,
+            created_at REAL NOT NULL,
+            size INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS sections (
+            file_id TEXT NOT NULL REFERENCES results(file_id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            payload TEXT NOT NULL,
+            PRIMARY KEY (file_id, name)
+        );
+        CREATE INDEX IF NOT EXISTS idx_results_created_at ON results(created_at);
+    """
+
+    def __init__(self, db_path: str = 'results/results.db'):
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return a per-thread connection; sqlite3 connections are not shareable across threads."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+        return conn
+
+    def save(self, file_id, result):
+        rows = []
+        total_size = 0
+        for position, (name, value) in enumerate(result.items()):
+            payload = json.dumps(value, ensure_ascii=False)
+            total_size += len(payload)
+            rows.append((file_id, name, position, payload))
+
+        conn = self._connection()
+        with conn:
+            conn.execute('DELETE FROM results WHERE file_id = ?', (file_id,))
+            conn.execute(
+                'INSERT INTO results (file_id, created_at, size) VALUES (?, ?, ?)',
+                (file_id, time.time(), total_size)
+            )
+            conn.executemany(
+                'INSERT INTO sections (file_id, name, position, payload) VALUES (?, ?, ?, ?)',
+                rows
+            )
+
+    def load(self, file_id, fields=None):
+        conn = self._connection()
+        if not self.exists(file_id):
+            return None
+        if fields is None:
+            cursor = conn.execute(
+                'SELECT name, payload FROM sections WHERE file_id = ? ORDER BY position',
+                (file_id,)
+            )
+        else:
+            fields = list(fields)
+            if not fields:
+                return {}
+            placeholders = ','.join('?' for _ in fields)
+            cursor = conn.execute(
+                f'SELECT name, payload FROM sections WHERE file_id = ? AND name IN ({placeholders}) '
+                'ORDER BY position',
+                (file_id, *fields)
+            )
+        return {name: json.loads(payload) for name, payload in cursor}
+
+    def exists(self, file_id):
+        row = self._connection().execute(
+            'SELECT 1 FROM results WHERE file_id = ?', (file_id,)
+        ).fetchone()
+        return row is not None
+
+    def delete(self, file_id):
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute('DELETE FROM results WHERE file_id = ?', (file_id,))
+        return cursor.rowcount > 0
+
+    def list(self, limit=None):
+        query = 'SELECT file_id, created_at, size FROM results ORDER BY created_at DESC'
+        params = ()
+        if limit:
+            query += ' LIMIT ?'
+            params = (limit,)
+        return [
+            {'file_id': file_id, 'created_at': created_at, 'size': size}
+            for file_id, created_at, size in self._connection().execute(query, params)
+        ]
+
+    def purge(self, max_age_seconds):
+        cutoff = time.time() - max_age_seconds
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute('DELETE FROM results WHERE created_at < ?', (cutoff,))
+        removed = cursor.rowcount
+        if removed:
+            self.logger.info(f"Purged {removed} results older than {max_age_seconds:.0f}s")
+        return removed
+
+
+def create_result_store(backend: str = 'filesystem', location: Optional[str] = None) -> ResultStore:
+    """Build a ResultStore from a backend name ('filesystem' or 'sqlite')."""
+    backend = (backend or 'filesystem').lower()
+    if backend == 'sqlite':
+        return SQLiteResultStore(location or 'results/results.db')
+    if backend == 'filesystem':
+        return FileSystemResultStore(location or 'results')
+    raise ValueError(f"Unknown result store backend: {backend}")
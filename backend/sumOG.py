@@ -10,13 +10,17 @@ import logging
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor
 from models.summarization_model import SummarizationModel
+from models.chunk_summarizer import BatchedChunkSummarizer
 from models.audio import generate_audio
+from extractors.page_visitor import PdfPageVisitor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Initialize summarization model
 summarizer = SummarizationModel(local_path="./backend/models/bart_model")
+# Chunks are summarized in batches with the same (shared) model
+chunk_summarizer = BatchedChunkSummarizer(summarizer.model_name, str(summarizer.local_path), summarizer.backend)
 
 def initialize_progress(callback, start=0):
     if callback:
@@ -63,15 +67,7 @@ def extract_tables_from_pdf(pdf_path, progress_callback=None):
                     if page_tables:
                         for table_index, raw_table in enumerate(page_tables):
                             if raw_table and len(raw_table) > 1:
-                                df = pd.DataFrame(raw_table[1:], columns=raw_table[0])
-                                table_records = df.to_dict(orient='records')
-                                table_description = f"Table extracted from page {page_num}, index {table_index}"
-                                tables.append({
-                                    'page_number': page_num,
-                                    'table_index': table_index,
-                                    'data': table_records,
-                                    'description': table_description
-                                })
+                                tables.append(_table_record(raw_table, page_num, table_index))
                     update_progress(progress_callback, 10 + (page_num / total_pages * 10))
                 except Exception as e:
                     logging.error(f"Error processing table on page {page_num}: {e}")
@@ -79,6 +75,23 @@ def extract_tables_from_pdf(pdf_path, progress_callback=None):
         logging.error(f"Error opening PDF for table extraction: {e}")
     return tables
 
+def _table_record(raw_table, page_num, table_index):
+    df = pd.DataFrame(raw_table[1:], columns=raw_table[0])
+    return {
+        'page_number': page_num,
+        'table_index': table_index,
+        'data': df.to_dict(orient='records'),
+        'description': f"Table extracted from page {page_num}, index {table_index}"
+    }
+
+def _format_metadata(metadata):
+    return {
+        "title": metadata.get("Title", "Untitled Document"),
+        "producer": metadata.get("Producer", "Unknown"),
+        "author": metadata.get("Author", "Unknown"),
+        "subject": metadata.get("Subject", "No Subject")
+    }
+
 def count_words(text):
     """Count words in text."""
     return len(text.split()) if text else 0
@@ -91,13 +104,7 @@ def get_pdf_metadata(pdf_path):
     """Extract metadata from the PDF file."""
     try:
         with pdfplumber.open(pdf_path) as pdf:
-            metadata = pdf.metadata or {}
-            return {
-                "title": metadata.get("Title", "Untitled Document"),
-                "producer": metadata.get("Producer", "Unknown"),
-                "author": metadata.get("Author", "Unknown"),
-                "subject": metadata.get("Subject", "No Subject")
-            }
+            return _format_metadata(pdf.metadata or {})
     except Exception as e:
         logging.error(f"Error extracting metadata: {e}")
         return {}
@@ -148,38 +155,52 @@ def summarize_text_in_chunks(text, progress_callback=None, chunk_size=2000):
         return ""
 
     chunks = split_text_into_chunks(text, chunk_size)
-    summaries = []
+    with tqdm(total=len(chunks), desc="Text Summarization", unit="chunk") as bar:
+        def report(done, total):
+            bar.update(round(done / total * len(chunks)) - bar.n)
+            update_progress(progress_callback, 50 + (done / total * 30))
 
-    for i, chunk in tqdm(enumerate(chunks), total=len(chunks), desc="Text Summarization", unit="chunk"):
         try:
-            summary = summarizer.summarize(chunk, max_length=200, min_length=50)
-            summaries.append(summary)
-            update_progress(progress_callback, 50 + (i / len(chunks) * 30))
+            summaries = chunk_summarizer.summarize(chunks, report)
         except Exception as e:
-            logging.error(f"Error summarizing chunk {i + 1}: {e}")
+            logging.error(f"Error summarizing {len(chunks)} chunks: {e}")
+            return ""
 
-    return "\n\n".join(summaries)
+    return "\n\n".join(summary for summary in summaries if summary)
 
 def summarize_pdf(pdf_path, user_feedback=None, progress_callback=None):
     """Main function to summarize the PDF document with robust handling of content."""
     try:
         initialize_progress(progress_callback, 0)
 
-        text = extract_text_with_ocr(pdf_path, progress_callback)
+        # One pass over the pages for text, tables, page images and metadata
+        content = PdfPageVisitor().visit(
+            pdf_path, lambda done, total: update_progress(progress_callback, done / total * 40)
+        )
+        text = content.text
         if not text or not text.strip():
             raise ValueError("No readable text found in the PDF.")
 
-        images = extract_images_from_pdf(pdf_path, progress_callback)
-        tables = extract_tables_from_pdf(pdf_path, progress_callback)
+        images = [{
+            'page_number': page.page_number,
+            'base64_image': page.image_base64,
+            'description': f"Image extracted from page {page.page_number}"
+        } for page in content.pages if page.image_base64]
+        tables = [
+            _table_record(raw_table, page.page_number, table_index)
+            for page in content.pages for table_index, raw_table in enumerate(page.tables)
+            if raw_table and len(raw_table) > 1
+        ]
 
         word_count = count_words(text)
         reading_time = estimate_reading_time(word_count)
         language = detect(text) if text else "unknown"
 
         summary_text = summarize_text_in_chunks(text, progress_callback)
+        # Returns the audio URL at once; the audio worker renders it in the background
         audio_path = generate_audio(summary_text)
 
-        metadata = get_pdf_metadata(pdf_path)
+        metadata = _format_metadata(content.metadata)
 
         if user_feedback:
             summarizer.feedback_loop(user_feedback)
@@ -6,7 +6,6 @@ import numpy as np
 import json
 import os
 import re
-import spacy
 import logging
 import math
 from tqdm import tqdm
@@ -14,33 +13,47 @@ from PIL import Image
 from langdetect import detect
 import pytesseract
 from concurrent.futures import ThreadPoolExecutor
-from transformers import T5ForConditionalGeneration, T5Tokenizer
 from sklearn.feature_extraction.text import TfidfVectorizer
 from nltk.tokenize import sent_tokenize
-from sentence_transformers import SentenceTransformer
-import networkx as nx
+
+from config.config import Config
+from models.registry import get_t5
+from models.embedding_cache import get_embedding_cache
+from models.doc_analysis import get_doc_cache
+from models.t5_backends import validate_backend
+from models.chunk_summarizer import BatchedChunkSummarizer
+from extractors.page_visitor import PdfPageVisitor
+from processors.textrank import rank_sentences
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 class IntegratedSummarizer:
-    def __init__(self, model_name="t5-base", local_path="./models/t5_model"):
+    def __init__(self, model_name="t5-base", local_path="./models/t5_model", backend=None,
+                 spacy_model=None, textrank_top_k=None):
         self.local_path = local_path
         self.model_name = model_name
+        self.backend = validate_backend(backend or Config.T5_BACKEND)
+        # spaCy is only used for noun chunks; the small model's parser covers that
+        self.docs = get_doc_cache(spacy_model or Config.SPACY_MODEL)
+        # Keep only each sentence's k most similar neighbours in the TextRank graph (None = dense)
+        self.textrank_top_k = textrank_top_k
+        self.chunk_summarizer = BatchedChunkSummarizer(model_name, local_path, self.backend)
 
-        # Initialize T5 model and tokenizer
-        logging.info("Initializing T5 model and tokenizer...")
-        self.tokenizer = T5Tokenizer.from_pretrained(model_name)
-        self.model = T5ForConditionalGeneration.from_pretrained(model_name)
-        
-        # Save locally
-        self.tokenizer.save_pretrained(local_path)
-        self.model.save_pretrained(local_path)
+        # T5, spaCy and BERT models are shared through the model registry and
+        # loaded on first use.
+
+    @property
+    def tokenizer(self):
+        return get_t5(self.model_name, local_path=self.local_path, backend=self.backend)[0]
+
+    @property
+    def model(self):
+        return get_t5(self.model_name, local_path=self.local_path, backend=self.backend)[1]
 
-        # Initialize spaCy and BERT models
-        logging.info("Loading NLP models...")
-        self.nlp = spacy.load("en_core_web_trf")
-        self.sentence_model = SentenceTransformer('multi-qa-mpnet-base-dot-v1')
+    @property
+    def sentence_model(self):
+        return get_embedding_cache('multi-qa-mpnet-base-dot-v1')
 
     def initialize_progress(self, callback, start=0):
         if callback:
@@ -86,13 +99,7 @@ class IntegratedSummarizer:
                         if page_tables:
                             for table_index, raw_table in enumerate(page_tables):
                                 if raw_table and len(raw_table) > 1:
-                                    df = pd.DataFrame(raw_table[1:], columns=raw_table[0])
-                                    tables.append({
-                                        'page_number': page_num,
-                                        'table_index': table_index,
-                                        'data': df.to_dict(orient='records'),
-                                        'description': f"Table from page {page_num}"
-                                    })
+                                    tables.append(self._table_record(raw_table, page_num, table_index))
                         self.update_progress(progress_callback, 10 + (page_num / total_pages * 10))
                     except Exception as e:
                         logging.error(f"Error processing table on page {page_num}: {e}")
@@ -100,6 +107,39 @@ class IntegratedSummarizer:
             logging.error(f"Error in table extraction: {e}")
         return tables
 
+    def _table_record(self, raw_table, page_num, table_index):
+        df = pd.DataFrame(raw_table[1:], columns=raw_table[0])
+        return {
+            'page_number': page_num,
+            'table_index': table_index,
+            'data': df.to_dict(orient='records'),
+            'description': f"Table from page {page_num}"
+        }
+
+    def extract_content(self, pdf_path, progress_callback=None, text=True, tables=True, images=True,
+                        metadata=True):
+        """Text, tables, page images and metadata from one pass over the PDF.
+
+        Each product can be switched off; pages are visited in parallel workers.
+        """
+        content = PdfPageVisitor(text=text, tables=tables, images=images, metadata=metadata).visit(
+            pdf_path, lambda done, total: self.update_progress(progress_callback, done / total * 40)
+        )
+        return {
+            "text": content.text,
+            "images": [{
+                'page_number': page.page_number,
+                'base64_image': page.image_base64,
+                'description': f"Image from page {page.page_number}"
+            } for page in content.pages if page.image_base64],
+            "tables": [
+                self._table_record(raw_table, page.page_number, table_index)
+                for page in content.pages for table_index, raw_table in enumerate(page.tables)
+                if raw_table and len(raw_table) > 1
+            ],
+            "metadata": self._format_metadata(content.metadata) if metadata else {}
+        }
+
     def extract_text_with_ocr(self, pdf_path, progress_callback=None):
         """Extract text using OCR when needed."""
         ocr_text = []
@@ -126,7 +166,7 @@ class IntegratedSummarizer:
         if title:
             return title.strip()
         
-        doc = self.nlp(text[:5000])  # Process first 5000 chars for efficiency
+        doc = self.docs.get(text[:5000], 'noun_chunks')  # Process first 5000 chars for efficiency
         keywords = [chunk.text for chunk in doc.noun_chunks]
         return ' '.join(set(keywords))[:100]
 
@@ -138,12 +178,8 @@ class IntegratedSummarizer:
         if len(unique_sentences) < num_sentences:
             return unique_sentences
 
-        embeddings = self.sentence_model.encode(unique_sentences, show_progress_bar=False)
-        similarity_matrix = np.inner(embeddings, embeddings)
-        nx_graph = nx.from_numpy_array(similarity_matrix)
-        scores = nx.pagerank(nx_graph)
-
-        top_indices = sorted(scores, key=scores.get, reverse=True)[:num_sentences]
+        embeddings = self.sentence_model.encode(unique_sentences)
+        top_indices = rank_sentences(embeddings, num_sentences, top_k=self.textrank_top_k)
         return [unique_sentences[i] for i in sorted(top_indices)]
 
     def split_text_into_chunks(self, text, chunk_size=2000):
@@ -191,13 +227,10 @@ class IntegratedSummarizer:
         try:
             self.initialize_progress(progress_callback, 0)
             
-            # Extract metadata
-            metadata = self.get_pdf_metadata(pdf_path)
-            
-            # Extract content
-            text = self.extract_text_with_ocr(pdf_path, progress_callback)
-            images = self.extract_images_from_pdf(pdf_path, progress_callback)
-            tables = self.extract_tables_from_pdf(pdf_path, progress_callback)
+            # Extract metadata and content in one pass over the pages
+            content = self.extract_content(pdf_path, progress_callback)
+            metadata, text = content["metadata"], content["text"]
+            images, tables = content["images"], content["tables"]
             
             if not text.strip():
                 raise ValueError("No readable text found in the PDF")
@@ -209,12 +242,10 @@ class IntegratedSummarizer:
             
             # Generate summary
             chunks = self.split_text_into_chunks(text)
-            summaries = []
-            
-            for i, chunk in enumerate(chunks):
-                summary = self.summarize_chunk(chunk)
-                summaries.append(summary)
-                self.update_progress(progress_callback, 50 + (i / len(chunks) * 40))
+            summaries = self.chunk_summarizer.summarize(
+                chunks,
+                lambda done, total: self.update_progress(progress_callback, 50 + (done / total * 40))
+            )
 
             text_summary = self.format_summary(
                 self.extract_main_idea(text, metadata.get('title')),
@@ -247,17 +278,19 @@ class IntegratedSummarizer:
         """Extract metadata from PDF."""
         try:
             with pdfplumber.open(pdf_path) as pdf:
-                metadata = pdf.metadata or {}
-                return {
-                    "title": metadata.get("Title", "Untitled"),
-                    "author": metadata.get("Author", "Unknown"),
-                    "producer": metadata.get("Producer", "Unknown"),
-                    "subject": metadata.get("Subject", "")
-                }
+                return self._format_metadata(pdf.metadata or {})
         except Exception as e:
             logging.error(f"Error extracting metadata: {e}")
             return {}
 
+    def _format_metadata(self, metadata):
+        return {
+            "title": metadata.get("Title", "Untitled"),
+            "author": metadata.get("Author", "Unknown"),
+            "producer": metadata.get("Producer", "Unknown"),
+            "subject": metadata.get("Subject", "")
+        }
+
     def format_summary(self, main_idea, summary):
         """Format the summary with structure and coherence."""
         if not summary:
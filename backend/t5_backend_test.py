@@ -0,0 +1,156 @@
+"""Parity check and benchmark for the T5 inference backends (torch, int8, onnx).
+
+Usage:
+    python t5_backend_test.py [--model t5-small] [--backends torch,int8,onnx]
+
+Each backend runs in its own process so peak RSS is measured per backend.
+Outputs are generated greedily and compared against the PyTorch backend.
+
+Under pytest, ``test_onnx_matches_torch`` runs the torch/onnx check on the
+checkpoint named by ``T5_PARITY_MODEL`` (a hub id or local path). It is opt-in,
+since the checkpoint may have to be downloaded, and is skipped when that variable
+is unset or torch, transformers or optimum is missing.
+"""
+import os
+import sys
+import time
+import argparse
+import resource
+import queue
+import multiprocessing as mp
+
+SAMPLE_TEXTS = [
+    "summarize: The assessment identified 12 hosts exposed to the internet. Three systems run an outdated "
+    "OpenSSH version affected by CVE-2023-38408, which allows remote code execution. The web server on "
+    "10.0.0.5 accepts TLS 1.0 and weak cipher suites. Patch management is inconsistent across departments.",
+    "summarize: A phishing campaign targeted 250 employees; 37 clicked the link and 9 entered credentials. "
+    "Multi-factor authentication prevented account takeover for all but two accounts. Security awareness "
+    "training is recommended, along with conditional access policies for legacy authentication.",
+    "summarize: Critical severity findings include an unauthenticated SQL injection in the customer portal "
+    "and default administrator credentials on two network switches. High severity findings include missing "
+    "endpoint protection on 14 workstations and an exposed RDP service without network level authentication.",
+]
+
+# Minimum average token agreement with the PyTorch output to count as parity.
+PARITY_THRESHOLDS = {'int8': 0.80, 'onnx': 0.98}
+
+# A backend that produces nothing for this long is reported as failed
+BACKEND_TIMEOUT_SECONDS = 1800
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_backend(backend, model_name, local_path, max_new_tokens, results):
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from models.registry import get_t5
+
+    started = time.perf_counter()
+    tokenizer, model = get_t5(model_name, 'cpu', local_path, backend=backend)
+    load_seconds = time.perf_counter() - started
+
+    outputs, generated, elapsed = [], 0, 0.0
+    for text in SAMPLE_TEXTS:
+        inputs = tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
+        started = time.perf_counter()
+        ids = model.generate(**inputs, max_new_tokens=max_new_tokens, num_beams=1, do_sample=False)
+        elapsed += time.perf_counter() - started
+        tokens = ids[0].tolist()
+        generated += len(tokens)
+        outputs.append(tokens)
+
+    results.put({
+        'backend': backend,
+        'load_seconds': load_seconds,
+        'tokens_per_second': generated / elapsed if elapsed else 0.0,
+        'peak_rss_mb': _peak_rss_mb(),
+        'outputs': outputs,
+        'texts': [tokenizer.decode(tokens, skip_special_tokens=True) for tokens in outputs],
+    })
+
+
+def token_agreement(reference, candidate) -> float:
+    """Share of positions where two token sequences agree, over the longer length."""
+    length = max(len(reference), len(candidate))
+    if not length:
+        return 1.0
+    return sum(a == b for a, b in zip(reference, candidate)) / length
+
+
+def run(model_name, backends, local_path, max_new_tokens):
+    context = mp.get_context('spawn')
+    reports = {}
+    for backend in backends:
+        print(f"\n🔍 Running backend '{backend}'...")
+        results = context.Queue()
+        process = context.Process(
+            target=_run_backend, args=(backend, model_name, local_path, max_new_tokens, results)
+        )
+        process.start()
+        deadline = time.monotonic() + BACKEND_TIMEOUT_SECONDS
+        while True:
+            try:
+                reports[backend] = results.get(timeout=5)
+                break
+            except queue.Empty:
+                # A child killed by OOM or a failed import never reports; don't wait out the deadline
+                if not process.is_alive():
+                    print(f"❌ Backend '{backend}' crashed (exit code {process.exitcode})")
+                    break
+                if time.monotonic() > deadline:
+                    print(f"❌ Backend '{backend}' timed out after {BACKEND_TIMEOUT_SECONDS}s")
+                    process.terminate()
+                    break
+        process.join()
+
+    print(f"\n{'backend':<8} {'load s':>8} {'tokens/s':>10} {'peak RSS MB':>12} {'parity':>8}")
+    reference = reports.get('torch')
+    # A backend that crashed, or a missing torch reference, must not pass vacuously
+    all_passed = len(reports) == len(backends) and (reference is not None or backends == ['torch'])
+    for backend, report in reports.items():
+        parity = '-'
+        if reference and backend != 'torch':
+            score = sum(
+                token_agreement(ref, out) for ref, out in zip(reference['outputs'], report['outputs'])
+            ) / len(SAMPLE_TEXTS)
+            passed = score >= PARITY_THRESHOLDS.get(backend, 1.0)
+            all_passed &= passed
+            parity = f"{score:.2f}{'' if passed else ' ❌'}"
+        print(f"{backend:<8} {report['load_seconds']:>8.1f} {report['tokens_per_second']:>10.1f} "
+              f"{report['peak_rss_mb']:>12.0f} {parity:>8}")
+
+    if reference:
+        for backend, report in reports.items():
+            if backend == 'torch':
+                continue
+            for expected, actual in zip(reference['texts'], report['texts']):
+                if expected != actual:
+                    print(f"\n[{backend}] differs from torch:\n  torch: {expected}\n  {backend}: {actual}")
+    print("\n✅ Parity check passed" if all_passed else "\n❌ Parity check failed")
+    return all_passed
+
+
+def test_onnx_matches_torch(tmp_path):
+    import pytest
+    model_name = os.getenv('T5_PARITY_MODEL')
+    if not model_name:
+        pytest.skip("set T5_PARITY_MODEL to a T5 checkpoint to run the parity check")
+    pytest.importorskip('torch')
+    pytest.importorskip('transformers')
+    pytest.importorskip('optimum.onnxruntime')
+    assert run(model_name, ['torch', 'onnx'], str(tmp_path), max_new_tokens=16)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare T5 inference backends.")
+    parser.add_argument('--model', default='t5-small')
+    parser.add_argument('--backends', default='torch,int8,onnx')
+    parser.add_argument('--local-path', default='./models/cache')
+    parser.add_argument('--max-new-tokens', type=int, default=64)
+    args = parser.parse_args()
+    ok = run(args.model, [b.strip() for b in args.backends.split(',') if b.strip()], args.local_path,
+             args.max_new_tokens)
+    sys.exit(0 if ok else 1)
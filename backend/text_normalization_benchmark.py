@@ -0,0 +1,172 @@
+"""Micro-benchmark for the compiled text-normalization pipeline.
+
+Usage:
+    python text_normalization_benchmark.py [--megabytes 4] [--repeat 3]
+
+Times models.text_normalization against the previous per-rule ``re.sub``
+implementation (its rule tables are kept below as the reference) on synthetic
+multi-MB report text and checks that both produce the same output, on that text
+and on REGRESSION_CASES.
+"""
+import re
+import time
+import random
+import argparse
+import unicodedata
+
+from models.text_normalization import clean_output, preprocess_text
+
+
+# Previous SummarizationModel._clean_output / _preprocess_text, applied in table order
+
+LEGACY_CLEAN_RULES = [
+    (r'\s*\.\s*\.\s*\.', '...'), (r'\xad+', ''), (r'_{2,}', ''), (r'\?{3,}', '?'), (r'-{3,}', '--'),
+    (r'\s{2,}', ' '), (r'[\(\)\/]{2,}', ''), (r'(?i)true:\s*', ''), (r'(?i)false:\s*', ''),
+    (r'(?i)null:\s*', ''), (r'back to mail:.*', ''), (r'http[s]?://\S+', ''),
+    (r'\d+\.\s*\d+\.\s*\d+\.', lambda m: m.group(0).replace(' ', '')),
+    (r'(?i)\b(cve-\d{4}-\d+)\b', lambda m: m.group(1).upper()),
+    (r'(?i)cvss(?:\s+score)?:\s*(\d+\.?\d*)', r'CVSS Score: \1'),
+    (r'(?i)\b(critical|high|medium|low)\s+severity\b', lambda m: m.group(1).upper() + ' Severity'),
+    (r'(\d+)\s+vulnerabilities', r'\1 Vulnerabilities'),
+    (r'(?i)\b(critical|high|medium|low)\s+risk\b', lambda m: m.group(1).upper() + ' Risk'),
+]
+
+LEGACY_SPACING_RULES = [
+    (r'\s*\.\s*', '. '), (r'\s*,\s*', ', '), (r'\s*:\s*', ': '), (r'\s*;\s*', '; '),
+    (r'\s*\(\s*', ' ('), (r'\s*\)\s*', ') '), (r'([.!?])\s*([A-Z])', r'\1\n\n\2'),
+    (r'\n{3,}', '\n\n'), (r'\s+', ' '),
+]
+
+LEGACY_ARTIFACTS = [
+    r'I\s*P\s*age', r'Page\s*\d+\s*of\s*\d+', r'Table\s+of\s+Contents.*?(?=\d+\.)', r'©.*?(?=\d{4})',
+    r'Confidential[^\n]*', r'Draft\s+Version[^\n]*', r'Document\s+Status[^\n]*', r'Last\s+Updated[^\n]*',
+    r'Generated\s+by[^\n]*', r'\[+\s*\]+', r'_{3,}', r'-{3,}',
+]
+
+LEGACY_PREPROCESS_RULES = [
+    (r'(?i)cve-\d{4}-\d+', lambda m: m.group(0).upper()),
+    (r'(?i)cvss\s*:?\s*(\d+\.?\d*)', r'CVSS Score: \1'),
+    (r'(?i)severity\s*:?\s*(critical|high|medium|low)', lambda m: f"Severity: {m.group(1).upper()}"),
+    (r'(?i)risk\s*:?\s*(critical|high|medium|low)', lambda m: f"Risk Level: {m.group(1).upper()}"),
+    (r'(\d+)\s*\.\s*(\d+)\s*\.\s*(\d+)', r'\1.\2.\3'),
+    (r'(?i)v(\d)', r'version \1'),
+    (r'(\d{1,3}\.){3}\d{1,3}(/\d{1,2})?', lambda m: m.group(0).strip()),
+    (r'(?m)^\s*[-•]\s*', '\n• '), (r'(?m)^\s*(\d+)\.\s+', r'\n\1. '),
+    (r'\s+', ' '), (r'\n\s*\n', '\n\n'), (r'([.!?])\s*([A-Z])', r'\1\n\n\2'),
+]
+
+
+def legacy_clean_output(text: str) -> str:
+    for pattern, replacement in LEGACY_CLEAN_RULES:
+        text = re.sub(pattern, replacement, text)
+    sentences = []
+    for sentence in text.split('.'):
+        sentence = sentence.strip()
+        if (len(sentence) > 10 and not any(x in sentence.lower() for x in ['...', '___', '???'])
+                and not re.match(r'^[^a-zA-Z]*$', sentence)):
+            sentences.append(sentence[0].upper() + sentence[1:] if sentence[0].isalpha() else sentence)
+    text = '. '.join(sentences)
+    for pattern, replacement in LEGACY_SPACING_RULES:
+        text = re.sub(pattern, replacement, text)
+    return text.strip()
+
+
+def legacy_preprocess_text(text: str) -> str:
+    text = unicodedata.normalize('NFKC', text)
+    for pattern in LEGACY_ARTIFACTS:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.MULTILINE)
+    for pattern, replacement in LEGACY_PREPROCESS_RULES:
+        text = re.sub(pattern, replacement, text)
+    return text.strip()
+
+
+SAMPLE_LINES = [
+    "Sample Network Vulnerability Assessment Report I P age 3",
+    "Page 3 of 42",
+    "Confidential - internal use only",
+    "- Outdated OpenSSH v8.2 on 10.0.0.15/24 allows remote code execution",
+    "1.  Apply vendor patches for cve-2023-38408 ; cvss: 9.8 ( critical severity )",
+    "The scan found 17 vulnerabilities across 12 hosts , most of them high risk .",
+    "Severity: high.Risk: medium . Next steps are listed below !Review them .",
+    "Version 2 . 4 . 51 of Apache httpd is installed; upgrade to 2.4.58 .",
+    "______________________________",
+    "true:   the firewall allows inbound SMB traffic from untrusted networks...",
+    "Remediation owners:   IT Operations  (patching)  and Security (monitoring)???",
+    "Last Updated 2024-01-12 by the assessment team",
+    "[ ]  Multi-factor authentication is not enforced for VPN access.",
+]
+
+
+# Inputs where merging the rules into alternations changed the output, and
+# inputs that exercise the merged whitespace/punctuation runs
+REGRESSION_CASES = [
+    "Table of Contents\u2026Page 3 of 4.",
+    "Table of Contents 1. Scope Page 3 of 4 2. Findings",
+    "word\xad.\xad.\xad. next sentence goes here",
+    "\xa9 Example Corp 2024 -- ---- ___ (( ))",
+    "Copyright \xa9 2023 --- 1. 2. 3. v2 release",
+    "see https://example.com/a//b for details, true: yes",
+    "a.,b;:c ( d ) e . f , g here is some long sentence",
+    "high severity high risk 3 vulnerabilities cvss score: 9.8 cve-2024-1234.",
+    "severity:critical risk high CVSS:7.5 V3 and 1 . 2 . 3",
+    "  - bullet one\n1.  numbered step\n\n\nEnd.Next!Again?Yes",
+    "ftrue:alse: the remaining sentence is long enough. (/) //( )) __--- ?? ???",
+    "Findings\xa0\xa0.\u2003.\x1c. listed below ., ;:( ) : ; end of the sentence.Next one",
+]
+
+
+def check_regressions() -> int:
+    """Print every regression case whose output differs; return how many did."""
+    failures = 0
+    for case in REGRESSION_CASES:
+        for name, legacy, compiled in (('_preprocess_text', legacy_preprocess_text, preprocess_text),
+                                       ('_clean_output', legacy_clean_output, clean_output)):
+            expected, actual = legacy(case), compiled(case)
+            if expected != actual:
+                failures += 1
+                print(f"{name} differs for {case!r}:\n  legacy:   {expected!r}\n  compiled: {actual!r}")
+    return failures
+
+
+def synthetic_text(megabytes: float, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    lines, size, target = [], 0, int(megabytes * 1024 * 1024)
+    while size < target:
+        line = rng.choice(SAMPLE_LINES)
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def _time(func, text, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark text normalization.")
+    parser.add_argument('--megabytes', type=float, default=4.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    text = synthetic_text(args.megabytes)
+    print(f"Input: {len(text) / (1024 * 1024):.1f} MB, best of {args.repeat}")
+    for name, legacy, compiled in (
+        ('_preprocess_text', legacy_preprocess_text, preprocess_text),
+        ('_clean_output', legacy_clean_output, clean_output),
+    ):
+        legacy_seconds, legacy_result = _time(legacy, text, args.repeat)
+        compiled_seconds, compiled_result = _time(compiled, text, args.repeat)
+        print(f"{name:<18} legacy {legacy_seconds:7.3f}s  compiled {compiled_seconds:7.3f}s  "
+              f"speedup {legacy_seconds / compiled_seconds:5.1f}x  "
+              f"identical output: {legacy_result == compiled_result}")
+    failures = check_regressions()
+    print(f"Regression cases: {len(REGRESSION_CASES) - failures}/{len(REGRESSION_CASES)} identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark for the NumPy TextRank used by extract_key_sentences.
+
+Usage:
+    python textrank_benchmark.py [--sizes 2000,5000,10000] [--dim 384] [--top-k 32]
+                                 [--networkx-max 2000]
+
+Ranks synthetic clustered sentence embeddings with processors.textrank (dense
+and top-k sparsified) and, up to ``--networkx-max`` sentences, with the previous
+``nx.pagerank(nx.from_numpy_array(...))`` implementation, checking that the
+selected sentences are identical. networkx is only needed for the comparison.
+"""
+import time
+import argparse
+
+import numpy as np
+
+from processors.textrank import rank_sentences
+
+NUM_SENTENCES = 5
+
+
+def synthetic_embeddings(count: int, dim: int, clusters: int = 40, seed: int = 7) -> np.ndarray:
+    """Unit vectors around a few topic centroids, like embeddings of a long report."""
+    rng = np.random.default_rng(seed)
+    centroids = np.abs(rng.normal(size=(clusters, dim)))
+    vectors = centroids[rng.integers(clusters, size=count)] + rng.normal(scale=0.6, size=(count, dim))
+    vectors = vectors.astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def legacy_rank(embeddings: np.ndarray, num_sentences: int):
+    """Previous implementation of extract_key_sentences' ranking step."""
+    import networkx as nx
+    similarity_matrix = np.inner(embeddings, embeddings)
+    nx_graph = nx.from_numpy_array(similarity_matrix)
+    scores = nx.pagerank(nx_graph)
+    return sorted(scores, key=scores.get, reverse=True)[:num_sentences]
+
+
+def _time(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TextRank implementations.")
+    parser.add_argument('--sizes', default='2000,5000,10000')
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--top-k', type=int, default=32)
+    parser.add_argument('--networkx-max', type=int, default=2000,
+                        help="Largest size to run networkx on (it needs n^2 Python edge objects)")
+    args = parser.parse_args()
+
+    try:
+        import networkx  # noqa: F401
+        has_networkx = True
+    except ImportError:
+        has_networkx = False
+        print("networkx is not installed; skipping the comparison with the previous implementation")
+
+    print(f"{'sentences':>9} {'networkx':>10} {'numpy':>9} {'speedup':>8} {'same':>5} "
+          f"{'top-k':>9} {'overlap':>8}")
+    for count in (int(size) for size in args.sizes.split(',') if size.strip()):
+        embeddings = synthetic_embeddings(count, args.dim)
+        dense_seconds, dense = _time(rank_sentences, embeddings, NUM_SENTENCES)
+        sparse_seconds, sparse = _time(rank_sentences, embeddings, NUM_SENTENCES, args.top_k)
+        overlap = len(set(dense) & set(sparse)) / NUM_SENTENCES
+
+        legacy_column, speedup_column, same_column = '-', '-', '-'
+        if has_networkx and count <= args.networkx_max:
+            legacy_seconds, legacy = _time(legacy_rank, embeddings, NUM_SENTENCES)
+            legacy_column = f"{legacy_seconds:9.2f}s"
+            speedup_column = f"{legacy_seconds / dense_seconds:7.0f}x"
+            same_column = str(list(legacy) == dense)
+        print(f"{count:>9} {legacy_column:>10} {dense_seconds:8.3f}s {speedup_column:>8} {same_column:>5} "
+              f"{sparse_seconds:8.3f}s {overlap:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()